@@ -0,0 +1,147 @@
+""" Local benchmark of the config_mgmt function, against mock BIG-IPs
+
+Simulates the request stream of a warm function worker: requests for a few
+devices, in random order, some applying an AS3 declaration. The stream is run
+with the client cache enabled and disabled (F5_CLIENT_CACHE_TTL=0), and sent
+as multi-target requests of --batch-size targets, and the latency (per target)
+and number of logins of each run are reported. The cold start, the
+time to import the function, is measured in a new process.
+
+Requires the f5-cli repository (for the mock server) and the function requirements::
+
+    pip install -e . azure-functions
+    python demos/serverless/benchmark.py --requests 200 --devices 4 --latency 0.02
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import subprocess
+import contextlib
+
+import azure.functions as func  # pylint: disable=import-error
+
+from f5cli.testing import MockServer
+
+FUNCTION_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, FUNCTION_DIR)
+
+import config_mgmt  # noqa: E402 pylint: disable=import-error,wrong-import-position
+
+AS3_DECLARATION = {
+    'class': 'AS3',
+    'declaration': {'class': 'ADC', 'schemaVersion': '3.0.0', 'Sample_01': {'class': 'Tenant'}}
+}
+
+
+def get_request(body):
+    """ Get a function request """
+
+    return func.HttpRequest(
+        method='POST',
+        url='/api/config_mgmt',
+        body=json.dumps(body).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+
+
+def get_targets(servers, count, config_ratio, seed):
+    """ Get the targets of the request stream """
+
+    rand = random.Random(seed)
+    targets = []
+    for _ in range(count):
+        server = rand.choice(servers)
+        target = {'host': server.host, 'port': server.port, 'user': 'admin', 'password': 'admin'}
+        if rand.random() < config_ratio:
+            target['configDeclaration'] = AS3_DECLARATION
+        targets.append(target)
+    return targets
+
+
+def get_requests(targets, batch_size):
+    """ Get the request stream: (number of targets, request) """
+
+    if batch_size <= 1:
+        return [(1, get_request(target)) for target in targets]
+    return [(len(targets[i:i + batch_size]), get_request({'targets': targets[i:i + batch_size]}))
+            for i in range(0, len(targets), batch_size)]
+
+
+def run(stream, ttl):
+    """ Run the request stream with a client cache TTL, returning the latencies (ms) """
+
+    config_mgmt.CLIENT_CACHE_TTL = ttl
+    config_mgmt._CLIENTS.clear()  # pylint: disable=protected-access
+    latencies = []
+    for count, request in stream:
+        start = time.perf_counter()
+        response = config_mgmt.main(request)
+        latencies.extend([(time.perf_counter() - start) * 1000 / count] * count)
+        if response.status_code != 200:
+            raise RuntimeError(response.get_body().decode('utf-8'))
+    return latencies
+
+
+def get_cold_start():
+    """ Get the number of milliseconds to import the function in a new process """
+
+    code = ('import time; start = time.perf_counter(); import config_mgmt; '
+            'print((time.perf_counter() - start) * 1000)')
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=FUNCTION_DIR)
+    return float(output)
+
+
+def report(name, latencies, logins):
+    """ Print the summary of a run """
+
+    ordered = sorted(latencies)
+    print('%-12s mean %8.2f ms  p50 %8.2f ms  p95 %8.2f ms  logins %d' % (
+        name,
+        statistics.mean(ordered),
+        ordered[len(ordered) // 2],
+        ordered[int(len(ordered) * 0.95)],
+        logins
+    ))
+
+
+def main():
+    """ Run the benchmark """
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--devices', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='the number of seconds each mock BIG-IP response is delayed')
+    parser.add_argument('--config-ratio', type=float, default=0.25,
+                        help='the fraction of requests applying an AS3 declaration')
+    parser.add_argument('--ttl', type=int, default=600,
+                        help='the client cache TTL of the cached run')
+    parser.add_argument('--batch-size', type=int, default=20,
+                        help='the number of targets of each multi-target request')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        servers = [stack.enter_context(MockServer(latency=args.latency, seed=args.seed))
+                   for _ in range(args.devices)]
+        targets = get_targets(servers, args.requests, args.config_ratio, args.seed)
+        print('%d requests, %d devices, %.3fs latency, %.0f%% applying a declaration' % (
+            args.requests, args.devices, args.latency, args.config_ratio * 100))
+        for name, ttl, batch_size in [('no cache', 0, 1), ('cached', args.ttl, 1),
+                                      ('batched', args.ttl, args.batch_size)]:
+            for server in servers:
+                server.request_log.clear()
+            latencies = run(get_requests(targets, batch_size), ttl)
+            logins = sum(1 for server in servers for _, path, _ in server.request_log
+                         if path == '/mgmt/shared/authn/login')
+            report(name, latencies, logins)
+    print('cold start   import %8.2f ms' % get_cold_start())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,44 +1,125 @@
 """ Azure Function """
 
-import logging
+import os
 import json
+import time
+import hmac
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # pylint: disable=import-error
 # pylint: disable=no-name-in-module
 import azure.functions as func
-from f5cloudsdk.bigip import ManagementClient
 
-from f5cloudsdk.bigip.toolchain import ToolChainClient
+# authenticated clients are reused by warm invocations for this many seconds, well
+# within the lifetime of the device token, 0 logs in on every invocation
+CLIENT_CACHE_TTL = int(os.environ.get('F5_CLIENT_CACHE_TTL', '600'))
+# maximum number of devices with a cached client, the oldest is evicted first
+CLIENT_CACHE_SIZE = int(os.environ.get('F5_CLIENT_CACHE_SIZE', '100'))
 
-def main(req: func.HttpRequest) -> func.HttpResponse:
-    """ special function """
-    try:
-        req_body = req.get_json()
-    except Exception as _e:
-        return func.HttpResponse(
-            'Exception parsing JSON body: %s' % _e,
-            status_code=400
-        )
-    host = req_body.pop('host', None)
-    user = req_body.pop('user', None)
-    password = req_body.pop('password', None)
-    config_decl = req_body.pop('configDeclaration', None)
+# cached clients, by (host, port, user), kept by the worker between invocations
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+_CLIENT_LOCKS = {}
 
-    if not (host and user and password):
-        return func.HttpResponse('Host, user, password required', status_code=400)
+# the maximum number of targets of a request processed concurrently
+MAX_WORKERS = int(os.environ.get('F5_MAX_WORKERS', '8'))
+# the number of seconds a request may take, HTTP triggered functions must respond
+# within 230 seconds whatever the function timeout, targets not processed by then
+# are reported as skipped (not started) or timed out (still running)
+TIME_BUDGET = float(os.environ.get('F5_TIME_BUDGET', '200'))
+# the SDK error of a request rejected once the token of a cached client is no longer valid
+UNAUTHORIZED_STATUS_CODE = 'code: 401'
+TARGET_STATUSES = {
+    'SUCCESS': 'success',
+    'FAILURE': 'failure',
+    'SKIPPED': 'skipped',
+    'TIMEOUT': 'timeout'
+}
+
+
+def _digest(password):
+    """ Digest of a password, so cached clients are only reused with the same password """
+
+    return hashlib.sha256(password.encode('utf-8')).digest()
+
+
+def _get_device(host, port, user, password):
+    """ Get an authenticated device, reusing the client of a warm invocation if any
+
+    Returns a dict containing the device client, its AS3 client (created on first use)
+    and whether AS3 is known to be installed, and if it was reused
+    """
+
+    key = (host, port, user)
+    with _CLIENTS_LOCK:
+        # targets of a request for the same device wait for a single login
+        lock = _CLIENT_LOCKS.setdefault(key, threading.Lock())
+    with lock:
+        now = time.monotonic()
+        with _CLIENTS_LOCK:
+            cached = _CLIENTS.get(key)
+        if cached is not None and cached['expires'] > now and \
+                hmac.compare_digest(cached['digest'], _digest(password)):
+            return dict(cached, reused=True)
+
+        # imported on first use, the SDK (and requests) is the bulk of the cold start
+        from f5sdk.bigip import ManagementClient  # pylint: disable=import-outside-toplevel
+
+        kwargs = {'user': user, 'password': password}
+        if port:
+            kwargs['port'] = port
+        device = {
+            'client': ManagementClient(host, **kwargs),
+            'as3': None,
+            'as3_installed': False,
+            'digest': _digest(password),
+            'expires': now + CLIENT_CACHE_TTL
+        }
+        if CLIENT_CACHE_TTL > 0:
+            with _CLIENTS_LOCK:
+                _CLIENTS[key] = device
+                for expired in [other for other, value in _CLIENTS.items()
+                                if value['expires'] <= now]:
+                    del _CLIENTS[expired]
+                while len(_CLIENTS) > CLIENT_CACHE_SIZE:
+                    del _CLIENTS[min(_CLIENTS, key=lambda other: _CLIENTS[other]['expires'])]
+    return dict(device, reused=False)
+
+
+def _update_device(host, port, user, **kwargs):
+    """ Update the cached state of a device, such as its AS3 client """
+
+    with _CLIENTS_LOCK:
+        if (host, port, user) in _CLIENTS:
+            _CLIENTS[(host, port, user)].update(kwargs)
+
+
+def _forget_device(host, port, user):
+    """ Forget the cached client of a device, such as once its token is no longer valid """
+
+    with _CLIENTS_LOCK:
+        _CLIENTS.pop((host, port, user), None)
+
+
+def _configure(device, host, port, user, config_decl):
+    """ Get the device info and apply the (optional) AS3 declaration """
 
-    # init device
-    device = ManagementClient(host, user=user, password=password)
     # get BIG-IP info (version, etc.)
-    device_info = device.get_info()
+    device_info = device['client'].get_info()
 
     # optional configuration via AS3 declaration
     config_response = ''
     if config_decl:
-        as3 = ToolChainClient(device, 'as3')
-        # install AS3 - as needed
-        if not as3.package.is_installed():
+        as3 = device['as3']
+        if as3 is None:
+            from f5sdk.bigip.extension import AS3Client  # pylint: disable=import-outside-toplevel
+            as3 = AS3Client(device['client'])
+        # install AS3 - as needed, once per cached client
+        if not device['as3_installed'] and not as3.package.is_installed()['installed']:
             as3.package.install()
+        _update_device(host, port, user, as3=as3, as3_installed=True)
 
         # 'POST' to AS3 service
         if as3.service.create(config=config_decl):
@@ -46,8 +127,152 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                 'message': 'success'
             }
 
-    response = {
+    return {
         'info': device_info,
         'configResponse': config_response
     }
-    return func.HttpResponse(json.dumps(response))
+
+
+def _is_stale_client_error(error):
+    """ Check an error means a cached client is no longer usable, such as once logged out
+
+    Only authentication (401) and connection failures qualify, so a rejected
+    declaration (422) or a POST which timed out, and may still be applying,
+    is never sent again
+    """
+
+    # imported on first use, as the SDK is (requests is imported by the SDK)
+    import requests  # pylint: disable=import-outside-toplevel
+    from f5sdk.exceptions import HTTPError  # pylint: disable=import-outside-toplevel
+
+    if isinstance(error, HTTPError):
+        return UNAUTHORIZED_STATUS_CODE in str(error)
+    return isinstance(error, requests.exceptions.ConnectionError)
+
+
+def _process(host, port, user, password, config_decl):
+    """ Process a target, retrying once with a new client if a reused client is stale """
+
+    device = _get_device(host, port, user, password)
+    try:
+        return _configure(device, host, port, user, config_decl)
+    except Exception as error:
+        # failures of a new client, and other failures, are not retried
+        if not device['reused'] or not _is_stale_client_error(error):
+            raise
+    # a reused client may have been logged out (device restarted, etc.), retry once
+    # with a new one, its failure is the error of the target
+    _forget_device(host, port, user)
+    device = _get_device(host, port, user, password)
+    return _configure(device, host, port, user, config_decl)
+
+
+def _get_targets(req_body):
+    """ Get the targets of a multi-target request, the request properties are defaults
+
+    Returns a list of (host, port, user, password, configDeclaration) tuples, or
+    the message of the first invalid target
+    """
+
+    defaults = {key: req_body.get(key) for key in
+                ['port', 'user', 'password', 'configDeclaration']}
+    targets = []
+    for index, target in enumerate(req_body['targets']):
+        if not isinstance(target, dict):
+            target = {'host': target}
+        target = dict(defaults, **target)
+        if not (target.get('host') and target['user'] and target['password']):
+            return None, 'Target %s: host, user, password required' % index
+        targets.append((target['host'], target['port'], target['user'], target['password'],
+                        target['configDeclaration']))
+    return targets, None
+
+
+def _process_target(target, deadline):
+    """ Process a target of a multi-target request, unless the time budget is spent """
+
+    host, port, user, _, _ = target
+    result = {'host': host, 'port': port, 'user': user}
+    start = time.monotonic()
+    if start >= deadline:
+        return dict(result, status=TARGET_STATUSES['SKIPPED'])
+    try:
+        result.update(_process(*target))
+        result['status'] = TARGET_STATUSES['SUCCESS']
+    except Exception as _e:  # pylint: disable=broad-except
+        result.update(status=TARGET_STATUSES['FAILURE'], error=str(_e))
+    result['durationMs'] = round((time.monotonic() - start) * 1000, 3)
+    return result
+
+
+def _process_targets(targets, parallel, budget):
+    """ Process the targets, up to parallel at a time, within the time budget
+
+    Returns the result of each target, in the order of the targets
+    """
+
+    deadline = time.monotonic() + budget
+    executor = ThreadPoolExecutor(max_workers=parallel)
+    futures = [executor.submit(_process_target, target, deadline) for target in targets]
+    wait(futures, timeout=budget)
+    results = []
+    for target, future in zip(targets, futures):
+        if future.done():
+            results.append(future.result())
+            continue
+        host, port, user, _, _ = target
+        # not started targets are cancelled, running ones complete in the background
+        status = TARGET_STATUSES['SKIPPED'] if future.cancel() else TARGET_STATUSES['TIMEOUT']
+        results.append({'host': host, 'port': port, 'user': user, 'status': status})
+    executor.shutdown(wait=False)
+    return results
+
+
+def _main_targets(req_body):
+    """ Process a multi-target request """
+
+    if not isinstance(req_body['targets'], list) or not req_body['targets']:
+        return func.HttpResponse('Targets must be a non-empty array', status_code=400)
+    targets, error = _get_targets(req_body)
+    if error:
+        return func.HttpResponse(error, status_code=400)
+    try:
+        parallel = max(1, min(int(req_body.get('parallel', MAX_WORKERS)), MAX_WORKERS))
+        budget = min(float(req_body.get('timeBudget', TIME_BUDGET)), TIME_BUDGET)
+    except (TypeError, ValueError) as _e:
+        return func.HttpResponse('Invalid parallel or timeBudget: %s' % _e, status_code=400)
+
+    results = _process_targets(targets, parallel, budget)
+    summary = {status: 0 for status in TARGET_STATUSES.values()}
+    for result in results:
+        summary[result['status']] += 1
+    # 207 (multi-status) unless every target succeeded
+    return func.HttpResponse(
+        json.dumps({'results': results, 'summary': summary}),
+        status_code=200 if summary[TARGET_STATUSES['SUCCESS']] == len(results) else 207,
+        mimetype='application/json'
+    )
+
+
+def main(req: func.HttpRequest) -> func.HttpResponse:
+    """ special function """
+    try:
+        req_body = req.get_json()
+    except Exception as _e:
+        return func.HttpResponse(
+            'Exception parsing JSON body: %s' % _e,
+            status_code=400
+        )
+    if 'targets' in req_body:
+        return _main_targets(req_body)
+
+    host = req_body.pop('host', None)
+    port = req_body.pop('port', None)
+    user = req_body.pop('user', None)
+    password = req_body.pop('password', None)
+    config_decl = req_body.pop('configDeclaration', None)
+
+    if not (host and user and password):
+        return func.HttpResponse('Host, user, password required', status_code=400)
+
+    return func.HttpResponse(json.dumps(_process(host, port, user, password, config_decl)))
@@ -0,0 +1,27 @@
+"""Programmatic API, for automation performing CLI operations in process
+
+Functions return the responses as Python objects and never write to stdout,
+clients are created from the CLI authentication unless one is provided.
+Invalid or failed operations raise ApiError
+
+Example::
+
+    from f5cli import api
+
+    api.extension('as3', 'show')
+    api.cs.subscription.list(account_id_filter='a-aaQpLBMaYK')
+    api.inventory.show(query=['as3<3.30'])
+    api.upgrade.plan(targets=['bigip_1'])
+"""
+
+from . import cs, inventory, upgrade
+from .bigip import extension
+from .exceptions import ApiError
+
+__all__ = [
+    'cs',
+    'inventory',
+    'upgrade',
+    'extension',
+    'ApiError'
+]
@@ -0,0 +1,258 @@
+"""BIG-IP operations, such as extension package and service operations
+
+Example::
+
+    response = extension('as3', 'create', declaration='as3.json')
+    response = extension('do', 'show', client=ManagementClient('192.0.2.10', user='admin',
+                                                               password='admin'))
+"""
+
+import json
+
+from f5sdk.bigip import ManagementClient
+
+from f5cli import constants
+from f5cli.config import AuthConfigurationClient
+from f5cli.utils import core as utils_core
+from f5cli.utils import timings, metrics, sharing
+from f5cli.utils.device_queue import DeviceLock, retry_on_busy
+from f5cli.utils.templating import render_declaration
+from .exceptions import ApiError
+from .extension_operations import COMPONENTS, WRITE_ACTIONS
+from .extension_operations import ExtensionOperationsClient, check_install
+
+
+@timings.timed('auth.login')
+def get_mgmt_client(auth=None):
+    """Get a BIG-IP management client, using the CLI authentication
+
+    Parameters
+    ----------
+    auth : dict
+        the authentication account, defaults to the default BIG-IP account
+
+    Returns
+    -------
+    object
+        the management client, shared by the commands of a batch
+    """
+
+    if auth is None:
+        auth_client = AuthConfigurationClient()
+        auth = auth_client.read_auth(constants.AUTHENTICATION_PROVIDERS['BIGIP'])
+
+    management_kwargs = dict(
+        port=auth['port'],
+        user=auth['user'],
+        password=auth['password']
+    )
+    # reuse the logged in client of the account, while sharing is enabled (f5 batch)
+    return sharing.get_client(
+        (constants.AUTHENTICATION_PROVIDERS['BIGIP'], auth['host'], auth['port'],
+         auth['user'], auth['password']),
+        lambda: ManagementClient(auth['host'], **management_kwargs)
+    )
+
+
+def get_rendered_declaration(action, declaration, template, vars_file):
+    """ Render the declaration to create from a template and variables file """
+
+    if action != 'create':
+        raise ApiError(
+            'The --template and --vars options are only supported by the create action'
+        )
+    if declaration is not None or not (template and vars_file):
+        raise ApiError(
+            'The --template and --vars options are required together, instead of --declaration'
+        )
+    try:
+        return render_declaration(utils_core.convert_to_absolute(template),
+                                  utils_core.convert_to_absolute(vars_file))
+    except Exception as error:
+        raise ApiError(error) from error
+
+
+def validate_declarations(component, version, declaration, schema, parallel):
+    """ Validate declaration file(s) locally, without connecting to the device """
+
+    # imported on first use, jsonschema is only needed to validate declarations
+    # pylint: disable=import-outside-toplevel
+    from .schema_validation import get_declaration_files, validate_files
+
+    if declaration is None:
+        raise ApiError('The --declaration option is required')
+    paths = get_declaration_files(utils_core.convert_to_absolute(declaration))
+    if not paths:
+        raise ApiError('No declaration files found in %s' % declaration)
+    with timings.span('operation.validate'), metrics.operation(component, 'validate'):
+        try:
+            results = validate_files(component, version, paths, schema=schema, parallel=parallel)
+        except Exception as error:
+            raise ApiError(error) from error
+        invalid = [result for result in results if not result['valid']]
+        if invalid:
+            raise ApiError('%d of %d declarations are invalid: %s' % (
+                len(invalid), len(results), json.dumps(invalid, indent=4)))
+    return results
+
+
+def process_extension_component_command(client, allowed_actions, action, **kwargs):
+    """ Process extension component actions """
+
+    declaration = kwargs.pop('declaration', None)
+    split_tenants = kwargs.pop('split_tenants', False)
+    parallel = kwargs.pop('parallel', constants.DEFAULT_WORKERS)
+    deadline = kwargs.pop('deadline', None)
+
+    if action not in allowed_actions:
+        raise ApiError('Action \'{}\' not implemented'.format(action))
+
+    try:
+        actions_switch = {
+            'verify': client.verify_package,
+            'install': client.install_package,
+            'uninstall': client.uninstall_package,
+            'upgrade': client.upgrade_package,
+            'list-versions': client.list_package_versions,
+            'show': client.show_service,
+            'create': client.create_service,
+            'delete': client.delete_service,
+            'show-info': client.show_info_service,
+            'show-failover': client.show_failover_service,
+            'trigger-failover': client.trigger_failover_service,
+            'show-inspect': client.show_inspect_service,
+            'reset': client.reset_service,
+        }
+        if split_tenants:
+            actions_switch['create'] = client.create_service_by_tenant
+        action_to_perform = actions_switch.get(action, lambda: None)
+        # process any optional function arguments
+        args = []
+        if action in ['create', 'trigger-failover', 'reset']:
+            args.append(declaration)
+        if split_tenants and action == 'create':
+            # each tenant retries a busy device until the queue deadline
+            args.extend([parallel, deadline])
+        with timings.span('operation.%s' % action,
+                          attributes={'f5.component': client.component, 'f5.action': action}), \
+                metrics.operation(client.component, action):
+            return retry_on_busy(action_to_perform, *args, deadline=deadline)
+    except Exception as error:
+        raise ApiError(error) from error
+
+
+def _get_extension_options(kwargs):
+    """ Get the extension action options from the keyword arguments, with their defaults """
+
+    return {
+        'client': kwargs.pop('client', None),
+        'version': kwargs.pop('version', None),
+        'package_url': kwargs.pop('package_url', None),
+        'declaration': kwargs.pop('declaration', None),
+        'template': kwargs.pop('template', None),
+        'vars_file': kwargs.pop('vars_file', None),
+        'split_tenants': kwargs.pop('split_tenants', False),
+        'parallel': kwargs.pop('parallel', constants.DEFAULT_WORKERS),
+        'schema': kwargs.pop('schema', None),
+        'queue_timeout': kwargs.pop('queue_timeout', constants.DEFAULT_QUEUE_TIMEOUT)
+    }
+
+
+def _get_extension_declaration(action, options):
+    """ Get the declaration of an extension action, rendered from the template if provided """
+
+    if options['split_tenants'] and action != 'create':
+        raise ApiError(
+            'The --split-tenants option is only supported by the create action'
+        )
+    if options['template'] or options['vars_file']:
+        return get_rendered_declaration(action, options['declaration'], options['template'],
+                                        options['vars_file'])
+    return options['declaration']
+
+
+def extension(component, action, **kwargs):
+    """Perform an extension action, such as installing AS3 or creating a declaration
+
+    Notes
+    -----
+    The package is installed first when required by the action, and write
+    actions wait for other operations against the device to complete
+
+    Parameters
+    ----------
+    component : str
+        the extension component, such as as3, do, ts or cf
+    action : str
+        the action, such as verify, install, create or show
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    client : object
+        the BIG-IP management client to use, created from the CLI authentication if not provided
+    version : str
+        the package version, the latest version if not provided
+    package_url : str
+        the package URL, instead of the published package of the version
+    declaration : str, dict
+        the declaration file (or directory, to validate), or the declaration itself
+    template : str
+        a JSON template file to render the declaration to create from
+    vars_file : str
+        the CSV file of variables used to render the template
+    split_tenants : bool
+        submit each tenant of an AS3 declaration separately
+    parallel : int
+        the maximum number of tenants submitted, or files validated, concurrently
+    schema : str
+        the schema file or URL to validate against
+    queue_timeout : int
+        the number of seconds to wait for other operations against the device to complete
+
+    Returns
+    -------
+    dict, list
+        the action response
+
+    Raises
+    ------
+    ApiError
+        if the action is not implemented for the component, or fails
+    """
+
+    options = _get_extension_options(kwargs)
+    if component not in COMPONENTS:
+        raise ApiError('Component \'{}\' not implemented'.format(component))
+    if action not in COMPONENTS[component]['actions']:
+        raise ApiError('Action \'{}\' not implemented'.format(action))
+    if action == 'validate':
+        return validate_declarations(component, options['version'], options['declaration'],
+                                     options['schema'], options['parallel'])
+    declaration = _get_extension_declaration(action, options)
+
+    client = options['client'] or get_mgmt_client()
+    extension_operations_client = ExtensionOperationsClient(
+        client,
+        component,
+        options['version'],
+        options['package_url']
+    )
+    try:
+        with DeviceLock(client.host,
+                        timeout=options['queue_timeout'],
+                        enabled=action in WRITE_ACTIONS) as lock:
+            extension_operations_client.install_component_if_required(check_install(action))
+            return process_extension_component_command(
+                extension_operations_client,
+                COMPONENTS[component]['actions'],
+                action,
+                declaration=declaration,
+                split_tenants=options['split_tenants'],
+                parallel=options['parallel'],
+                deadline=lock.deadline
+            )
+    except TimeoutError as error:
+        # the device queue timed out, waiting for other operations against the device
+        raise ApiError(error) from error
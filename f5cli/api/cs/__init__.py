@@ -0,0 +1,19 @@
+"""Cloud Services operations, such as subscriptions and Beacon
+
+Example::
+
+    from f5cli.api import cs
+
+    subscriptions = cs.subscription.list()
+    insights = cs.beacon.insights.list(auth={'user': 'user@example.com', 'password': '...'})
+"""
+
+from . import account, beacon, subscription
+from .core import Session
+
+__all__ = [
+    'Session',
+    'account',
+    'beacon',
+    'subscription'
+]
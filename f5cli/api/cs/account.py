@@ -0,0 +1,45 @@
+"""Cloud Services account operations
+
+Example::
+
+    user = show_user()
+"""
+
+from f5sdk.cs.accounts import AccountClient
+
+from f5cli import constants
+from f5cli.api.cs.core import Session
+
+
+def show_user(**kwargs):
+    """Show the current user
+
+    Parameters
+    ----------
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    client : object
+        the management client to use, created from the CLI authentication if not provided
+    auth : dict
+        the account to create the management client for, instead of the CLI authentication
+    no_cache : bool
+        neither read nor write the response cache
+    refresh : bool
+        ignore any cached response
+
+    Returns
+    -------
+    dict
+        the user
+    """
+
+    session = Session.from_kwargs(kwargs)
+    return session.fetch(
+        ['account', 'show-user'],
+        lambda: AccountClient(session.mgmt_client).show_user(),
+        constants.CS_CACHE_TTL['ACCOUNT_SHOW_USER'],
+        refresh=kwargs.pop('refresh', False)
+    )
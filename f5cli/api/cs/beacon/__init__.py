@@ -0,0 +1,9 @@
+"""Beacon operations, such as insights, tokens and declarations """
+
+from . import declare, insights, token
+
+__all__ = [
+    'declare',
+    'insights',
+    'token'
+]
@@ -0,0 +1,57 @@
+"""Beacon declaration operations
+
+Example::
+
+    declaration = show()
+"""
+
+from f5sdk.cs.beacon.declare import DeclareClient
+
+from f5cli.api.cs.core import Session, get_config_kwargs
+
+
+def show(**kwargs):
+    """Show the declaration, such as the applications
+
+    Parameters
+    ----------
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    client : object
+        the management client to use, created from the CLI authentication if not provided
+    auth : dict
+        the account to create the management client for, instead of the CLI authentication
+
+    Returns
+    -------
+    dict
+        the declaration
+    """
+
+    session = Session.from_kwargs(kwargs)
+    return DeclareClient(session.mgmt_client).create(config={'action': 'get'})
+
+
+def create(declaration, **kwargs):
+    """Create or update the declaration
+
+    Parameters
+    ----------
+    declaration : str, dict
+        the declaration file, or the declaration itself
+    **kwargs :
+        optional keyword arguments, see show() for the client arguments
+
+    Returns
+    -------
+    dict
+        the response
+    """
+
+    session = Session.from_kwargs(kwargs)
+    response = DeclareClient(session.mgmt_client).create(**get_config_kwargs(declaration))
+    session.invalidate()
+    return response
@@ -0,0 +1,160 @@
+"""Beacon insights operations
+
+Example::
+
+    insights = list()
+    create(declaration='insight.json')
+"""
+
+# pylint: disable=redefined-builtin
+
+from f5sdk.cs.beacon.insights import InsightsClient
+
+from f5cli import constants
+from f5cli.api.cs.core import Session, create_items, delete_items, get_config_kwargs
+from f5cli.api.cs.core import list_items
+
+
+def list(**kwargs):
+    """List insights
+
+    Parameters
+    ----------
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    client : object
+        the management client to use, created from the CLI authentication if not provided
+    auth : dict
+        the account to create the management client for, instead of the CLI authentication
+    no_cache : bool
+        neither read nor write the response cache
+    refresh : bool
+        ignore any cached response
+    page_size : int
+        fetch the list one page at a time, using this page size
+    max_items : int
+        stop listing after this many items
+
+    Returns
+    -------
+    dict, generator
+        the insights, a generator of insights if page size or max items is provided
+    """
+
+    session = Session.from_kwargs(kwargs)
+    refresh = kwargs.pop('refresh', False)
+    page_size = kwargs.pop('page_size', None)
+    max_items = kwargs.pop('max_items', None)
+
+    if page_size or max_items:
+        # lazily paginated lists are streamed, not cached
+        return list_items(InsightsClient(session.mgmt_client).list, page_size, max_items)
+    return session.fetch(
+        ['beacon', 'insights', 'list'],
+        lambda: InsightsClient(session.mgmt_client).list(),
+        constants.CS_CACHE_TTL['INSIGHTS_LIST'],
+        refresh=refresh
+    )
+
+
+def create(**kwargs):
+    """Create an insight, or one insight per declaration file in a directory
+
+    Parameters
+    ----------
+    **kwargs :
+        optional keyword arguments, see list() for the client arguments
+
+    Keyword Arguments
+    -----------------
+    declaration : str, dict
+        the declaration file, or the declaration itself
+    declaration_dir : str
+        a directory of declaration files, insights already matching a declaration are skipped
+    parallel : int
+        the maximum number of concurrent requests
+
+    Returns
+    -------
+    dict, list
+        the created insight, or a result per declaration file
+    """
+
+    session = Session.from_kwargs(kwargs)
+    response = create_items(InsightsClient(session.mgmt_client), **kwargs)
+    session.invalidate()
+    return response
+
+
+def update(declaration, **kwargs):
+    """Update an insight
+
+    Parameters
+    ----------
+    declaration : str, dict
+        the declaration file, or the declaration itself
+    **kwargs :
+        optional keyword arguments, see list() for the client arguments
+
+    Returns
+    -------
+    dict
+        the updated insight
+    """
+
+    session = Session.from_kwargs(kwargs)
+    response = InsightsClient(session.mgmt_client).create(**get_config_kwargs(declaration))
+    session.invalidate()
+    return response
+
+
+def show(name, **kwargs):
+    """Show an insight
+
+    Parameters
+    ----------
+    name : str
+        the insight name
+    **kwargs :
+        optional keyword arguments, see list() for the client arguments
+
+    Returns
+    -------
+    dict
+        the insight
+    """
+
+    session = Session.from_kwargs(kwargs)
+    return InsightsClient(session.mgmt_client).show(name=name)
+
+
+def delete(**kwargs):
+    """Delete an insight, or each insight of a list of names
+
+    Parameters
+    ----------
+    **kwargs :
+        optional keyword arguments, see list() for the client arguments
+
+    Keyword Arguments
+    -----------------
+    name : str
+        the insight name
+    names : list
+        the insight names
+    parallel : int
+        the maximum number of concurrent requests
+
+    Returns
+    -------
+    dict, list
+        an empty dict once the insight is deleted, or a result per name
+    """
+
+    session = Session.from_kwargs(kwargs)
+    response = delete_items(InsightsClient(session.mgmt_client), **kwargs)
+    session.invalidate()
+    return response
@@ -0,0 +1,121 @@
+"""Beacon token operations
+
+Example::
+
+    tokens = list()
+    create(declaration={'name': 'token-1', 'description': 'Telemetry Streaming'})
+"""
+
+# pylint: disable=redefined-builtin
+
+from f5sdk.cs.beacon.token import TokenClient
+
+from f5cli.api.cs.core import Session, create_items, delete_items, list_items
+
+
+def list(**kwargs):
+    """List tokens
+
+    Parameters
+    ----------
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    client : object
+        the management client to use, created from the CLI authentication if not provided
+    auth : dict
+        the account to create the management client for, instead of the CLI authentication
+    page_size : int
+        fetch the list one page at a time, using this page size
+    max_items : int
+        stop listing after this many items
+
+    Returns
+    -------
+    dict, generator
+        the tokens, a generator of tokens if page size or max items is provided
+    """
+
+    session = Session.from_kwargs(kwargs)
+    return list_items(TokenClient(session.mgmt_client).list,
+                      kwargs.pop('page_size', None), kwargs.pop('max_items', None))
+
+
+def create(**kwargs):
+    """Create a token, or one token per declaration file in a directory
+
+    Parameters
+    ----------
+    **kwargs :
+        optional keyword arguments, see list() for the client arguments
+
+    Keyword Arguments
+    -----------------
+    declaration : str, dict
+        the declaration file, or the declaration itself
+    declaration_dir : str
+        a directory of declaration files, tokens already matching a declaration are skipped
+    parallel : int
+        the maximum number of concurrent requests
+
+    Returns
+    -------
+    dict, list
+        the created token, or a result per declaration file
+    """
+
+    session = Session.from_kwargs(kwargs)
+    response = create_items(TokenClient(session.mgmt_client), **kwargs)
+    session.invalidate()
+    return response
+
+
+def show(name, **kwargs):
+    """Show a token
+
+    Parameters
+    ----------
+    name : str
+        the token name
+    **kwargs :
+        optional keyword arguments, see list() for the client arguments
+
+    Returns
+    -------
+    dict
+        the token
+    """
+
+    session = Session.from_kwargs(kwargs)
+    return TokenClient(session.mgmt_client).show(name=name)
+
+
+def delete(**kwargs):
+    """Delete a token, or each token of a list of names
+
+    Parameters
+    ----------
+    **kwargs :
+        optional keyword arguments, see list() for the client arguments
+
+    Keyword Arguments
+    -----------------
+    name : str
+        the token name
+    names : list
+        the token names
+    parallel : int
+        the maximum number of concurrent requests
+
+    Returns
+    -------
+    dict, list
+        an empty dict once the token is deleted, or a result per name
+    """
+
+    session = Session.from_kwargs(kwargs)
+    response = delete_items(TokenClient(session.mgmt_client), **kwargs)
+    session.invalidate()
+    return response
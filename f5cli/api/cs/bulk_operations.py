@@ -0,0 +1,177 @@
+""" Bulk create and delete of Cloud Services items, such as Beacon tokens and insights """
+
+import os
+import json
+import glob
+from concurrent.futures import ThreadPoolExecutor
+
+from f5cli import constants
+from f5cli.utils import core as utils_core
+from f5cli.utils import timings
+from f5cli.utils.pagination import get_page_items
+from f5cli.api.exceptions import ApiError
+
+DECLARATION_FILE_PATTERN = '*.json'
+
+
+def _load_declaration(path):
+    """Load a single declaration file
+
+    Parameters
+    ----------
+    path : str
+        the declaration file
+
+    Returns
+    -------
+    tuple
+        a (path, declaration, error) tuple, declaration is None if the file is invalid
+    """
+
+    try:
+        with open(path) as file:
+            declaration = json.load(file)
+    except (IOError, ValueError) as error:
+        return path, None, str(error)
+    if not isinstance(declaration, dict) or not declaration.get('name'):
+        return path, None, "Declaration must be an object containing a 'name'"
+    return path, declaration, None
+
+
+def load_declarations(declaration_dir, parallel=constants.DEFAULT_WORKERS):
+    """Load every declaration file in a directory, concurrently
+
+    Parameters
+    ----------
+    declaration_dir : str
+        the directory containing one JSON declaration file per item
+    parallel : int
+        the maximum number of files read concurrently
+
+    Returns
+    -------
+    list
+        (path, declaration, error) tuples, in file name order
+
+    Raises
+    ------
+    ApiError
+        if the directory does not contain any declaration file
+    """
+
+    paths = sorted(glob.glob(os.path.join(
+        utils_core.convert_to_absolute(declaration_dir), DECLARATION_FILE_PATTERN)))
+    if not paths:
+        raise ApiError('No declaration files found in %s' % declaration_dir)
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        return list(executor.map(_load_declaration, paths))
+
+
+def read_names(names_file):
+    """Read item names, one per line, skipping blank lines and comments
+
+    Parameters
+    ----------
+    names_file : str
+        the names file
+
+    Returns
+    -------
+    list
+        the names, duplicates removed
+    """
+
+    with open(utils_core.convert_to_absolute(names_file)) as file:
+        names = [line.strip() for line in file]
+    return list(dict.fromkeys(
+        name for name in names if name and not name.startswith('#')))
+
+
+def _is_unchanged(declaration, existing):
+    """Check if an existing item already matches every field of a declaration """
+
+    return existing is not None and all(
+        existing.get(key) == value for key, value in declaration.items())
+
+
+def bulk_create(client, declaration_dir, parallel=constants.DEFAULT_WORKERS):
+    """Create an item for each declaration file in a directory
+
+    Notes
+    -----
+    Existing items are listed once up front (in a single request, the list
+    endpoints are not known to support paging), items whose declaration is
+    unchanged are skipped. Remaining items are created concurrently, with
+    at most 'parallel' requests in flight over the client's single session
+
+    Parameters
+    ----------
+    client : object
+        the feature client, such as a TokenClient or InsightsClient
+    declaration_dir : str
+        the directory containing one JSON declaration file per item
+    parallel : int
+        the maximum number of concurrent requests
+
+    Returns
+    -------
+    dict
+        the per-item results
+
+    Raises
+    ------
+    ApiError
+        if there are no declaration files, or the existing items cannot be listed
+    """
+
+    declarations = load_declarations(declaration_dir, parallel)
+    try:
+        existing = {item.get('name'): item for item in get_page_items(client.list())
+                    if isinstance(item, dict)}
+    except Exception as error:
+        raise ApiError('Unable to list the existing items: %s' % error) from error
+
+    def _create(loaded):
+        path, declaration, error = loaded
+        result = {'file': os.path.basename(path)}
+        if error:
+            return dict(result, status='failed', error=error)
+        result['name'] = declaration['name']
+        if _is_unchanged(declaration, existing.get(declaration['name'])):
+            return dict(result, status='unchanged')
+        try:
+            return dict(result, status='created', response=client.create(config=declaration))
+        except Exception as error:  # pylint: disable=broad-except
+            return dict(result, status='failed', error=str(error))
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        return {'results': list(executor.map(timings.propagate(_create), declarations))}
+
+
+def bulk_delete(client, names, parallel=constants.DEFAULT_WORKERS):
+    """Delete each named item
+
+    Parameters
+    ----------
+    client : object
+        the feature client, such as a TokenClient or InsightsClient
+    names : list
+        the names of the items to delete
+    parallel : int
+        the maximum number of concurrent requests
+
+    Returns
+    -------
+    dict
+        the per-item results
+    """
+
+    def _delete(name):
+        try:
+            client.delete(name=name, config={})
+        except Exception as error:  # pylint: disable=broad-except
+            return {'name': name, 'status': 'failed', 'error': str(error)}
+        return {'name': name, 'status': 'deleted'}
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        return {'results': list(executor.map(timings.propagate(_delete), names))}
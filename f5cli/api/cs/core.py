@@ -0,0 +1,206 @@
+"""Cloud Services clients and responses cache, shared by every Cloud Services operation """
+
+import os
+
+from f5sdk.cs import ManagementClient
+
+from f5cli import constants
+from f5cli.config import AuthConfigurationClient, ResponseCacheClient
+from f5cli.utils import core as utils_core
+from f5cli.utils import timings, sharing
+from f5cli.utils.pagination import paginate
+from f5cli.api.cs.bulk_operations import bulk_create, bulk_delete
+
+
+def get_auth():
+    """ Get Cloud Services authentication """
+
+    auth_client = AuthConfigurationClient()
+    return auth_client.read_auth(constants.AUTHENTICATION_PROVIDERS['CS'])
+
+
+@timings.timed('auth.login')
+def get_mgmt_client(auth=None):
+    """ Get Management Client """
+
+    auth = auth or get_auth()
+
+    management_kwargs = dict(
+        user=auth['user'],
+        password=auth['password'],
+        api_endpoint=auth.get('api_endpoint', None)
+    )
+    # reuse the logged in client of the account, while sharing is enabled (f5 batch)
+    return sharing.get_client(
+        (constants.AUTHENTICATION_PROVIDERS['CS'], auth['user'], auth['password'],
+         auth.get('api_endpoint', None)),
+        lambda: ManagementClient(**management_kwargs)
+    )
+
+
+def get_cache_client(auth, no_cache=False):
+    """ Get Response Cache Client, enabled if opted in and not disabled for this command """
+
+    enabled = os.environ.get(constants.ENV_VARS['CS_RESPONSE_CACHE'], '').lower() == 'true'
+    return ResponseCacheClient(
+        account=[auth['user'], auth.get('api_endpoint', None)],
+        enabled=enabled and not no_cache
+    )
+
+
+def get_config_kwargs(declaration):
+    """ Get the create or update arguments of a declaration, either a file or a dict """
+
+    if isinstance(declaration, dict):
+        return {'config': declaration}
+    return {'config_file': utils_core.convert_to_absolute(declaration)}
+
+
+def list_items(list_func, page_size, max_items, **kwargs):
+    """ List items, lazily one page at a time if page size or max items is provided """
+
+    if page_size or max_items:
+        return paginate(list_func, page_size=page_size, max_items=max_items, **kwargs)
+    return list_func(**kwargs)
+
+
+def create_items(client, **kwargs):
+    """ Create a single item, or one item per declaration file in a directory """
+
+    declaration_dir = kwargs.pop('declaration_dir', None)
+    if declaration_dir:
+        return bulk_create(client, declaration_dir,
+                           kwargs.pop('parallel', constants.DEFAULT_WORKERS))
+    return client.create(**get_config_kwargs(kwargs.pop('declaration', None)))
+
+
+def delete_items(client, **kwargs):
+    """ Delete a single item, or each item of a list of names """
+
+    names = kwargs.pop('names', None)
+    if names is not None:
+        return bulk_delete(client, names, kwargs.pop('parallel', constants.DEFAULT_WORKERS))
+    return client.delete(name=kwargs.pop('name', None), config={})
+
+
+class Session:
+    """ A class used to perform operations with the management client and response cache
+    of a Cloud Services account
+
+    Note: The management client is only created (logging in) once required,
+    so responses served from the cache never log in
+
+    Attributes
+    ----------
+    mgmt_client : object
+        the management client
+
+    Methods
+    -------
+    fetch()
+        See method documentation for more details
+    invalidate()
+        See method documentation for more details
+    """
+
+    def __init__(self, **kwargs):
+        """Class initialization
+
+        Parameters
+        ----------
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        client: object
+            the management client to use, created from the CLI authentication if not provided
+        auth: dict
+            the account to create the management client for, instead of the CLI authentication
+        no_cache: bool
+            neither read nor write the response cache
+
+        Returns
+        -------
+        None
+        """
+
+        self._mgmt_client = kwargs.pop('client', None)
+        self._auth = kwargs.pop('auth', None)
+        if self._mgmt_client is None and self._auth is None:
+            self._auth = get_auth()
+        # a provided client may belong to any account, its responses are never cached
+        self._cache_client = None
+        if self._auth is not None:
+            self._cache_client = get_cache_client(self._auth, kwargs.pop('no_cache', False))
+
+    @classmethod
+    def from_kwargs(cls, kwargs):
+        """Create a session from (and removing) the session keyword arguments of an operation
+
+        Parameters
+        ----------
+        kwargs: dict
+            the operation keyword arguments, see __init__
+
+        Returns
+        -------
+        object
+            the session
+        """
+
+        return cls(client=kwargs.pop('client', None), auth=kwargs.pop('auth', None),
+                   no_cache=kwargs.pop('no_cache', False))
+
+    @property
+    def mgmt_client(self):
+        """ The management client, created on first use """
+
+        if self._mgmt_client is None:
+            self._mgmt_client = get_mgmt_client(self._auth)
+        return self._mgmt_client
+
+    def fetch(self, request, fetch, ttl, **kwargs):
+        """ Get the cached response for a request, fetching (and caching) it if required
+
+        Parameters
+        ----------
+        request: list
+            the request, for example the operation name and its arguments
+        fetch: function
+            called with no arguments to fetch the response
+        ttl: int
+            the number of seconds a fetched response is valid for
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        refresh: bool
+            ignore any cached response, the fetched response is still cached
+
+        Returns
+        -------
+        dict
+            the response
+        """
+
+        if self._cache_client is None:
+            return fetch()
+        return self._cache_client.get_or_fetch(request, fetch, ttl,
+                                               refresh=kwargs.pop('refresh', False))
+
+    def invalidate(self):
+        """ Invalidate the cached responses of the account, after a change
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        if self._cache_client is not None:
+            self._cache_client.invalidate()
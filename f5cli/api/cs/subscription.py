@@ -0,0 +1,118 @@
+"""Cloud Services subscription operations
+
+Example::
+
+    subscriptions = list(account_id_filter='a-aaQpLBMaYK')
+    subscription = show('s-xxxxxxxxxx')
+"""
+
+# pylint: disable=redefined-builtin
+
+from f5sdk.cs.subscriptions import SubscriptionClient
+
+from f5cli import constants
+from f5cli.api.cs.core import Session, get_config_kwargs, list_items
+
+
+def list(**kwargs):
+    """List subscriptions
+
+    Parameters
+    ----------
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    client : object
+        the management client to use, created from the CLI authentication if not provided
+    auth : dict
+        the account to create the management client for, instead of the CLI authentication
+    no_cache : bool
+        neither read nor write the response cache
+    refresh : bool
+        ignore any cached response
+    account_id_filter : str
+        only list the subscriptions of this account
+    page_size : int
+        fetch the list one page at a time, using this page size
+    max_items : int
+        stop listing after this many items
+
+    Returns
+    -------
+    dict, generator
+        the subscriptions, a generator of subscriptions if page size or max items is provided
+    """
+
+    session = Session.from_kwargs(kwargs)
+    refresh = kwargs.pop('refresh', False)
+    account_id_filter = kwargs.pop('account_id_filter', None)
+    page_size = kwargs.pop('page_size', None)
+    max_items = kwargs.pop('max_items', None)
+
+    list_kwargs = {}
+    if account_id_filter:
+        list_kwargs['query_parameters'] = {
+            'account_id': account_id_filter
+        }
+    if page_size or max_items:
+        # lazily paginated lists are streamed, not cached
+        return list_items(SubscriptionClient(session.mgmt_client).list,
+                          page_size, max_items, **list_kwargs)
+    return session.fetch(
+        ['subscription', 'list', list_kwargs],
+        lambda: SubscriptionClient(session.mgmt_client).list(**list_kwargs),
+        constants.CS_CACHE_TTL['SUBSCRIPTION_LIST'],
+        refresh=refresh
+    )
+
+
+def show(subscription_id, **kwargs):
+    """Show a subscription
+
+    Parameters
+    ----------
+    subscription_id : str
+        the subscription ID
+    **kwargs :
+        optional keyword arguments, see list() for the client and cache arguments
+
+    Returns
+    -------
+    dict
+        the subscription
+    """
+
+    session = Session.from_kwargs(kwargs)
+    return session.fetch(
+        ['subscription', 'show', subscription_id],
+        lambda: SubscriptionClient(session.mgmt_client).show(name=subscription_id),
+        constants.CS_CACHE_TTL['SUBSCRIPTION_SHOW'],
+        refresh=kwargs.pop('refresh', False)
+    )
+
+
+def update(subscription_id, declaration, **kwargs):
+    """Update a subscription
+
+    Parameters
+    ----------
+    subscription_id : str
+        the subscription ID
+    declaration : str, dict
+        the declaration file, or the declaration itself
+    **kwargs :
+        optional keyword arguments, see list() for the client arguments
+
+    Returns
+    -------
+    dict
+        the updated subscription
+    """
+
+    session = Session.from_kwargs(kwargs)
+    response = SubscriptionClient(session.mgmt_client).update(
+        name=subscription_id, **get_config_kwargs(declaration))
+    session.invalidate()
+    return response
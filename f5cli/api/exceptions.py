@@ -0,0 +1,5 @@
+""" Exceptions raised by the programmatic API """
+
+
+class ApiError(Exception):
+    """ Error raised if an operation is invalid or fails """
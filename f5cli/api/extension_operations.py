@@ -1,8 +1,17 @@
 """ Extension package install, uninstall, upgrade, verify functions """
 
+import json
 import importlib
+from functools import partial, wraps
+from concurrent.futures import ThreadPoolExecutor
 
+from f5sdk import constants as sdk_constants
+from f5sdk.utils import misc_utils
+
+from f5cli import constants
 from f5cli.utils import core as utils_core
+from f5cli.utils import timings
+from f5cli.utils.device_queue import retry_on_busy
 
 COMPONENTS = {
     'as3': {
@@ -16,7 +25,8 @@ COMPONENTS = {
             'delete',
             'show',
             'show-info',
-            'list-versions'
+            'list-versions',
+            'validate'
         ]
     },
     'do': {
@@ -30,7 +40,8 @@ COMPONENTS = {
             'show',
             'show-info',
             'show-inspect',
-            'list-versions'
+            'list-versions',
+            'validate'
         ]
     },
     'ts': {
@@ -43,7 +54,8 @@ COMPONENTS = {
             'create',
             'show',
             'show-info',
-            'list-versions'
+            'list-versions',
+            'validate'
         ]
     },
     'cf': {
@@ -66,6 +78,77 @@ COMPONENTS = {
 }
 
 
+# actions which modify the device, these are serialized per device
+WRITE_ACTIONS = [
+    'install',
+    'uninstall',
+    'upgrade',
+    'create',
+    'delete',
+    'reset',
+    'trigger-failover'
+]
+
+# AS3 tenant that holds shared objects (/Common/Shared), other tenants may reference it
+AS3_COMMON_TENANT = 'Common'
+# messages of the AS3 result of a tenant applied successfully
+AS3_SUCCESS_MESSAGES = ['success', 'no change']
+
+
+def split_declaration_by_tenant(declaration):
+    """Split an AS3 declaration into one declaration per tenant
+
+    Parameters
+    ----------
+    declaration : dict
+        the AS3 declaration, either an 'ADC' class declaration or
+        an 'AS3' class request wrapping one
+
+    Returns
+    -------
+    list
+        a list of (tenant, declaration) tuples, the 'Common' tenant (if any) first
+    """
+
+    wrapper = None
+    adc = declaration
+    if declaration.get('class') == 'AS3':
+        wrapper = {key: val for key, val in declaration.items() if key != 'declaration'}
+        adc = declaration.get('declaration', {})
+
+    tenants = []
+    shared = {}
+    for key, val in adc.items():
+        if isinstance(val, dict) and val.get('class') == 'Tenant':
+            tenants.append(key)
+        else:
+            shared[key] = val
+    # shared objects must exist before any tenant referencing them is applied
+    tenants.sort(key=lambda tenant: tenant != AS3_COMMON_TENANT)
+
+    split = []
+    for tenant in tenants:
+        tenant_declaration = dict(shared)
+        tenant_declaration[tenant] = adc[tenant]
+        if wrapper is not None:
+            tenant_declaration = dict(wrapper, declaration=tenant_declaration)
+        split.append((tenant, tenant_declaration))
+    return split
+
+
+def traced(func):
+    """Record a span for each call of an extension operations client method """
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        # pylint: disable=protected-access
+        with timings.span('extension.%s' % func.__name__.lstrip('_'),
+                          attributes={'f5.component': self._component,
+                                      'f5.version': self._version or 'latest'}):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
 class ExtensionOperationsClient(object):
     """Extension Operations Client"""
 
@@ -104,6 +187,12 @@ class ExtensionOperationsClient(object):
 
         self._extension_client = self._extension_client_attr(self._mgmt_client, **component_kwargs)
 
+    @property
+    def component(self):
+        """ The component name, such as as3 """
+
+        return self._component
+
     @staticmethod
     def _get_extension_client_attr(component):
         """Factory method to get extension client instance
@@ -127,6 +216,7 @@ class ExtensionOperationsClient(object):
 
         return extension_client_class
 
+    @traced
     def install_component_if_required(self, install):
         """Install component - if required
 
@@ -143,6 +233,7 @@ class ExtensionOperationsClient(object):
             self._extension_client.package.install()
             self._extension_client.service.is_available()
 
+    @traced
     def verify_package(self):
         """Verify package
 
@@ -157,6 +248,7 @@ class ExtensionOperationsClient(object):
 
         return self._extension_client.package.is_installed()
 
+    @traced
     def install_package(self):
         """Install package
 
@@ -186,6 +278,7 @@ class ExtensionOperationsClient(object):
             )
         return message
 
+    @traced
     def uninstall_package(self):
         """Uninstall package
 
@@ -208,6 +301,7 @@ class ExtensionOperationsClient(object):
             )
         return message
 
+    @traced
     def upgrade_package(self):
         """Upgrade package
 
@@ -257,6 +351,7 @@ class ExtensionOperationsClient(object):
             )
         return message
 
+    @traced
     def list_package_versions(self):
         """List package versions
 
@@ -271,6 +366,7 @@ class ExtensionOperationsClient(object):
         """
         return self._extension_client.package.list_versions()
 
+    @traced
     def show_service(self):
         """Show service
 
@@ -285,28 +381,175 @@ class ExtensionOperationsClient(object):
 
         return self._extension_client.service.show()
 
+    @traced
     def create_service(self, declaration_file):
         """Create service
 
         Parameters
         ----------
-        declaration_file : str
-            the declaration file to use
+        declaration_file : str, dict
+            the declaration file to use, or the (rendered) declaration itself
 
         Returns
         -------
         None
         """
 
-        if not self._extension_client.package.is_installed()['installed']:
+        install_info = self._extension_client.package.is_installed()
+        if not install_info['installed']:
             return (
                 "Package is not installed, run command "
                 "'f5 bigip extension <component> install'"
             )
-        return self._extension_client.service.create(
-            config_file=utils_core.convert_to_absolute(declaration_file)
-        )
+        if isinstance(declaration_file, dict):
+            declaration = declaration_file
+            create_kwargs = {'config': declaration}
+        else:
+            config_file = utils_core.convert_to_absolute(declaration_file)
+            try:
+                declaration = misc_utils.resolve_config(None, config_file)
+            except Exception:  # pylint: disable=broad-except
+                declaration = None
+            create_kwargs = {'config_file': config_file}
+        if declaration is not None:
+            self._validate_declaration(declaration, install_info.get('installed_version'))
+        return self._extension_client.service.create(**create_kwargs)
+
+    def _validate_declaration(self, declaration, version):
+        """Validate a declaration against the schema of the installed version
+
+        Notes
+        -----
+        This is a best effort pre-flight check, it is skipped if the
+        schema for the version is not available (for example offline)
+
+        Parameters
+        ----------
+        declaration : dict
+            the declaration
+        version : str
+            the installed component version
 
+        Returns
+        -------
+        None
+        """
+
+        # imported on first use, jsonschema is only needed to validate declarations
+        from f5cli.api import schema_validation  # pylint: disable=import-outside-toplevel
+
+        if self._component not in schema_validation.SCHEMA_URLS or not version:
+            return
+        try:
+            validator = schema_validation.get_validator(self._component, version)
+        except Exception:  # pylint: disable=broad-except
+            return
+        errors = schema_validation.validate_declaration(validator, declaration)
+        if errors:
+            raise Exception('Declaration is invalid: %s' % '; '.join(errors))
+
+    @traced
+    def _create_tenant_service(self, tenant, declaration, deadline=None):
+        """Create service for a single tenant using the tenant-scoped endpoint
+
+        Parameters
+        ----------
+        tenant : str
+            the tenant name
+        declaration : dict
+            the declaration containing only this tenant
+        deadline : float
+            monotonic time after which a busy device is no longer retried
+
+        Returns
+        -------
+        list
+            the per-tenant results
+        """
+
+        # pylint: disable=protected-access
+        service = self._extension_client.service
+        try:
+            # concurrent tenant requests may be rejected while the device is busy
+            response, status_code = retry_on_busy(partial(
+                self._mgmt_client.make_request,
+                '%s/%s' % (service._get_configure_endpoint()['uri'], tenant),
+                method='POST',
+                body=declaration,
+                advanced_return=True
+            ), deadline=deadline)
+            if status_code == sdk_constants.HTTP_STATUS_CODE['ACCEPTED']:
+                response = service._wait_for_task(response['selfLink'])
+        except Exception as error:  # pylint: disable=broad-except
+            return [{'tenant': tenant, 'message': 'failed', 'error': str(error)}]
+        return (response or {}).get('results', [{'tenant': tenant, 'message': 'success'}])
+
+    @staticmethod
+    def _is_tenant_failure(result):
+        """ Check a tenant result failed, such as a declaration rejected by AS3 (422) """
+
+        return result.get('code', 200) >= 400 or \
+            result.get('message', AS3_SUCCESS_MESSAGES[0]) not in AS3_SUCCESS_MESSAGES
+
+    @traced
+    def create_service_by_tenant(self, declaration_file, parallel=constants.DEFAULT_WORKERS,
+                                 deadline=None):
+        """Create service, submitting each tenant of the declaration separately
+
+        Notes
+        -----
+        The 'Common' tenant is applied first, remaining tenants are applied
+        concurrently with at most 'parallel' requests in flight. Every tenant
+        is submitted even if another fails, the failures are raised once all
+        tenants complete
+
+        Parameters
+        ----------
+        declaration_file : str, dict
+            the declaration file to use, or the (rendered) declaration itself
+        parallel : int
+            the maximum number of concurrent tenant requests
+        deadline : float
+            monotonic time after which a busy device is no longer retried
+
+        Returns
+        -------
+        dict
+            the merged per-tenant results
+        """
+
+        install_info = self._extension_client.package.is_installed()
+        if not install_info['installed']:
+            return (
+                "Package is not installed, run command "
+                "'f5 bigip extension <component> install'"
+            )
+        if isinstance(declaration_file, dict):
+            declaration = declaration_file
+        else:
+            declaration = misc_utils.resolve_config(
+                None, utils_core.convert_to_absolute(declaration_file))
+        self._validate_declaration(declaration, install_info.get('installed_version'))
+        split = split_declaration_by_tenant(declaration)
+        if not split:
+            raise Exception('Declaration does not contain any tenants')
+
+        tenants = len(split)
+        results = []
+        if split[0][0] == AS3_COMMON_TENANT:
+            results.extend(self._create_tenant_service(*split.pop(0), deadline=deadline))
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            create = timings.propagate(
+                lambda item: self._create_tenant_service(*item, deadline=deadline))
+            for tenant_results in executor.map(create, split):
+                results.extend(tenant_results)
+        failed = [result.get('tenant') for result in results if self._is_tenant_failure(result)]
+        if failed:
+            raise Exception('%d of %d tenants failed (%s): %s' % (
+                len(failed), tenants, ', '.join(failed), json.dumps(results, indent=4)))
+        return {'results': results}
+
+    @traced
     def delete_service(self):
         """Delete service
 
@@ -321,6 +564,7 @@ class ExtensionOperationsClient(object):
 
         return self._extension_client.service.delete()
 
+    @traced
     def show_info_service(self):
         """Show Info service
 
@@ -335,6 +579,7 @@ class ExtensionOperationsClient(object):
 
         return self._extension_client.service.show_info()
 
+    @traced
     def show_failover_service(self):
         """Show Failover service
 
@@ -349,6 +594,7 @@ class ExtensionOperationsClient(object):
 
         return self._extension_client.service.show_trigger()
 
+    @traced
     def trigger_failover_service(self, declaration_file):
         """Trigger service
 
@@ -366,6 +612,7 @@ class ExtensionOperationsClient(object):
             config_file=utils_core.convert_to_absolute(declaration_file)
         )
 
+    @traced
     def show_inspect_service(self):
         """Show Inspect service
 
@@ -380,6 +627,7 @@ class ExtensionOperationsClient(object):
 
         return self._extension_client.service.show_inspect()
 
+    @traced
     def reset_service(self, declaration_file):
         """Reset service
 
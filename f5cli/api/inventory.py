@@ -0,0 +1,331 @@
+"""BIG-IP inventory, the facts of every configured device, cached locally
+
+Refreshing gathers the facts, installed extension versions and extension
+availability of the devices concurrently, each field only once expired.
+Showing reads the cached inventory only, and never connects to the devices
+
+Example::
+
+    refresh(targets=['bigip_1', 'bigip_2'])
+    devices = show(query=['as3<3.30', 'version>=15.1'])
+"""
+
+import re
+import datetime
+import importlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from f5cli import constants
+from f5cli.config import AuthConfigurationClient, InventoryClient
+from f5cli.utils import timings
+from .bigip import get_mgmt_client
+from .exceptions import ApiError
+from .extension_operations import COMPONENTS
+
+INVENTORY_FIELDS = list(constants.INVENTORY_TTL)
+QUERY_OPERATORS = {
+    '=': lambda left, right: left == right,
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right
+}
+# such as as3<3.30, version>=15.1 or available=as3
+QUERY_REGEX = re.compile(r'^\s*([\w.]+)\s*(==|!=|<=|>=|=|<|>)\s*(.*?)\s*$')
+VERSION_REGEX = re.compile(r'^\d+(\.\d+)*$')
+
+
+def _get_extension_client(component, client):
+    """ Get the extension client of a component, such as an AS3Client """
+
+    # imported on first use, as by the extension operations client
+    module = importlib.import_module('f5sdk.bigip.extension')
+    return getattr(module, COMPONENTS[component]['client'])(client)
+
+
+def get_accounts(targets=None):
+    """Get the BIG-IP authentication accounts of the targets
+
+    Parameters
+    ----------
+    targets : list
+        the account names, or hosts, defaults to every BIG-IP account
+
+    Returns
+    -------
+    list
+        the accounts
+
+    Raises
+    ------
+    ApiError
+        if a target is not a configured BIG-IP account
+    """
+
+    accounts = [account for account in AuthConfigurationClient().list_auth() or []
+                if account.get('authentication-type') ==
+                constants.AUTHENTICATION_PROVIDERS['BIGIP'] and account.get('host')]
+    if not targets:
+        if not accounts:
+            raise ApiError(
+                'No BIG-IP authentication accounts, see \'f5 config auth create\'')
+        return accounts
+    selected = []
+    for target in targets:
+        matches = [account for account in accounts if target in (account['name'],
+                                                                 account['host'])]
+        if not matches:
+            raise ApiError(
+                'Target \'%s\' is not a BIG-IP authentication account, see '
+                '\'f5 config auth create\'' % target)
+        selected.extend(match for match in matches if match not in selected)
+    return selected
+
+
+def _get_extensions(client):
+    """ Get the installed version of each extension, None if not installed """
+
+    extensions = {}
+    for component in COMPONENTS:
+        installed = _get_extension_client(component, client).package.is_installed()
+        extensions[component] = installed['installed_version'] if installed['installed'] \
+            else None
+    return extensions
+
+
+def _get_availability(client):
+    """ Get whether the service of each extension responds """
+
+    availability = {}
+    for component in COMPONENTS:
+        try:
+            _get_extension_client(component, client).service.show_info()
+            availability[component] = True
+        except Exception:  # pylint: disable=broad-except
+            availability[component] = False
+    return availability
+
+
+def _refresh_device(account, fields):
+    """ Gather the fields of a device, a failed field is an Exception """
+
+    with timings.span('inventory.refresh', attributes={'f5.host': account['host']}):
+        try:
+            client = get_mgmt_client(auth=account)
+        except Exception as error:  # pylint: disable=broad-except
+            return {field: error for field in fields}
+        gather = {
+            'facts': client.get_info,
+            'extensions': lambda: _get_extensions(client),
+            'availability': lambda: _get_availability(client)
+        }
+        refreshed = {}
+        for field in fields:
+            try:
+                refreshed[field] = gather[field]()
+            except Exception as error:  # pylint: disable=broad-except
+                refreshed[field] = error
+        return refreshed
+
+
+def _refresh_devices(inventory_client, accounts, stale, parallel):
+    """ Refresh the stale fields of the accounts concurrently, updating the inventory """
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = {
+            executor.submit(timings.propagate(_refresh_device), account,
+                            stale[account['name']]): account
+            for account in accounts if stale[account['name']]
+        }
+        # a single writer, the inventory is updated as each device completes
+        for future in as_completed(futures):
+            account = futures[future]
+            refreshed = future.result()
+            inventory_client.update(account['name'],
+                                    {'host': account['host'], 'port': account.get('port')},
+                                    refreshed)
+            results[account['name']] = refreshed
+    return results
+
+
+def refresh(targets=None, **kwargs):
+    """Refresh the inventory of the targets, gathering expired fields only
+
+    Parameters
+    ----------
+    targets : list
+        the account names, or hosts, defaults to every BIG-IP account
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    fields : list
+        the fields to refresh, such as facts, extensions or availability, defaults to all
+    force : bool
+        refresh the fields even if not expired
+    parallel : int
+        the maximum number of devices refreshed concurrently
+
+    Returns
+    -------
+    list
+        the refreshed and still valid (cached) fields of each target, and any errors
+    """
+
+    fields = kwargs.pop('fields', None) or INVENTORY_FIELDS
+    force = kwargs.pop('force', False)
+    parallel = kwargs.pop('parallel', constants.DEFAULT_WORKERS)
+
+    accounts = get_accounts(targets)
+    inventory_client = InventoryClient()
+    devices = inventory_client.read()
+    stale = {}
+    for account in accounts:
+        device = devices.get(account['name'])
+        if force or not device or device.get('host') != account['host']:
+            stale[account['name']] = list(fields)
+        else:
+            stale[account['name']] = inventory_client.get_stale_fields(device, fields)
+
+    results = _refresh_devices(inventory_client, accounts, stale, parallel)
+
+    summary = []
+    for account in accounts:
+        refreshed = results.get(account['name'], {})
+        summary.append({
+            'name': account['name'],
+            'host': account['host'],
+            'refreshed': [field for field, value in refreshed.items()
+                          if not isinstance(value, Exception)],
+            'cached': [field for field in fields if field not in stale[account['name']]],
+            'errors': {field: str(value) for field, value in refreshed.items()
+                       if isinstance(value, Exception)}
+        })
+    return summary
+
+
+def _get_record(inventory_client, name, device):
+    """ Get the flat record of a cached device, used to show and query it """
+
+    cached = device.get('fields', {})
+    values = {field: cached.get(field, {}).get('value') or {} for field in INVENTORY_FIELDS}
+    record = {
+        'name': name,
+        'host': device.get('host'),
+        'port': device.get('port'),
+        'version': values['facts'].get('version')
+    }
+    for component in COMPONENTS:
+        record[component] = values['extensions'].get(component)
+    record['available'] = sorted(component for component, available
+                                 in values['availability'].items() if available)
+    updated = [entry['updated'] for entry in cached.values()]
+    record['updated'] = datetime.datetime.utcfromtimestamp(min(updated)).strftime(
+        '%Y-%m-%dT%H:%M:%SZ') if updated else None
+    record['stale'] = inventory_client.get_stale_fields(device)
+    return record
+
+
+def parse_version(value):
+    """ Parse a dotted version, such as 3.30 or 15.1.0.2, None if not a version """
+
+    if isinstance(value, str) and VERSION_REGEX.match(value):
+        return tuple(int(part) for part in value.split('.'))
+    return None
+
+
+def parse_query(query):
+    """Parse query conditions, such as as3<3.30
+
+    Parameters
+    ----------
+    query : list
+        the conditions, each may also contain comma separated conditions
+
+    Returns
+    -------
+    list
+        the (field, operator, value) of each condition
+
+    Raises
+    ------
+    ApiError
+        if a condition is invalid
+    """
+
+    fields = ['name', 'host', 'port', 'version', 'available', 'stale'] + list(COMPONENTS)
+    conditions = []
+    for condition in [part for item in query or [] for part in item.split(',') if part.strip()]:
+        match = QUERY_REGEX.match(condition)
+        if not match:
+            raise ApiError(
+                'Invalid query \'%s\', expected <field><operator><value>, such as as3<3.30'
+                % condition)
+        field, operator, value = match.groups()
+        if field not in fields:
+            raise ApiError('Invalid query field \'%s\', expected one of: %s'
+                           % (field, ', '.join(fields)))
+        if field in ['available', 'stale'] and operator not in ['=', '==', '!=']:
+            raise ApiError('Query field \'%s\' only supports = and !=' % field)
+        conditions.append((field, operator, value))
+    return conditions
+
+
+def _matches(record, condition):
+    """ Check a record matches a condition, versions are compared numerically """
+
+    field, operator, value = condition
+    actual = record[field]
+    if isinstance(actual, list):
+        # lists match when they contain the value
+        return (value in actual) == (operator != '!=')
+    if value.lower() == 'none':
+        value = None
+    if actual is None or value is None:
+        # such as as3=none, only equality is meaningful for a missing value
+        return operator in ['=', '==', '!='] and QUERY_OPERATORS[operator](actual, value)
+    actual = str(actual)
+    left, right = parse_version(actual), parse_version(value)
+    if left is not None and right is not None:
+        # pad with zeros, so 3.30 == 3.30.0
+        length = max(len(left), len(right))
+        actual = left + (0,) * (length - len(left))
+        value = right + (0,) * (length - len(right))
+    return QUERY_OPERATORS[operator](actual, value)
+
+
+def show(targets=None, query=None):
+    """Show the cached inventory, without connecting to the devices
+
+    Parameters
+    ----------
+    targets : list
+        the device (account) names, or hosts, defaults to every cached device
+    query : list
+        the conditions every device shown matches, such as as3<3.30
+
+    Returns
+    -------
+    list
+        the record of each device, with its stale fields
+
+    Raises
+    ------
+    ApiError
+        if the query is invalid
+    """
+
+    conditions = parse_query(query)
+    inventory_client = InventoryClient()
+    records = []
+    for name, device in sorted(inventory_client.read().items()):
+        if targets and name not in targets and device.get('host') not in targets:
+            continue
+        record = _get_record(inventory_client, name, device)
+        if all(_matches(record, condition) for condition in conditions):
+            records.append(record)
+    return records
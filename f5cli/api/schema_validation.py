@@ -0,0 +1,301 @@
+""" Local validation of extension declarations against the published JSON schema
+
+Example::
+
+    results = validate_files('as3', '3.18.0', ['decl.json'])
+"""
+
+import os
+import re
+import json
+import time
+import pathlib
+from functools import lru_cache
+from urllib.parse import urljoin, urldefrag
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+import jsonschema
+
+from f5sdk.bigip.extension.extension_metadata import MetadataClient
+
+from f5cli import constants
+
+SCHEMA_URLS = {
+    'as3': 'https://raw.githubusercontent.com/F5Networks/f5-appsvcs-extension/'
+           'v{version}/schema/{version}/as3-schema-{version}-{build}.json',
+    'do': 'https://raw.githubusercontent.com/F5Networks/f5-declarative-onboarding/'
+          'v{version}/src/schema/{version}/base.schema.json',
+    'ts': 'https://raw.githubusercontent.com/F5Networks/f5-telemetry-streaming/'
+          'v{version}/src/schema/{version}/base_schema.json'
+}
+SCHEMA_DOWNLOAD_TIMEOUT = 30
+# number of seconds a failed schema download is not attempted again
+SCHEMA_DOWNLOAD_RETRY_INTERVAL = 300
+URL_REGEX = re.compile(r'^https?://')
+
+
+def get_schema_url(component, version=None):
+    """Get the published schema URL for a component version
+
+    Parameters
+    ----------
+    component : str
+        the component name
+    version : str
+        the component version, the latest version if not provided
+
+    Returns
+    -------
+    tuple
+        a (version, url) tuple
+    """
+
+    metadata_client = MetadataClient(component, version)
+    # the package build number, such as 4 in 'f5-appsvcs-3.18.0-4.noarch'
+    build = metadata_client.get_package_name().rsplit('-', 1)[-1].split('.')[0]
+    return metadata_client.version, SCHEMA_URLS[component].format(
+        version=metadata_client.version, build=build)
+
+
+def _get_cache_path(url):
+    """Get the cache file of a published schema document """
+
+    return os.path.join(constants.F5_CLI_SCHEMA_DIR,
+                        re.sub(r'[^\w.-]', '_', URL_REGEX.sub('', url)))
+
+
+def _download(url):
+    """Download a published schema document, once
+
+    Notes
+    -----
+    Documents are cached in the F5 CLI schema directory. A failed download
+    is not attempted again for SCHEMA_DOWNLOAD_RETRY_INTERVAL seconds, so
+    checks which are skipped without the schema do not wait on the network
+    """
+
+    path = _get_cache_path(url)
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (IOError, ValueError):
+        pass
+
+    failed_path = '%s.failed' % path
+    if os.path.exists(failed_path) and \
+            os.path.getmtime(failed_path) + SCHEMA_DOWNLOAD_RETRY_INTERVAL > time.time():
+        raise Exception('Schema %s is not available, its download recently failed' % url)
+    if not os.path.exists(constants.F5_CLI_SCHEMA_DIR):
+        os.makedirs(constants.F5_CLI_SCHEMA_DIR, exist_ok=True)
+    try:
+        response = requests.get(url, timeout=SCHEMA_DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        loaded = response.json()
+    except Exception:
+        with open(failed_path, 'w'):
+            pass
+        raise
+
+    tmp_path = '%s.%s.tmp' % (path, os.getpid())
+    with open(tmp_path, 'w') as file:
+        json.dump(loaded, file)
+    os.replace(tmp_path, path)
+    if os.path.exists(failed_path):
+        os.remove(failed_path)
+    return loaded
+
+
+def _get_references(document):
+    """Get the (external) document references of a schema document """
+
+    if isinstance(document, dict):
+        for key, value in document.items():
+            if key == '$ref' and isinstance(value, str) and not value.startswith('#'):
+                yield value
+            else:
+                yield from _get_references(value)
+    elif isinstance(document, list):
+        for value in document:
+            yield from _get_references(value)
+
+
+def _download_references(url, document):
+    """Download every published schema document referenced by a document, recursively """
+
+    pending = [(url, document)]
+    downloaded = {url}
+    while pending:
+        url, document = pending.pop()
+        # references are relative to the document id, as when resolved
+        base_uri = document.get('$id', url) if isinstance(document, dict) else url
+        for reference in _get_references(document):
+            reference_url = urldefrag(urljoin(base_uri, reference))[0]
+            if URL_REGEX.match(reference_url) and reference_url not in downloaded:
+                downloaded.add(reference_url)
+                pending.append((reference_url, _download(reference_url)))
+
+
+def _read_json(location):
+    """Read JSON from a local file or URL """
+
+    if URL_REGEX.match(location):
+        response = requests.get(location, timeout=SCHEMA_DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    with open(location) as file:
+        return json.load(file)
+
+
+def load_schema(component, version=None, schema=None):
+    """Load a component schema, downloading it once per version
+
+    Notes
+    -----
+    Published schemas, and the documents they reference, are cached in
+    the F5 CLI schema directory, so only the first validation against a
+    version needs the network
+
+    Parameters
+    ----------
+    component : str
+        the component name
+    version : str
+        the component version, the latest version if not provided
+    schema : str
+        a schema file or URL, used instead of the published schema
+
+    Returns
+    -------
+    tuple
+        a (base uri, schema) tuple, the base uri is used to resolve references
+    """
+
+    if schema:
+        if URL_REGEX.match(schema):
+            return schema, _read_json(schema)
+        path = os.path.abspath(schema)
+        return pathlib.Path(path).as_uri(), _read_json(path)
+
+    if component not in SCHEMA_URLS:
+        raise Exception('Declaration validation is not supported for %s' % component)
+    _, url = get_schema_url(component, version)
+    loaded = _download(url)
+    _download_references(url, loaded)
+    return url, loaded
+
+
+@lru_cache(maxsize=None)
+def get_validator(component, version=None, schema=None):
+    """Get the compiled schema validator, compiled once per version (per process)
+
+    Parameters
+    ----------
+    component : str
+        the component name
+    version : str
+        the component version, the latest version if not provided
+    schema : str
+        a schema file or URL, used instead of the published schema
+
+    Returns
+    -------
+    object
+        the jsonschema validator
+    """
+
+    base_uri, loaded = load_schema(component, version, schema)
+    validator_class = jsonschema.validators.validator_for(loaded)
+    validator_class.check_schema(loaded)
+    # references of published schemas are read from the cache
+    handlers = {} if schema else {'http': _download, 'https': _download}
+    return validator_class(
+        loaded,
+        resolver=jsonschema.RefResolver(base_uri, loaded, handlers=handlers),
+        format_checker=jsonschema.FormatChecker()
+    )
+
+
+def validate_declaration(validator, declaration):
+    """Validate a declaration
+
+    Parameters
+    ----------
+    validator : object
+        the jsonschema validator
+    declaration : dict
+        the declaration
+
+    Returns
+    -------
+    list
+        the validation errors, empty if the declaration is valid
+    """
+
+    errors = sorted(validator.iter_errors(declaration), key=lambda error: list(error.path))
+    return ['/%s: %s' % ('/'.join(str(part) for part in error.path), error.message)
+            for error in errors]
+
+
+def _validate_file(component, version, schema, path):
+    """Validate a single declaration file (run in a worker process) """
+
+    result = {'file': path}
+    try:
+        with open(path) as file:
+            declaration = json.load(file)
+    except (IOError, ValueError) as error:
+        return dict(result, valid=False, errors=[str(error)])
+    errors = validate_declaration(get_validator(component, version, schema), declaration)
+    return dict(result, valid=not errors, errors=errors)
+
+
+def get_declaration_files(declaration):
+    """Get the declaration files, a single file or every JSON file in a directory """
+
+    if os.path.isdir(declaration):
+        return sorted(os.path.join(declaration, name) for name in os.listdir(declaration)
+                      if name.endswith('.json'))
+    return [declaration]
+
+
+def validate_files(component, version, paths, **kwargs):
+    """Validate declaration files, in parallel worker processes if there are several
+
+    Parameters
+    ----------
+    component : str
+        the component name
+    version : str
+        the component version, the latest version if not provided
+    paths : list
+        the declaration files
+    **kwargs:
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    schema: str
+        a schema file or URL, used instead of the published schema
+    parallel: int
+        the maximum number of worker processes
+
+    Returns
+    -------
+    list
+        the per-file results
+    """
+
+    schema = kwargs.pop('schema', None)
+    parallel = kwargs.pop('parallel', constants.DEFAULT_WORKERS)
+
+    # compile in this process first, so the schema is downloaded (and cached) once
+    get_validator(component, version, schema)
+    if len(paths) == 1 or parallel == 1:
+        return [_validate_file(component, version, schema, path) for path in paths]
+    with ProcessPoolExecutor(max_workers=min(parallel, len(paths))) as executor:
+        return list(executor.map(
+            _validate_file,
+            *zip(*[(component, version, schema, path) for path in paths]),
+            chunksize=max(1, len(paths) // (parallel * 4))
+        ))
@@ -0,0 +1,347 @@
+"""Extension upgrade plans, computed from the cached inventory without connecting to the devices
+
+A plan lists the upgrade of each installed extension of each device to the
+target version, with its estimated duration. Durations are estimated from the
+timings of earlier upgrades, recorded in the metrics file (see --metrics-file).
+A plan is replayed one component at a time, see replay()
+
+Example::
+
+    upgrade_plan = plan(targets=['bigip_1'], versions={'as3': '3.20.0'})
+    results = replay('as3', upgrade_plan)
+"""
+
+import os
+import json
+import heapq
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from f5cli import constants
+from f5cli.config import InventoryClient, ResponseCacheClient
+from f5cli.utils import timings
+from f5cli.utils.metrics import read_samples
+from .bigip import get_mgmt_client, extension
+from .exceptions import ApiError
+from .extension_operations import COMPONENTS
+from .inventory import get_accounts, parse_version
+
+PLAN_ACTIONS = {
+    'UPGRADE': 'upgrade',
+    'CURRENT': 'current',
+    'SKIP': 'skip'
+}
+ESTIMATE_SOURCES = {
+    'HISTORY': 'history',
+    'DEFAULT': 'default'
+}
+
+
+def _version_key(version):
+    """ Sort key of a version, versions which do not parse sort first """
+
+    return parse_version(version) or ()
+
+
+def get_package_versions(refresh=False):
+    """Get the available versions of each extension, cached for a day
+
+    Notes
+    -----
+    The metadata is downloaded, as by the list-versions action, falling
+    back to the metadata included in the F5 SDK if it cannot be
+
+    Parameters
+    ----------
+    refresh : bool
+        download the metadata, even if cached
+
+    Returns
+    -------
+    dict
+        the versions (oldest first) and latest version, keyed by component
+
+        ::
+
+            {
+                'as3': {'versions': ['3.17.0', '3.18.0'], 'latest': '3.18.0'}
+            }
+    """
+
+    def _fetch():
+        # imported on first use, only needed when the metadata is not cached
+        # pylint: disable=import-outside-toplevel
+        from f5sdk.bigip.extension.extension_metadata import MetadataClient
+
+        metadata = MetadataClient(list(COMPONENTS)[0], None,
+                                  use_latest_metadata=True).extension_metadata
+        versions = {}
+        for component in COMPONENTS:
+            details = metadata['components'].get(component, {}).get('versions', {})
+            versions[component] = {
+                'versions': sorted(details, key=_version_key),
+                'latest': ([version for version, info in details.items()
+                            if info.get('latest')] or [None])[0]
+            }
+        return versions
+
+    cache_client = ResponseCacheClient(account=['extension-metadata'], enabled=True)
+    return cache_client.get_or_fetch(['bigip', 'extension', 'list-versions'], _fetch,
+                                     constants.EXTENSION_METADATA_TTL, refresh=refresh)
+
+
+def get_duration_estimates(metrics_file=None):
+    """Get the estimated duration of an upgrade of each extension
+
+    Parameters
+    ----------
+    metrics_file : str
+        the metrics file recording earlier upgrades, none are used if not provided
+
+    Returns
+    -------
+    dict
+        the (seconds, source) of each component, the source is history when
+        estimated from earlier upgrades, otherwise default
+    """
+
+    samples = read_samples(metrics_file) if metrics_file else {}
+    estimates = {}
+    for component in COMPONENTS:
+        labels = (('component', component), ('action', 'upgrade'))
+        count = samples.get(('f5cli_operation_duration_seconds_count', labels), 0)
+        if count:
+            estimates[component] = (
+                round(samples[('f5cli_operation_duration_seconds_sum', labels)] / count, 3),
+                ESTIMATE_SOURCES['HISTORY'])
+        else:
+            estimates[component] = (float(constants.DEFAULT_UPGRADE_SECONDS),
+                                    ESTIMATE_SOURCES['DEFAULT'])
+    return estimates
+
+
+def _get_duration(durations, parallel):
+    """ Get the duration of running durations, up to parallel at a time, longest first """
+
+    workers = [0.0] * min(parallel, len(durations))
+    for duration in sorted(durations, reverse=True):
+        heapq.heappush(workers, heapq.heappop(workers) + duration)
+    return max(workers or [0.0])
+
+
+def _get_devices(targets):
+    """ Get the cached devices of the targets, every cached device if none """
+
+    devices = InventoryClient().read()
+    if not targets:
+        if not devices:
+            raise ApiError(
+                'The inventory is empty, see \'f5 bigip inventory refresh\'')
+        return sorted(devices.items())
+    selected = []
+    for target in targets:
+        matches = [(name, device) for name, device in sorted(devices.items())
+                   if target in (name, device.get('host'))]
+        if not matches:
+            raise ApiError(
+                'Target \'%s\' is not in the inventory, see \'f5 bigip inventory refresh\''
+                % target)
+        selected.extend(match for match in matches if match not in selected)
+    return selected
+
+
+def _check_versions(versions, components, package_versions):
+    """ Check the target versions are planned and available """
+
+    for component, version in versions.items():
+        if component not in components:
+            raise ApiError('Component \'%s\' is not planned' % component)
+        if version not in package_versions[component]['versions']:
+            raise ApiError(
+                'Version \'%s\' of \'%s\' is not available, expected one of: %s'
+                % (version, component, ', '.join(package_versions[component]['versions'])))
+
+
+def _plan_step(name, device, component, target, **kwargs):
+    """ Plan the upgrade step of a device extension, to the target version
+
+    Keyword Arguments
+    -----------------
+    stale : bool
+        the installed versions are stale
+    estimate : tuple
+        the estimated (seconds, source) of an upgrade of the component
+    """
+
+    installed_versions = device.get('fields', {}).get('extensions', {}).get('value')
+    step = {
+        'name': name,
+        'host': device.get('host'),
+        'component': component,
+        'installed': (installed_versions or {}).get(component),
+        'version': target,
+        'stale': kwargs.pop('stale', False)
+    }
+    if installed_versions is None:
+        step.update(action=PLAN_ACTIONS['SKIP'], reason='installed versions unknown')
+    elif step['installed'] is None:
+        step.update(action=PLAN_ACTIONS['SKIP'], reason='not installed')
+    elif _version_key(step['installed']) == _version_key(target):
+        step.update(action=PLAN_ACTIONS['CURRENT'])
+    elif _version_key(step['installed']) > _version_key(target):
+        step.update(action=PLAN_ACTIONS['SKIP'], reason='newer than the target version')
+    else:
+        estimate = kwargs.pop('estimate')
+        step.update(action=PLAN_ACTIONS['UPGRADE'],
+                    estimated_seconds=estimate[0],
+                    estimate=estimate[1])
+    return step
+
+
+def _plan_summary(steps, components, parallel):
+    """ Summarize the planned steps, estimating the duration of the upgrades """
+
+    upgrades = [step for step in steps if step['action'] == PLAN_ACTIONS['UPGRADE']]
+    return {
+        'devices': len(set(step['name'] for step in upgrades)),
+        'upgrades': len(upgrades),
+        'stale': sorted(set(step['name'] for step in steps if step['stale'])),
+        'parallel': parallel,
+        'total_seconds': round(sum(step['estimated_seconds'] for step in upgrades), 3),
+        # each component is replayed separately, devices concurrently
+        'estimated_seconds': round(sum(_get_duration(
+            [step['estimated_seconds'] for step in upgrades
+             if step['component'] == component], parallel)
+            for component in components), 3)
+    }
+
+
+def plan(targets=None, **kwargs):
+    """Plan the extension upgrades of the targets, without connecting to the devices
+
+    Parameters
+    ----------
+    targets : list
+        the device (account) names, or hosts, defaults to every cached device
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    components : list
+        the extensions to upgrade, such as as3, defaults to every extension
+    versions : dict
+        the target version of each extension, defaults to the latest version
+    parallel : int
+        the number of devices upgraded concurrently, used to estimate the duration
+    metrics_file : str
+        the metrics file recording earlier upgrades, used to estimate durations
+    refresh_metadata : bool
+        download the extension versions metadata, even if cached
+
+    Returns
+    -------
+    dict
+        the plan: a step per device and installed extension, and a summary
+
+    Raises
+    ------
+    ApiError
+        if a target is not in the inventory, or a version is not available
+    """
+
+    components = kwargs.pop('components', None) or list(COMPONENTS)
+    versions = kwargs.pop('versions', None) or {}
+    parallel = kwargs.pop('parallel', constants.DEFAULT_WORKERS)
+    devices = _get_devices(targets)
+    package_versions = get_package_versions(refresh=kwargs.pop('refresh_metadata', False))
+    _check_versions(versions, components, package_versions)
+    estimates = get_duration_estimates(kwargs.pop('metrics_file', None))
+    inventory_client = InventoryClient()
+
+    steps = []
+    for name, device in devices:
+        stale = 'extensions' in inventory_client.get_stale_fields(device, ['extensions'])
+        for component in components:
+            target = versions.get(component) or package_versions[component]['latest']
+            steps.append(_plan_step(name, device, component, target,
+                                    stale=stale, estimate=estimates[component]))
+
+    return {
+        'created': datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'steps': steps,
+        'summary': _plan_summary(steps, components, parallel)
+    }
+
+
+def _replay_step(step, queue_timeout):
+    """ Replay an upgrade step, unless the device already runs the version """
+
+    result = {key: step[key] for key in ['name', 'host', 'component', 'version']}
+    with timings.span('upgrade.replay', attributes={'f5.host': step['host'],
+                                                    'f5.component': step['component']}):
+        try:
+            client = get_mgmt_client(auth=get_accounts([step['name']])[0])
+            installed = extension(step['component'], 'verify', client=client)
+            if installed['installed'] and installed['installed_version'] == step['version']:
+                return dict(result, status=PLAN_ACTIONS['CURRENT'])
+            message = extension(step['component'], 'upgrade', client=client,
+                                version=step['version'], queue_timeout=queue_timeout)
+            return dict(result, status='success', message=message)
+        except Exception as error:  # pylint: disable=broad-except
+            return dict(result, status='failure', error=str(error))
+
+
+def replay(component, upgrade_plan, **kwargs):
+    """Replay the upgrade steps of a component of a plan
+
+    Parameters
+    ----------
+    component : str
+        the extension component, such as as3
+    upgrade_plan : str, dict
+        the plan file, or the plan itself
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    parallel : int
+        the maximum number of devices upgraded concurrently
+    queue_timeout : int
+        the number of seconds to wait for other operations against a device to complete
+
+    Returns
+    -------
+    list
+        the result of each upgrade step
+
+    Raises
+    ------
+    ApiError
+        if the plan cannot be read, or an upgrade fails
+    """
+
+    parallel = kwargs.pop('parallel', constants.DEFAULT_WORKERS)
+    queue_timeout = kwargs.pop('queue_timeout', constants.DEFAULT_QUEUE_TIMEOUT)
+
+    if not isinstance(upgrade_plan, dict):
+        try:
+            with open(os.path.expanduser(upgrade_plan)) as file:
+                upgrade_plan = json.load(file)
+        except (IOError, ValueError) as error:
+            raise ApiError('Unable to read plan %s: %s' % (upgrade_plan, error)) from error
+    steps = [step for step in upgrade_plan.get('steps', [])
+             if step.get('component') == component and
+             step.get('action') == PLAN_ACTIONS['UPGRADE']]
+    if not steps:
+        return []
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        results = list(executor.map(
+            timings.propagate(lambda step: _replay_step(step, queue_timeout)), steps))
+    failed = [result for result in results if result['status'] == 'failure']
+    if failed:
+        raise ApiError('%d of %d upgrades failed: %s' % (
+            len(failed), len(results), json.dumps(results, indent=4)))
+    return results
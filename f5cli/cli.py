@@ -2,12 +2,19 @@
 
 import os
 import sys
+import functools
+from contextlib import ExitStack, contextmanager
 
 import click
+import jmespath
 
 from f5cli import constants
 from f5cli import docs
-from f5cli.utils.core import format_output
+from f5cli.utils.core import format_output, format_output_records, get_output_format
+from f5cli.utils.profiling import CommandProfiler, MemoryProfiler, get_profile_path
+from f5cli.utils.profiling import is_profile_disabled
+from f5cli.utils.profiling import memory_checkpoint
+from f5cli.utils import timings
 from f5cli.config import ConfigurationClient
 from f5cli.config.telemetry import TelemetryClient
 
@@ -16,6 +23,16 @@ DOC = docs.get_docs()
 
 CONTEXT_SETTINGS = dict(auto_envvar_prefix='f5cli')
 CMD_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), 'commands'))
+# click options require a value, these options may be given without one (before
+# the command name), in which case the value here is used
+OPTIONAL_VALUE_OPTIONS = {
+    '--profile': '',
+    '--timings': 'table',
+    '--http-stats': 'table'
+}
+REPORT_FORMATS = ['table', 'json']
+HTTP_STATS_COLUMNS = ['method', 'host', 'path', 'count', 'sent_bytes', 'received_bytes',
+                      'p50_ms', 'p95_ms', 'max_ms']
 
 
 class Context():
@@ -24,16 +41,41 @@ class Context():
     def __init__(self):
         self.verbose = False
         self.home = os.getcwd()
+        # optional keyword arguments passed to format_output, set using global options
+        self.output_options = {}
+        self._output_format = None
+        # stream log messages are written to, stderr unless captured (such as by f5 batch)
+        self.output = None
 
-    @staticmethod
-    def log(msg, *args):
+    @property
+    def output_format(self):
+        """Output format, discovered once and then reused for every log call"""
+        if self._output_format is None:
+            self._output_format = get_output_format()
+        return self._output_format
+
+    @output_format.setter
+    def output_format(self, value):
+        self._output_format = value
+
+    def log(self, msg, *args):
         """Logs a message"""
 
         # if args are provided, assume string formatting is required
         if args:
             msg %= args
 
-        click.echo(format_output(msg), file=sys.stderr)
+        stream = sys.stderr if self.output is None else self.output
+        with timings.span('format_output'):
+            # stream NDJSON records as they are produced
+            if self.output_format == constants.FORMATS['NDJSON']:
+                for record in format_output_records(msg, query=self.output_options.get('query')):
+                    click.echo(record, file=stream)
+                return
+
+            output = format_output(msg, output_format=self.output_format, **self.output_options)
+            memory_checkpoint()
+            click.echo(output, file=stream)
 
     def vlog(self, msg, *args):
         """Logs a message only if verbose is enabled."""
@@ -44,6 +86,25 @@ class Context():
 PASS_CONTEXT = click.make_pass_decorator(Context, ensure=True)
 
 
+def compile_query(ctx, param, value):  # pylint: disable=unused-argument
+    """ Compile the --query option once, so it is not parsed per log call """
+
+    if value is None:
+        return None
+    try:
+        return jmespath.compile(value)
+    except jmespath.exceptions.ParseError as error:
+        raise click.BadParameter(str(error))
+
+
+def parse_profile(ctx, param, value):  # pylint: disable=unused-argument
+    """ Disable the --profile option for a false value, such as F5_CLI_PROFILE=false """
+
+    if is_profile_disabled(value):
+        return None
+    return value
+
+
 class AliasedGroup(click.Group):
     """ Alias group class for click. """
 
@@ -60,9 +121,171 @@ class AliasedGroup(click.Group):
         ctx.fail('Too many matches: %s' % ', '.join(sorted(matches)))
 
 
+def report_api_errors(func):
+    """ Report the errors of the programmatic API called by a command as command errors """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # imported on demand, only the commands calling the programmatic API import it
+        from f5cli.api.exceptions import ApiError  # pylint: disable=import-outside-toplevel
+        try:
+            return func(*args, **kwargs)
+        except ApiError as error:
+            raise click.ClickException(str(error)) from error
+    return wrapper
+
+
+def get_command_name(ctx):
+    """ Get the command name, such as 'f5 bigip extension as3 show', without any options """
+
+    words = ['f5']
+    for arg in ctx.protected_args + ctx.args:
+        if arg.startswith('-'):
+            break
+        words.append(arg)
+    return ' '.join(words)
+
+
+@contextmanager
+def export_trace(ctx, destination):
+    """ Export a trace of the invocation, to a file or a collector """
+
+    # imported on demand, requests is slow to import and not every command needs it
+    from f5cli.utils.tracing import Tracer  # pylint: disable=import-outside-toplevel
+
+    command = get_command_name(ctx)
+    tracer = Tracer(command, traceparent=os.environ.get(constants.ENV_VARS['TRACE_PARENT']),
+                    attributes={'f5.command': command})
+    try:
+        with tracer:
+            yield
+    finally:
+        try:
+            tracer.export(destination)
+        except Exception as error:  # pylint: disable=broad-except
+            ctx.ensure_object(Context).log('Unable to export trace to %s: %s', destination, error)
+
+
+def echo_report(ctx, data):
+    """ Write an instrument report to stderr, in the output format of the command
+
+    The output options (--query, --columns, etc.) only apply to the output
+    of the command itself, not to the report
+    """
+
+    click.echo(format_output(data, output_format=ctx.ensure_object(Context).output_format),
+               file=sys.stderr)
+
+
+@contextmanager
+def report_timings(ctx, output_format):  # pylint: disable=unused-argument
+    """ Log the time spent in each phase of the invocation """
+
+    timings.enable()
+    try:
+        with timings.span('total'):
+            yield
+    finally:
+        rows = timings.get_timings(timings.disable(), indent=output_format != 'json')
+        click.echo(format_output(rows, output_format=output_format,
+                                 columns=['phase', 'start_ms', 'duration_ms']),
+                   file=sys.stderr)
+
+
+@contextmanager
+def report_profile(ctx, profile):
+    """ Log the slowest functions of the invocation, optionally dumping the pstats data """
+
+    profiler = CommandProfiler(get_profile_path(profile))
+    try:
+        with profiler:
+            yield
+    finally:
+        echo_report(ctx, profiler.summary())
+        if profiler.dump():
+            echo_report(ctx, 'Profile data written to %s' % get_profile_path(profile))
+
+
+@contextmanager
+def report_memory_profile(ctx, memprofile):  # pylint: disable=unused-argument
+    """ Log the peak traced memory of the invocation and the largest allocation sites """
+
+    profiler = MemoryProfiler()
+    try:
+        with profiler:
+            yield
+    finally:
+        echo_report(ctx, profiler.summary())
+        echo_report(ctx, 'Peak traced memory: %.1f MiB' % (profiler.peak / (1024 * 1024)))
+
+
+@contextmanager
+def report_http_stats(ctx, output_format):  # pylint: disable=unused-argument
+    """ Log the HTTP requests made by the invocation, per endpoint """
+
+    # imported on demand, requests is slow to import and not every command needs it
+    from f5cli.utils import http_stats  # pylint: disable=import-outside-toplevel
+
+    http_stats.enable()
+    try:
+        yield
+    finally:
+        rows = http_stats.get_http_stats(http_stats.disable())
+        click.echo(format_output(rows, output_format=output_format,
+                                 columns=HTTP_STATS_COLUMNS),
+                   file=sys.stderr)
+
+
+@contextmanager
+def write_metrics(ctx, path):
+    """ Write the metrics of the invocation to a Prometheus textfile """
+
+    # imported on demand, requests is slow to import and not every command needs it
+    from f5cli.utils.metrics import MetricsRecorder  # pylint: disable=import-outside-toplevel
+
+    recorder = MetricsRecorder(path)
+    try:
+        with recorder:
+            yield
+    finally:
+        try:
+            recorder.flush()
+        except Exception as error:  # pylint: disable=broad-except
+            ctx.ensure_object(Context).log('Unable to write metrics to %s: %s', path, error)
+
+
+# (option, instrument) pairs, outermost first
+INSTRUMENTS = [
+    ('metrics_file', write_metrics),
+    ('trace_export', export_trace),
+    ('timings_format', report_timings),
+    ('profile', report_profile),
+    ('memprofile', report_memory_profile),
+    ('http_stats_format', report_http_stats)
+]
+
+
 class CLI(click.MultiCommand):
     """ Base click class for the CLI. """
 
+    def parse_args(self, ctx, args):
+        commands = self.list_commands(ctx)
+        args = list(args)
+        for index, arg in enumerate(args):
+            if arg in commands:
+                break
+            if arg in OPTIONAL_VALUE_OPTIONS:
+                args[index] = '%s=%s' % (arg, OPTIONAL_VALUE_OPTIONS[arg])
+        return super(CLI, self).parse_args(ctx, args)
+
+    def invoke(self, ctx):
+        # instrument the whole invocation, including the command module import
+        with ExitStack() as stack:
+            for param, instrument in INSTRUMENTS:
+                if ctx.params.get(param) not in [None, False]:
+                    stack.enter_context(instrument(ctx, ctx.params[param]))
+            return super(CLI, self).invoke(ctx)
+
     def list_commands(self, ctx):
         ret = []
         for _dir in os.listdir(CMD_FOLDER):
@@ -77,32 +300,93 @@ class CLI(click.MultiCommand):
             if sys.version_info[0] == 2:
                 cmd_name = cmd_name.encode('ascii', 'replace')
             cmd_name = cmd_name.replace('-', '_')
-            mod = __import__('f5cli.commands.cmd_' + cmd_name, None, None, ['cli'])
+            with timings.span('import.%s' % cmd_name):
+                mod = __import__('f5cli.commands.cmd_' + cmd_name, None, None, ['cli'])
         except ImportError as error:
             ctx.log(error)
         return mod.cli
 
 
-# pylint: disable=too-many-arguments
+# the instrument options are performed by CLI.invoke, not by the command itself
+# pylint: disable=too-many-arguments,unused-argument
 @click.command(cls=CLI,
                context_settings=CONTEXT_SETTINGS,
                help=DOC[('CLI_HELP')])
 @click.version_option(constants.VERSION)
+@click.option('--columns',
+              required=False,
+              metavar='<COLUMN,...>',
+              help=DOC['COLUMNS_HELP'])
+@click.option('--max-column-width',
+              required=False,
+              type=click.IntRange(min=1),
+              help=DOC['MAX_COLUMN_WIDTH_HELP'])
+@click.option('--query',
+              required=False,
+              metavar='<JMESPATH>',
+              callback=compile_query,
+              help=DOC['QUERY_HELP'])
+@click.option('--profile',
+              required=False,
+              metavar='[=<PATH>]',
+              envvar=constants.ENV_VARS['PROFILE'],
+              callback=parse_profile,
+              help=DOC['PROFILE_HELP'])
+@click.option('--metrics-file',
+              required=False,
+              metavar='<PATH>',
+              envvar=constants.ENV_VARS['METRICS_FILE'],
+              help=DOC['METRICS_FILE_HELP'])
+@click.option('--trace-export',
+              required=False,
+              metavar='<PATH|URL>',
+              envvar=constants.ENV_VARS['TRACE_EXPORT'],
+              help=DOC['TRACE_EXPORT_HELP'])
+@click.option('--memprofile',
+              is_flag=True,
+              default=False,
+              help=DOC['MEMPROFILE_HELP'])
+@click.option('--timings',
+              'timings_format',
+              required=False,
+              metavar='[=table|json]',
+              type=click.Choice(REPORT_FORMATS),
+              help=DOC['TIMINGS_HELP'])
+@click.option('--http-stats',
+              'http_stats_format',
+              required=False,
+              metavar='[=table|json]',
+              type=click.Choice(REPORT_FORMATS),
+              help=DOC['HTTP_STATS_HELP'])
 @PASS_CONTEXT
-def cli(ctx='', home=''):
+def cli(ctx='', columns=None, max_column_width=None, query=None,
+        profile=None, memprofile=False, metrics_file=None, trace_export=None,
+        timings_format=None, http_stats_format=None, home=''):
     """ main cli """
 
     if home is not None:
         ctx.home = home
 
+    if columns:
+        ctx.output_options['columns'] = [column.strip() for column in columns.split(',')]
+    if max_column_width:
+        ctx.output_options['max_column_width'] = max_column_width
+    if query:
+        ctx.output_options['query'] = query
+
     # set environment variable for SSL warnings if value provided in config
     ctx.loaded_config = ConfigurationClient().list()
+    ctx.output_format = get_output_format(ctx.loaded_config)
     if 'disableSSLWarnings' in ctx.loaded_config.keys():
         os.environ[constants.ENV_VARS['DISABLE_SSL_WARNINGS']] = \
             ctx.loaded_config.get('disableSSLWarnings')
+    if 'csResponseCache' in ctx.loaded_config.keys():
+        os.environ.setdefault(constants.ENV_VARS['CS_RESPONSE_CACHE'],
+                              str(ctx.loaded_config.get('csResponseCache')))
 
-    telemetry_client = TelemetryClient(context=ctx)
-    telemetry_client.report()
+    with timings.span('telemetry'):
+        telemetry_client = TelemetryClient(context=ctx)
+        telemetry_client.report()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,219 @@
+""" Batch command """
+
+import io
+import os
+import json
+import time
+import shlex
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import FIRST_COMPLETED, ALL_COMPLETED
+
+import click
+
+from f5cli import docs, constants
+from f5cli.cli import PASS_CONTEXT, Context, INSTRUMENTS
+from f5cli.utils import sharing
+
+HELP = docs.get_docs()
+
+# commands changing the configuration or authentication used by the lines after them,
+# these run once the lines before them complete and before the lines after them start
+BARRIER_COMMANDS = ['login', 'config']
+BATCH_STATUSES = {
+    'SUCCESS': 'success',
+    'FAILURE': 'failure',
+    'SKIPPED': 'skipped'
+}
+
+Line = namedtuple('Line', ['number', 'text', 'args'])
+
+
+def get_instrument_params(root):
+    """ Get the global options of the instruments, such as --timings
+
+    The instruments record the whole process, including other lines running concurrently,
+    so these are options of the batch instead of its lines
+    """
+
+    names = [name for name, _ in INSTRUMENTS]
+    return [param for param in root.params if param.name in names]
+
+
+def get_global_options(args):
+    """ Get the names of the global options of a line, such as '--timings' """
+
+    options = []
+    for arg in args:
+        if not arg.startswith('-'):
+            break
+        options.append(arg.split('=', 1)[0])
+    return options
+
+
+def read_lines(file, instrument_options=()):
+    """ Read the command lines of a batch, validating every line before any is run
+
+    Blank lines and comments are ignored, a leading 'f5' is optional
+    """
+
+    lines = []
+    for number, text in enumerate(file, start=1):
+        text = text.strip()
+        try:
+            args = shlex.split(text, comments=True)
+        except ValueError as error:
+            raise click.ClickException('Line %s: %s' % (number, error))
+        if args and args[0] == 'f5':
+            args = args[1:]
+        if not args:
+            continue
+        if args[0] == 'batch':
+            raise click.ClickException('Line %s: batch commands cannot be nested' % number)
+        for option in get_global_options(args):
+            if option in instrument_options:
+                raise click.ClickException(
+                    'Line %s: %s records the whole process, use \'f5 %s batch\' instead'
+                    % (number, option, option))
+        lines.append(Line(number, text, args))
+    return lines
+
+
+def get_command(line):
+    """ Get the command of a line, such as 'bigip', skipping any global options """
+
+    for arg in line.args:
+        if not arg.startswith('-'):
+            return arg
+    return None
+
+
+@contextmanager
+def unset_environment(names):
+    """ Unset the environment variables while in the context, restoring them on exit """
+
+    values = {name: os.environ.pop(name) for name in names if name in os.environ}
+    try:
+        yield
+    finally:
+        os.environ.update(values)
+
+
+def run_line(root, line):
+    """ Run a line in this process, capturing its output """
+
+    context = Context()
+    context.output = io.StringIO()
+    result = {'line': line.number, 'command': line.text}
+    start = time.monotonic()
+    exit_code = 0
+    error = None
+    try:
+        return_value = root.main(args=line.args, prog_name='f5', obj=context,
+                                 standalone_mode=False)
+        # click returns the exit code of a command exiting early, such as for --help
+        if isinstance(return_value, int):
+            exit_code = return_value
+    except click.ClickException as exception:
+        exit_code, error = exception.exit_code, str(exception.format_message())
+    except click.Abort:
+        exit_code, error = 1, 'Aborted!'
+    except Exception as exception:  # pylint: disable=broad-except
+        exit_code, error = 1, '%s: %s' % (type(exception).__name__, exception)
+
+    output = context.output.getvalue().strip()
+    try:
+        output = json.loads(output) if output else None
+    except ValueError:
+        pass
+    result.update({
+        'status': BATCH_STATUSES['FAILURE'] if exit_code else BATCH_STATUSES['SUCCESS'],
+        'exit_code': exit_code,
+        'duration_ms': round((time.monotonic() - start) * 1000, 3),
+        'output': output,
+        'error': error
+    })
+    return result
+
+
+def run_lines(run, lines, parallel, stop_on_error):
+    """ Run the lines, up to parallel at a time, generating their results as they complete
+
+    Lines running a barrier command run alone, once stopping on error the remaining
+    lines are skipped
+    """
+
+    stopped = False
+    pending = set()
+    after_barrier = False
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        for line in lines:
+            barrier = get_command(line) in BARRIER_COMMANDS
+            while pending and not stopped and (
+                    barrier or after_barrier or len(pending) >= parallel):
+                done, pending = wait(pending, return_when=(
+                    ALL_COMPLETED if barrier or after_barrier else FIRST_COMPLETED))
+                for future in done:
+                    result = future.result()
+                    stopped = stopped or (stop_on_error and
+                                          result['status'] == BATCH_STATUSES['FAILURE'])
+                    yield result
+            if stopped:
+                yield {'line': line.number, 'command': line.text,
+                       'status': BATCH_STATUSES['SKIPPED']}
+                continue
+            pending.add(executor.submit(run, line))
+            after_barrier = barrier
+        for future in as_completed(pending):
+            yield future.result()
+
+
+@click.command('batch',
+               help=HELP['BATCH_HELP'])
+@click.option('--file',
+              'commands_file',
+              default='-',
+              type=click.File('r'),
+              metavar='<FILE>',
+              help=HELP['BATCH_FILE_HELP'])
+@click.option('--parallel',
+              default=1,
+              type=click.IntRange(min=1),
+              help=HELP['BATCH_PARALLEL_HELP'])
+@click.option('--stop-on-error',
+              default=False,
+              is_flag=True,
+              help=HELP['BATCH_STOP_ON_ERROR_HELP'])
+@PASS_CONTEXT
+def cli(ctx, commands_file, parallel, stop_on_error):
+    """ command """
+
+    root_ctx = click.get_current_context().find_root()
+    root = root_ctx.command
+    instrument_params = get_instrument_params(root)
+    lines = read_lines(commands_file,
+                       instrument_options=[opt for param in instrument_params
+                                           for opt in param.opts])
+    # the instruments enabled by environment variables already record the batch,
+    # so the lines do not enable them again
+    instrument_envvars = [
+        param.envvar or '%s_%s' % (root_ctx.auto_envvar_prefix, param.name.upper())
+        for param in instrument_params
+    ]
+    # one compact JSON result per line, written as each line completes
+    ctx.output_format = constants.FORMATS['NDJSON']
+    failed = 0
+    sharing.enable()
+    try:
+        with unset_environment(instrument_envvars):
+            for result in run_lines(lambda line: run_line(root, line), lines, parallel,
+                                    stop_on_error):
+                if result['status'] != BATCH_STATUSES['SUCCESS']:
+                    failed += 1
+                ctx.log(result)
+    finally:
+        sharing.disable()
+    if failed:
+        raise click.ClickException('%s of %s commands failed or were skipped'
+                                   % (failed, len(lines)))
@@ -5,18 +5,32 @@
 import click_repl
 import click
 
-from f5sdk.bigip import ManagementClient
-
 from f5cli import docs, constants
-from f5cli.commands.cmd_bigip.extension_operations import ExtensionOperationsClient, COMPONENTS
-from f5cli.config import AuthConfigurationClient
-from f5cli.cli import PASS_CONTEXT, AliasedGroup
-from f5cli.commands.cmd_bigip.extension_operations import check_install
+from f5cli.api import bigip as bigip_api
+from f5cli.api import inventory as inventory_api
+from f5cli.api import upgrade as upgrade_api
+from f5cli.api.extension_operations import COMPONENTS
+from f5cli.cli import PASS_CONTEXT, AliasedGroup, report_api_errors
 from f5cli.utils.core import verify_approval
 
 HELP = docs.get_docs()
 
 
+def extension_action(component, action, **kwargs):
+    """ Perform an extension action, or replay the upgrades of a plan (--plan) """
+
+    upgrade_plan = kwargs.pop('upgrade_plan', None)
+    if upgrade_plan is None:
+        return bigip_api.extension(component, action, **kwargs)
+    if action != 'upgrade' or kwargs.get('version'):
+        raise click.ClickException(
+            'The --plan option is only supported by the upgrade action, without --version'
+        )
+    return upgrade_api.replay(component, upgrade_plan,
+                              parallel=kwargs.get('parallel', constants.DEFAULT_WORKERS),
+                              queue_timeout=kwargs['queue_timeout'])
+
+
 # group: bigip
 @click.group('bigip',
              help=HELP['BIGIP_HELP'],
@@ -53,8 +67,37 @@ def extension():
               default=False,
               is_flag=True,
               metavar='<AUTO-APPROVE>')
+@click.option('--queue-timeout',
+              default=constants.DEFAULT_QUEUE_TIMEOUT,
+              type=click.IntRange(min=0),
+              help=HELP['BIGIP_EXTENSION_QUEUE_TIMEOUT_HELP'])
+@click.option('--split-tenants',
+              default=False,
+              is_flag=True,
+              help=HELP['BIGIP_EXTENSION_SPLIT_TENANTS_HELP'])
+@click.option('--parallel',
+              default=constants.DEFAULT_WORKERS,
+              type=click.IntRange(min=1),
+              help=HELP['BIGIP_EXTENSION_PARALLEL_HELP'])
+@click.option('--schema',
+              required=False,
+              help=HELP['BIGIP_EXTENSION_SCHEMA_HELP'])
+@click.option('--template',
+              required=False,
+              help=HELP['BIGIP_EXTENSION_TEMPLATE_HELP'])
+@click.option('--vars',
+              'vars_file',
+              required=False,
+              help=HELP['BIGIP_EXTENSION_VARS_HELP'])
+@click.option('--plan',
+              'upgrade_plan',
+              required=False,
+              metavar='<FILE>',
+              help=HELP['BIGIP_EXTENSION_PLAN_HELP'])
 @PASS_CONTEXT
-def command_as3(ctx, action, version, declaration, package_url, auto_approve):
+@report_api_errors
+def command_as3(ctx, action, version, declaration, package_url, auto_approve, queue_timeout,
+                split_tenants, parallel, schema, template, vars_file, upgrade_plan):
     """ command """
 
     approval_confirmation_map = {
@@ -62,19 +105,20 @@ def command_as3(ctx, action, version, declaration, package_url, auto_approve):
         'uninstall': 'AS3 package will be uninstalled'
     }
     verify_approval(action, approval_confirmation_map, auto_approve)
-    extension_operations_client = ExtensionOperationsClient(
-        get_mgmt_client(),
+    ctx.log(extension_action(
         'as3',
-        version,
-        package_url)
-    extension_operations_client.install_component_if_required(check_install(action))
-    output = process_extension_component_command(
-        extension_operations_client,
-        COMPONENTS['as3']['actions'],
         action,
-        declaration=declaration
-    )
-    ctx.log(output)
+        version=version,
+        package_url=package_url,
+        declaration=declaration,
+        template=template,
+        vars_file=vars_file,
+        split_tenants=split_tenants,
+        parallel=parallel,
+        schema=schema,
+        queue_timeout=queue_timeout,
+        upgrade_plan=upgrade_plan
+    ))
 
 
 @extension.command('do',
@@ -94,27 +138,43 @@ def command_as3(ctx, action, version, declaration, package_url, auto_approve):
               default=False,
               is_flag=True,
               metavar='<AUTO-APPROVE>')
+@click.option('--queue-timeout',
+              default=constants.DEFAULT_QUEUE_TIMEOUT,
+              type=click.IntRange(min=0),
+              help=HELP['BIGIP_EXTENSION_QUEUE_TIMEOUT_HELP'])
+@click.option('--parallel',
+              default=constants.DEFAULT_WORKERS,
+              type=click.IntRange(min=1),
+              help=HELP['BIGIP_EXTENSION_PARALLEL_HELP'])
+@click.option('--schema',
+              required=False,
+              help=HELP['BIGIP_EXTENSION_SCHEMA_HELP'])
+@click.option('--plan',
+              'upgrade_plan',
+              required=False,
+              metavar='<FILE>',
+              help=HELP['BIGIP_EXTENSION_PLAN_HELP'])
 @PASS_CONTEXT
-def command_do(ctx, action, version, declaration, package_url, auto_approve):
+@report_api_errors
+def command_do(ctx, action, version, declaration, package_url, auto_approve,
+               queue_timeout, parallel, schema, upgrade_plan):
     """ command """
+
     approval_confirmation_map = {
         'uninstall': 'DO package will be uninstalled'
     }
     verify_approval(action, approval_confirmation_map, auto_approve)
-    extension_operations_client = ExtensionOperationsClient(
-        get_mgmt_client(),
+    ctx.log(extension_action(
         'do',
-        version,
-        package_url
-    )
-    extension_operations_client.install_component_if_required(check_install(action))
-    output = process_extension_component_command(
-        extension_operations_client,
-        COMPONENTS['do']['actions'],
         action,
-        declaration=declaration
-    )
-    ctx.log(output)
+        version=version,
+        package_url=package_url,
+        declaration=declaration,
+        parallel=parallel,
+        schema=schema,
+        queue_timeout=queue_timeout,
+        upgrade_plan=upgrade_plan
+    ))
 
 
 @extension.command('ts',
@@ -134,27 +194,43 @@ def command_do(ctx, action, version, declaration, package_url, auto_approve):
               default=False,
               is_flag=True,
               metavar='<AUTO-APPROVE>')
+@click.option('--queue-timeout',
+              default=constants.DEFAULT_QUEUE_TIMEOUT,
+              type=click.IntRange(min=0),
+              help=HELP['BIGIP_EXTENSION_QUEUE_TIMEOUT_HELP'])
+@click.option('--parallel',
+              default=constants.DEFAULT_WORKERS,
+              type=click.IntRange(min=1),
+              help=HELP['BIGIP_EXTENSION_PARALLEL_HELP'])
+@click.option('--schema',
+              required=False,
+              help=HELP['BIGIP_EXTENSION_SCHEMA_HELP'])
+@click.option('--plan',
+              'upgrade_plan',
+              required=False,
+              metavar='<FILE>',
+              help=HELP['BIGIP_EXTENSION_PLAN_HELP'])
 @PASS_CONTEXT
-def command_ts(ctx, action, version, declaration, package_url, auto_approve):
+@report_api_errors
+def command_ts(ctx, action, version, declaration, package_url, auto_approve,
+               queue_timeout, parallel, schema, upgrade_plan):
     """ command """
+
     approval_confirmation_map = {
         'uninstall': 'TS package will be uninstalled'
     }
     verify_approval(action, approval_confirmation_map, auto_approve)
-    extension_operations_client = ExtensionOperationsClient(
-        get_mgmt_client(),
+    ctx.log(extension_action(
         'ts',
-        version,
-        package_url
-    )
-    extension_operations_client.install_component_if_required(check_install(action))
-    output = process_extension_component_command(
-        extension_operations_client,
-        COMPONENTS['ts']['actions'],
         action,
-        declaration=declaration
-    )
-    ctx.log(output)
+        version=version,
+        package_url=package_url,
+        declaration=declaration,
+        parallel=parallel,
+        schema=schema,
+        queue_timeout=queue_timeout,
+        upgrade_plan=upgrade_plan
+    ))
 
 
 @extension.command('cf',
@@ -174,76 +250,151 @@ def command_ts(ctx, action, version, declaration, package_url, auto_approve):
               default=False,
               is_flag=True,
               metavar='<AUTO-APPROVE>')
+@click.option('--queue-timeout',
+              default=constants.DEFAULT_QUEUE_TIMEOUT,
+              type=click.IntRange(min=0),
+              help=HELP['BIGIP_EXTENSION_QUEUE_TIMEOUT_HELP'])
+@click.option('--plan',
+              'upgrade_plan',
+              required=False,
+              metavar='<FILE>',
+              help=HELP['BIGIP_EXTENSION_PLAN_HELP'])
 @PASS_CONTEXT
-def command_cf(ctx, action, version, declaration, package_url, auto_approve):
+@report_api_errors
+def command_cf(ctx, action, version, declaration, package_url, auto_approve,
+               queue_timeout, upgrade_plan):
     """ command """
     approval_confirmation_map = {
         'uninstall': 'CF package will be uninstalled',
         'reset': 'CF service will be reset'
     }
     verify_approval(action, approval_confirmation_map, auto_approve)
-    extension_operations_client = ExtensionOperationsClient(
-        get_mgmt_client(),
+    ctx.log(extension_action(
         'cf',
-        version,
-        package_url
-    )
-    extension_operations_client.install_component_if_required(check_install(action))
-    output = process_extension_component_command(
-        extension_operations_client,
-        COMPONENTS['cf']['actions'],
         action,
-        declaration=declaration
-    )
-    ctx.log(output)
+        version=version,
+        package_url=package_url,
+        declaration=declaration,
+        queue_timeout=queue_timeout,
+        upgrade_plan=upgrade_plan
+    ))
 
 
-def get_mgmt_client():
-    """ Get Management Client """
+@extension.command('plan',
+                   help=HELP['BIGIP_EXTENSION_PLAN_COMMAND_HELP'])
+@click.option('--targets',
+              multiple=True,
+              metavar='<TARGETS>',
+              help=HELP['BIGIP_INVENTORY_TARGETS_HELP'])
+@click.option('--components',
+              multiple=True,
+              type=click.Choice(list(COMPONENTS)),
+              help=HELP['BIGIP_EXTENSION_PLAN_COMPONENTS_HELP'])
+@click.option('--version',
+              'versions',
+              multiple=True,
+              metavar='<COMPONENT=VERSION>',
+              help=HELP['BIGIP_EXTENSION_PLAN_VERSION_HELP'])
+@click.option('--parallel',
+              default=constants.DEFAULT_WORKERS,
+              type=click.IntRange(min=1),
+              help=HELP['BIGIP_EXTENSION_PARALLEL_HELP'])
+@click.option('--history',
+              required=False,
+              envvar=constants.ENV_VARS['METRICS_FILE'],
+              metavar='<FILE>',
+              help=HELP['BIGIP_EXTENSION_PLAN_HISTORY_HELP'])
+@click.option('--refresh-metadata',
+              default=False,
+              is_flag=True,
+              help=HELP['BIGIP_EXTENSION_PLAN_REFRESH_METADATA_HELP'])
+@PASS_CONTEXT
+@report_api_errors
+def command_plan(ctx, targets, components, versions, parallel, history, refresh_metadata):
+    """ command """
 
-    auth_client = AuthConfigurationClient()
-    auth = auth_client.read_auth(constants.AUTHENTICATION_PROVIDERS['BIGIP'])
+    target_versions = {}
+    for item in split_values(versions):
+        component, _, version = item.partition('=')
+        if component not in COMPONENTS or not version:
+            raise click.BadParameter('expected <component>=<version>, such as as3=3.20.0',
+                                     param_hint='--version')
+        target_versions[component] = version
+    ctx.log(upgrade_api.plan(
+        targets=split_values(targets),
+        components=list(components),
+        versions=target_versions,
+        parallel=parallel,
+        metrics_file=history,
+        refresh_metadata=refresh_metadata
+    ))
+
+
+def split_values(values):
+    """ Split repeated, and comma separated, option values """
+
+    return [value.strip() for item in values for value in item.split(',') if value.strip()]
+
+
+# group: inventory
+@cli.group('inventory',
+           help=HELP['BIGIP_INVENTORY_HELP'])
+def inventory():
+    """ group """
 
-    management_kwargs = dict(
-        port=auth['port'],
-        user=auth['user'],
-        password=auth['password']
+
+@inventory.command('refresh',
+                   help=HELP['BIGIP_INVENTORY_REFRESH_HELP'])
+@click.option('--targets',
+              multiple=True,
+              metavar='<TARGETS>',
+              help=HELP['BIGIP_INVENTORY_TARGETS_HELP'])
+@click.option('--fields',
+              multiple=True,
+              type=click.Choice(inventory_api.INVENTORY_FIELDS),
+              help=HELP['BIGIP_INVENTORY_FIELDS_HELP'])
+@click.option('--force',
+              default=False,
+              is_flag=True,
+              help=HELP['BIGIP_INVENTORY_FORCE_HELP'])
+@click.option('--parallel',
+              default=constants.DEFAULT_WORKERS,
+              type=click.IntRange(min=1),
+              help=HELP['BIGIP_INVENTORY_PARALLEL_HELP'])
+@PASS_CONTEXT
+@report_api_errors
+def inventory_refresh(ctx, targets, fields, force, parallel):
+    """ command """
+
+    results = inventory_api.refresh(
+        targets=split_values(targets),
+        fields=list(fields),
+        force=force,
+        parallel=parallel
     )
-    return ManagementClient(auth['host'], **management_kwargs)
-
-
-def process_extension_component_command(client, allowed_actions, action, **kwargs):
-    """ Process extension component actions """
-
-    declaration = kwargs.pop('declaration', None)
-
-    if action not in allowed_actions:
-        raise click.ClickException('Action \'{}\' not implemented'.format(action))
-
-    try:
-        actions_switch = {
-            'verify': client.verify_package,
-            'install': client.install_package,
-            'uninstall': client.uninstall_package,
-            'upgrade': client.upgrade_package,
-            'list-versions': client.list_package_versions,
-            'show': client.show_service,
-            'create': client.create_service,
-            'delete': client.delete_service,
-            'show-info': client.show_info_service,
-            'show-failover': client.show_failover_service,
-            'trigger-failover': client.trigger_failover_service,
-            'show-inspect': client.show_inspect_service,
-            'reset': client.reset_service,
-        }
-        action_to_perform = actions_switch.get(action, lambda: None)
-        # process any optional function arguments
-        args = []
-        if action in ['create', 'trigger-failover', 'reset']:
-            args.append(declaration)
-        return action_to_perform(*args)
-    except Exception as error:
-        raise click.ClickException(error)
+    ctx.log(results)
+    failed = [result for result in results if result['errors']]
+    if failed:
+        raise click.ClickException('%s of %s devices failed to refresh'
+                                   % (len(failed), len(results)))
+
+
+@inventory.command('show',
+                   help=HELP['BIGIP_INVENTORY_SHOW_HELP'])
+@click.option('--targets',
+              multiple=True,
+              metavar='<TARGETS>',
+              help=HELP['BIGIP_INVENTORY_TARGETS_HELP'])
+@click.option('--where',
+              multiple=True,
+              metavar='<CONDITION>',
+              help=HELP['BIGIP_INVENTORY_WHERE_HELP'])
+@PASS_CONTEXT
+@report_api_errors
+def inventory_show(ctx, targets, where):
+    """ command """
+
+    ctx.log(inventory_api.show(targets=split_values(targets), query=list(where)))
 
 
 click_repl.register_repl(cli)
@@ -32,18 +32,23 @@ def cli(ctx):
               help=HELP['ALLOW_TELEMETRY_HELP'])
 @click.option('--disable-ssl-warnings',
               help=HELP['SSL_WARNINGS'])
+@click.option('--cs-response-cache',
+              help=HELP['CS_RESPONSE_CACHE_HELP'])
 @click.option('--auto-approve',
               default=False,
               is_flag=True,
               metavar='<AUTO-APPROVE>')
 @PASS_CONTEXT
-def set_defaults(ctx, output, allow_telemetry, disable_ssl_warnings, auto_approve):
+def set_defaults(ctx,  # pylint: disable=too-many-arguments
+                 output, allow_telemetry, disable_ssl_warnings, cs_response_cache,
+                 auto_approve):
     """ command """
     # Process any changed defaults
     new_defaults = {}
     for i in [{'key': 'output', 'inputValue': output},
               {'key': 'allowTelemetry', 'inputValue': allow_telemetry},
-              {'key': 'disableSSLWarnings', 'inputValue': disable_ssl_warnings}]:
+              {'key': 'disableSSLWarnings', 'inputValue': disable_ssl_warnings},
+              {'key': 'csResponseCache', 'inputValue': cs_response_cache}]:
         if i['inputValue'] is not None:
             new_defaults[i['key']] = i['inputValue']
     approval_confirmation_map = {'set-defaults': 'Defaults will be edited.'}
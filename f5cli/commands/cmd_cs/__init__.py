@@ -1,36 +1,84 @@
 """ Cloud services command """
 
+# pylint: disable=too-many-arguments
+
+import functools
+
 import click_repl
 import click
 
-from f5sdk.cs import ManagementClient
-from f5sdk.cs.accounts import AccountClient
-from f5sdk.cs.subscriptions import SubscriptionClient
-from f5sdk.cs.beacon.insights import InsightsClient
-from f5sdk.cs.beacon.declare import DeclareClient
-from f5sdk.cs.beacon.token import TokenClient
-
 from f5cli import docs
-from f5cli.cli import PASS_CONTEXT, AliasedGroup
-from f5cli.config import AuthConfigurationClient
+from f5cli.api.cs import account as account_api
+from f5cli.api.cs import subscription as subscription_api
+from f5cli.api.cs.beacon import declare as declare_api
+from f5cli.api.cs.beacon import insights as insights_api
+from f5cli.api.cs.beacon import token as token_api
+from f5cli.cli import PASS_CONTEXT, AliasedGroup, report_api_errors
 from f5cli.utils import core as utils_core
+from f5cli.utils import timings, metrics
+from f5cli.api.cs.bulk_operations import read_names
 from f5cli import constants
 
 HELP = docs.get_docs()
 
 
-def get_mgmt_client():
-    """ Get Management Client """
+def operation(component, action=None):
+    """ Time and count each call of a command as an operation of the component
+
+    The action is the command 'action' argument, if not provided
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            name = action or kwargs.get('action')
+            with timings.span('operation.%s.%s' % (component, name),
+                              attributes={'f5.component': component, 'f5.action': name}), \
+                    metrics.operation(component, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def verify_one_of(**kwargs):
+    """ Verify exactly one of the (mutually exclusive) options is provided """
+
+    provided = [name for name, value in kwargs.items() if value is not None]
+    if len(provided) != 1:
+        raise click.ClickException('Exactly one of the %s options is required' % ', '.join(
+            '--%s' % name.replace('_', '-') for name in kwargs))
+
+
+def create_items(create_func, declaration, declaration_dir, parallel):
+    """ Create a single item, or one item per declaration file in a directory """
+
+    if declaration_dir:
+        return create_func(declaration_dir=declaration_dir, parallel=parallel)
+    return create_func(declaration=declaration)
+
+
+def delete_items(delete_func, name, names_file, names, parallel):
+    """ Delete a single item, or each item named in a names file """
+
+    if names_file:
+        return delete_func(names=names, parallel=parallel)
+    return delete_func(name=name)
+
+
+def verify_results(response):
+    """ Verify every item of a bulk operation succeeded, once the results are logged """
+
+    failed = [result for result in response['results'] if result['status'] == 'failed']
+    if failed:
+        raise click.ClickException('%s of %s items failed'
+                                   % (len(failed), len(response['results'])))
 
-    auth_client = AuthConfigurationClient()
-    auth = auth_client.read_auth(constants.AUTHENTICATION_PROVIDERS['CS'])
 
-    management_kwargs = dict(
-        user=auth['user'],
-        password=auth['password'],
-        api_endpoint=auth.pop('api_endpoint', None)
-    )
-    return ManagementClient(**management_kwargs)
+def get_names(name, names_file):
+    """ Get the names of the items to delete, from a single name or a names file """
+
+    verify_one_of(name=name, names_file=names_file)
+    return read_names(names_file) if names_file else [name]
 
 
 # group: cs
@@ -46,13 +94,22 @@ def cli():
 @click.argument('action',
                 required=True,
                 type=click.Choice(['show-user']))
+@click.option('--no-cache',
+              default=False,
+              is_flag=True,
+              help=HELP['CS_NO_CACHE_HELP'])
+@click.option('--refresh',
+              default=False,
+              is_flag=True,
+              help=HELP['CS_REFRESH_HELP'])
 @PASS_CONTEXT
-def account(ctx, action):
+@report_api_errors
+@operation('cs.account')
+def account(ctx, action, no_cache, refresh):
     """ command """
 
-    account_client = AccountClient(get_mgmt_client())
     if action == 'show-user':
-        ctx.log(account_client.show_user())
+        ctx.log(account_api.show_user(no_cache=no_cache, refresh=refresh))
     else:
         raise click.ClickException(f"Action {action} not implemented for command")
 
@@ -65,8 +122,25 @@ def account(ctx, action):
 @click.option('--subscription-id')
 @click.option('--declaration')
 @click.option('--account-id-filter')
+@click.option('--page-size',
+              type=click.IntRange(min=1),
+              help=HELP['CS_PAGE_SIZE_HELP'])
+@click.option('--max-items',
+              type=click.IntRange(min=1),
+              help=HELP['CS_MAX_ITEMS_HELP'])
+@click.option('--no-cache',
+              default=False,
+              is_flag=True,
+              help=HELP['CS_NO_CACHE_HELP'])
+@click.option('--refresh',
+              default=False,
+              is_flag=True,
+              help=HELP['CS_REFRESH_HELP'])
 @PASS_CONTEXT
-def subscription(ctx, action, subscription_id, declaration, account_id_filter):
+@report_api_errors
+@operation('cs.subscription')
+def subscription(ctx, action, subscription_id, declaration, account_id_filter,
+                 page_size, max_items, no_cache, refresh):
     """ command """
 
     # 'update' requires declaration
@@ -80,21 +154,13 @@ def subscription(ctx, action, subscription_id, declaration, account_id_filter):
             'The --subscription-id option is required'
         )
 
-    subscription_client = SubscriptionClient(get_mgmt_client())
     if action == 'list':
-        kwargs = {}
-        if account_id_filter:
-            kwargs['query_parameters'] = {
-                'account_id': account_id_filter
-            }
-        ctx.log(subscription_client.list(**kwargs))
+        ctx.log(subscription_api.list(account_id_filter=account_id_filter, page_size=page_size,
+                                      max_items=max_items, no_cache=no_cache, refresh=refresh))
     elif action == 'show':
-        ctx.log(subscription_client.show(name=subscription_id))
+        ctx.log(subscription_api.show(subscription_id, no_cache=no_cache, refresh=refresh))
     elif action == 'update':
-        ctx.log(subscription_client.update(
-            name=subscription_id,
-            config_file=utils_core.convert_to_absolute(declaration)
-        ))
+        ctx.log(subscription_api.update(subscription_id, declaration))
     else:
         raise click.ClickException(f"Action {action} not implemented for 'subscription' command")
 
@@ -113,24 +179,51 @@ def insights():
 
 @insights.command('list',
                   help=HELP['CS_BEACON_INSIGHTS_LIST_HELP'])
+@click.option('--page-size',
+              type=click.IntRange(min=1),
+              help=HELP['CS_PAGE_SIZE_HELP'])
+@click.option('--max-items',
+              type=click.IntRange(min=1),
+              help=HELP['CS_MAX_ITEMS_HELP'])
+@click.option('--no-cache',
+              default=False,
+              is_flag=True,
+              help=HELP['CS_NO_CACHE_HELP'])
+@click.option('--refresh',
+              default=False,
+              is_flag=True,
+              help=HELP['CS_REFRESH_HELP'])
 @PASS_CONTEXT
-def insights_list(ctx):
+@report_api_errors
+@operation('cs.beacon.insights', 'list')
+def insights_list(ctx, page_size, max_items, no_cache, refresh):
     """ command """
-    insights_client = InsightsClient(get_mgmt_client())
-    ctx.log(insights_client.list())
+    ctx.log(insights_api.list(page_size=page_size, max_items=max_items, no_cache=no_cache,
+                              refresh=refresh))
 
 
 @insights.command('create',
                   help=HELP['CS_BEACON_INSIGHTS_CREATE_HELP'])
 @click.option('--declaration',
-              required=True,
               metavar='<DECLARATION>')
+@click.option('--declaration-dir',
+              metavar='<DECLARATION_DIR>',
+              help=HELP['CS_DECLARATION_DIR_HELP'])
+@click.option('--parallel',
+              default=constants.DEFAULT_WORKERS,
+              type=click.IntRange(min=1),
+              help=HELP['CS_PARALLEL_HELP'])
 @PASS_CONTEXT
-def insights_create(ctx, declaration):
+@report_api_errors
+@operation('cs.beacon.insights', 'create')
+def insights_create(ctx, declaration, declaration_dir, parallel):
     """ command """
 
-    insights_client = InsightsClient(get_mgmt_client())
-    ctx.log(insights_client.create(config_file=utils_core.convert_to_absolute(declaration)))
+    verify_one_of(declaration=declaration, declaration_dir=declaration_dir)
+    response = create_items(insights_api.create, declaration, declaration_dir, parallel)
+    ctx.log(response)
+    if declaration_dir:
+        verify_results(response)
 
 
 @insights.command('update',
@@ -139,11 +232,12 @@ def insights_create(ctx, declaration):
               required=True,
               metavar='<DECLARATION>')
 @PASS_CONTEXT
+@report_api_errors
+@operation('cs.beacon.insights', 'update')
 def insights_update(ctx, declaration):
     """ command """
 
-    insights_client = InsightsClient(get_mgmt_client())
-    ctx.log(insights_client.create(config_file=utils_core.convert_to_absolute(declaration)))
+    ctx.log(insights_api.update(declaration))
 
 
 @insights.command('show',
@@ -152,35 +246,46 @@ def insights_update(ctx, declaration):
               required=True,
               metavar='<NAME>')
 @PASS_CONTEXT
+@report_api_errors
+@operation('cs.beacon.insights', 'show')
 def insight_show(ctx, name):
     """ command """
 
-    insights_client = InsightsClient(get_mgmt_client())
-    ctx.log(insights_client.show(name=name))
+    ctx.log(insights_api.show(name))
 
 
 @insights.command('delete',
                   help=HELP['CS_BEACON_INSIGHTS_DELETE_HELP'])
 @click.option('--name',
-              required=True,
               metavar='<NAME>')
+@click.option('--names-file',
+              metavar='<NAMES_FILE>',
+              help=HELP['CS_NAMES_FILE_HELP'])
+@click.option('--parallel',
+              default=constants.DEFAULT_WORKERS,
+              type=click.IntRange(min=1),
+              help=HELP['CS_PARALLEL_HELP'])
 @click.option('--auto-approve',
               default=False,
               is_flag=True,
               metavar='<AUTO-APPROVE>')
 @PASS_CONTEXT
-def insight_delete(ctx, name, auto_approve):
+@report_api_errors
+@operation('cs.beacon.insights', 'delete')
+def insight_delete(ctx, name, names_file, parallel, auto_approve):
     """ command """
+    names = get_names(name, names_file)
     approval_confirmation_map = {
-        'delete': 'Insight named %s will be deleted' % name
+        'delete': 'Insight named %s will be deleted' % ', '.join(names)
     }
     utils_core.verify_approval('delete', approval_confirmation_map, auto_approve)
-    insights_client = InsightsClient(get_mgmt_client())
-    result = insights_client.delete(name=name, config={})
+    result = delete_items(insights_api.delete, name, names_file, names, parallel)
     if result == {}:
         ctx.log('Insight deleted successfully')
     else:
         ctx.log(result)
+        if names_file:
+            verify_results(result)
 
 
 @beacon.group('declare',
@@ -192,11 +297,12 @@ def declare():
 @declare.command('show',
                  help=HELP['CS_BEACON_DECLARE_SHOW_HELP'])
 @PASS_CONTEXT
+@report_api_errors
+@operation('cs.beacon.declare', 'show')
 def declare_show(ctx):
     """ command """
 
-    client = DeclareClient(get_mgmt_client())
-    ctx.log(client.create(config={'action': 'get'}))
+    ctx.log(declare_api.show())
 
 
 @declare.command('create',
@@ -205,11 +311,12 @@ def declare_show(ctx):
               required=True,
               metavar='<DECLARATION>')
 @PASS_CONTEXT
+@report_api_errors
+@operation('cs.beacon.declare', 'create')
 def declare_create(ctx, declaration):
     """ command """
 
-    client = DeclareClient(get_mgmt_client())
-    ctx.log(client.create(config_file=utils_core.convert_to_absolute(declaration)))
+    ctx.log(declare_api.create(declaration))
 
 
 @beacon.group('token',
@@ -220,24 +327,42 @@ def token():
 
 @token.command('list',
                help=HELP['CS_BEACON_TOKEN_LIST_HELP'])
+@click.option('--page-size',
+              type=click.IntRange(min=1),
+              help=HELP['CS_PAGE_SIZE_HELP'])
+@click.option('--max-items',
+              type=click.IntRange(min=1),
+              help=HELP['CS_MAX_ITEMS_HELP'])
 @PASS_CONTEXT
-def token_list(ctx):
+@report_api_errors
+@operation('cs.beacon.token', 'list')
+def token_list(ctx, page_size, max_items):
     """ command """
-    token_client = TokenClient(get_mgmt_client())
-    ctx.log(token_client.list())
+    ctx.log(token_api.list(page_size=page_size, max_items=max_items))
 
 
 @token.command('create',
                help=HELP['CS_BEACON_TOKEN_CREATE_HELP'])
 @click.option('--declaration',
-              required=True,
               metavar='<DECLARATION>')
+@click.option('--declaration-dir',
+              metavar='<DECLARATION_DIR>',
+              help=HELP['CS_DECLARATION_DIR_HELP'])
+@click.option('--parallel',
+              default=constants.DEFAULT_WORKERS,
+              type=click.IntRange(min=1),
+              help=HELP['CS_PARALLEL_HELP'])
 @PASS_CONTEXT
-def token_create(ctx, declaration):
+@report_api_errors
+@operation('cs.beacon.token', 'create')
+def token_create(ctx, declaration, declaration_dir, parallel):
     """ command """
 
-    token_client = TokenClient(get_mgmt_client())
-    ctx.log(token_client.create(config_file=utils_core.convert_to_absolute(declaration)))
+    verify_one_of(declaration=declaration, declaration_dir=declaration_dir)
+    response = create_items(token_api.create, declaration, declaration_dir, parallel)
+    ctx.log(response)
+    if declaration_dir:
+        verify_results(response)
 
 
 @token.command('show',
@@ -246,35 +371,46 @@ def token_create(ctx, declaration):
               required=True,
               metavar='<NAME>')
 @PASS_CONTEXT
+@report_api_errors
+@operation('cs.beacon.token', 'show')
 def token_show(ctx, name):
     """ command """
 
-    token_client = TokenClient(get_mgmt_client())
-    ctx.log(token_client.show(name=name))
+    ctx.log(token_api.show(name))
 
 
 @token.command('delete',
                help=HELP['CS_BEACON_TOKEN_DELETE_HELP'])
 @click.option('--name',
-              required=True,
               metavar='<NAME>')
+@click.option('--names-file',
+              metavar='<NAMES_FILE>',
+              help=HELP['CS_NAMES_FILE_HELP'])
+@click.option('--parallel',
+              default=constants.DEFAULT_WORKERS,
+              type=click.IntRange(min=1),
+              help=HELP['CS_PARALLEL_HELP'])
 @click.option('--auto-approve',
               default=False,
               is_flag=True,
               metavar='<AUTO-APPROVE>')
 @PASS_CONTEXT
-def token_delete(ctx, name, auto_approve):
+@report_api_errors
+@operation('cs.beacon.token', 'delete')
+def token_delete(ctx, name, names_file, parallel, auto_approve):
     """ command """
+    names = get_names(name, names_file)
     approval_confirmation_map = {
-        'delete': 'Token named %s will be deleted' % name
+        'delete': 'Token named %s will be deleted' % ', '.join(names)
     }
     utils_core.verify_approval('delete', approval_confirmation_map, auto_approve)
-    token_client = TokenClient(get_mgmt_client())
-    result = token_client.delete(name=name, config={})
+    result = delete_items(token_api.delete, name, names_file, names, parallel)
     if result == {}:
         ctx.log('Token deleted successfully')
     else:
         ctx.log(result)
+        if names_file:
+            verify_results(result)
 
 
 click_repl.register_repl(cli)
@@ -0,0 +1,61 @@
+""" Declaration command """
+
+import click_repl
+import click
+
+from f5cli import docs
+from f5cli.cli import PASS_CONTEXT, AliasedGroup
+from f5cli.api.extension_operations import split_declaration_by_tenant
+from f5cli.utils import core as utils_core
+from f5cli.utils.templating import render_declaration
+
+HELP = docs.get_docs()
+
+RENDER_MODES = ['merged', 'per-tenant']
+
+
+# group: declaration
+@click.group('declaration',
+             help=HELP['DECLARATION_HELP'],
+             cls=AliasedGroup)
+def cli():
+    """ group """
+
+
+@cli.command('render',
+             help=HELP['DECLARATION_RENDER_HELP'])
+@click.option('--template',
+              required=True,
+              metavar='<TEMPLATE>',
+              help=HELP['DECLARATION_TEMPLATE_HELP'])
+@click.option('--vars',
+              'vars_file',
+              required=True,
+              metavar='<VARS>',
+              help=HELP['DECLARATION_VARS_HELP'])
+@click.option('--mode',
+              default='merged',
+              type=click.Choice(RENDER_MODES),
+              help=HELP['DECLARATION_MODE_HELP'])
+@click.option('--parallel',
+              default=1,
+              type=click.IntRange(min=1),
+              help=HELP['DECLARATION_PARALLEL_HELP'])
+@PASS_CONTEXT
+def render(ctx, template, vars_file, mode, parallel):
+    """ command """
+
+    try:
+        declaration = render_declaration(utils_core.convert_to_absolute(template),
+                                         utils_core.convert_to_absolute(vars_file),
+                                         parallel)
+    except Exception as error:
+        raise click.ClickException(error)
+    if mode == 'per-tenant':
+        ctx.log([{'tenant': tenant, 'declaration': tenant_declaration}
+                 for tenant, tenant_declaration in split_declaration_by_tenant(declaration)])
+    else:
+        ctx.log(declaration)
+
+
+click_repl.register_repl(cli)
@@ -2,8 +2,12 @@
 
 from .core import ConfigurationClient
 from .auth import AuthConfigurationClient
+from .cache import ResponseCacheClient
+from .inventory import InventoryClient
 
 __all__ = [
     'AuthConfigurationClient',
-    'ConfigurationClient'
+    'ConfigurationClient',
+    'InventoryClient',
+    'ResponseCacheClient'
 ]
@@ -6,6 +6,7 @@ import click
 
 import f5cli.constants as constants
 import f5cli.utils.core as utils
+from f5cli.utils import timings, sharing
 
 
 class AuthConfigurationClient:
@@ -71,6 +72,9 @@ class AuthConfigurationClient:
     def _load_auth_contents():
         """Loads auth file and returns a list with the contents
 
+        Note: While sharing is enabled (such as in a batch)
+        the file is only parsed again once modified
+
         Parameters
         ----------
         None
@@ -80,11 +84,14 @@ class AuthConfigurationClient:
         list
             a list containing the authentication accounts from auth file
         """
-        auth_contents = []
-        if os.path.isfile(constants.F5_AUTH_FILE):
-            with open(constants.F5_AUTH_FILE) as file:
-                auth_contents = yaml.safe_load(file)
-        return auth_contents
+        def _load():
+            auth_contents = []
+            if os.path.isfile(constants.F5_AUTH_FILE):
+                with open(constants.F5_AUTH_FILE) as file:
+                    auth_contents = yaml.safe_load(file)
+            return auth_contents
+
+        return sharing.load_file(constants.F5_AUTH_FILE, _load)
 
     @staticmethod
     def _dump_auth_content_to_file(auth_contents):
@@ -230,6 +237,7 @@ class AuthConfigurationClient:
                 return auth_account
         return None
 
+    @timings.timed('auth.read')
     def read_auth(self, group_name):
         """ Used by the CLI commands to read the default persisted credentials,
             when the CLI commands need to generate a new ManagementClient
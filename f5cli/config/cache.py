@@ -0,0 +1,191 @@
+"""Response cache module for the CLI
+
+Example::
+
+    cache_client = ResponseCacheClient(account=['user@example.com', None], enabled=True)
+    response = cache_client.get_or_fetch(['account', 'show-user'], fetch, ttl=300)
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+
+import f5cli.constants as constants
+
+
+class ResponseCacheClient:
+    """ A class used to cache read-only API responses for a limited time
+
+    Note: The backend storage method is one JSON file per request in
+    the F5 CLI cache directory, grouped by account so that all entries
+    for an account can be invalidated at once
+
+    Attributes
+    ----------
+
+    Methods
+    -------
+    get()
+        See method documentation for more details
+    set()
+        See method documentation for more details
+    get_or_fetch()
+        See method documentation for more details
+    invalidate()
+        See method documentation for more details
+    """
+
+    def __init__(self, **kwargs):
+        """Class initialization
+
+        Parameters
+        ----------
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        account: str, list
+            the account the cached responses belong to, such as user and API endpoint
+        enabled: bool
+            when false, responses are neither read from nor written to the cache
+
+        Returns
+        -------
+        None
+        """
+
+        self._enabled = kwargs.pop('enabled', False)
+        self._account_dir = os.path.join(
+            constants.F5_CLI_CACHE_DIR,
+            self._hash(kwargs.pop('account', ''))
+        )
+
+    @staticmethod
+    def _hash(value):
+        """Hash a (JSON serializable) value to use as a file name
+
+        Parameters
+        ----------
+        value: str, list, dict
+            the value to hash
+
+        Returns
+        -------
+        str
+            the hex digest
+        """
+
+        return hashlib.sha256(
+            json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _get_path(self, request):
+        """Get the cache file for a request """
+
+        return os.path.join(self._account_dir, '%s.json' % self._hash(request))
+
+    def get(self, request):
+        """ Get the cached response for a request
+
+        Parameters
+        ----------
+        request: list
+            the request, for example the command name and its arguments
+
+        Returns
+        -------
+        tuple
+            a (hit, response) tuple, hit is false if no unexpired response is cached
+        """
+
+        if not self._enabled:
+            return False, None
+        try:
+            with open(self._get_path(request)) as file:
+                entry = json.load(file)
+        except (IOError, ValueError):
+            return False, None
+        if entry.get('expires', 0) < time.time():
+            return False, None
+        return True, entry.get('response')
+
+    def set(self, request, response, ttl):
+        """ Cache the response for a request
+
+        Parameters
+        ----------
+        request: list
+            the request, for example the command name and its arguments
+        response: dict, list
+            the response to cache
+        ttl: int
+            the number of seconds the response is valid for
+
+        Returns
+        -------
+        None
+        """
+
+        if not self._enabled:
+            return
+        if not os.path.exists(self._account_dir):
+            os.makedirs(self._account_dir, exist_ok=True)
+        path = self._get_path(request)
+        # write then rename, so concurrent readers never see a partial file
+        tmp_path = '%s.%s.tmp' % (path, os.getpid())
+        with open(os.open(tmp_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600), 'w') as file:
+            json.dump({'expires': time.time() + ttl, 'response': response}, file)
+        os.replace(tmp_path, path)
+
+    def get_or_fetch(self, request, fetch, ttl, **kwargs):
+        """ Get the cached response for a request, fetching (and caching) it if required
+
+        Parameters
+        ----------
+        request: list
+            the request, for example the command name and its arguments
+        fetch: function
+            called with no arguments to fetch the response
+        ttl: int
+            the number of seconds a fetched response is valid for
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        refresh: bool
+            ignore any cached response, the fetched response is still cached
+
+        Returns
+        -------
+        dict
+            the response
+        """
+
+        if not kwargs.pop('refresh', False):
+            hit, response = self.get(request)
+            if hit:
+                return response
+        response = fetch()
+        self.set(request, response, ttl)
+        return response
+
+    def invalidate(self):
+        """ Remove every cached response for the account
+
+        Note: This is done regardless of whether the cache is enabled,
+        so stale entries from an earlier (cached) run are never served
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        if os.path.isdir(self._account_dir):
+            shutil.rmtree(self._account_dir, ignore_errors=True)
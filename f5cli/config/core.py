@@ -6,6 +6,7 @@ import click
 
 import f5cli.constants as constants
 import f5cli.utils.core as utils
+from f5cli.utils import timings, sharing
 
 
 class ConfigurationClient:
@@ -63,7 +64,9 @@ class ConfigurationClient:
         """Loads content from backend
 
         Note: If the backend does not exist an empty
-        dictionary will be returned
+        dictionary will be returned, while sharing is
+        enabled (such as in a batch) it is only parsed
+        again once modified
 
         Parameters
         ----------
@@ -75,11 +78,14 @@ class ConfigurationClient:
             a dict containing the loaded contents
         """
 
-        contents = {}
-        if os.path.isfile(constants.F5_CONFIG_FILE):
-            with open(constants.F5_CONFIG_FILE) as file:
-                contents = yaml.safe_load(file) or {}
-        return contents
+        def _load():
+            contents = {}
+            if os.path.isfile(constants.F5_CONFIG_FILE):
+                with open(constants.F5_CONFIG_FILE) as file:
+                    contents = yaml.safe_load(file) or {}
+            return contents
+
+        return sharing.load_file(constants.F5_CONFIG_FILE, _load)
 
     @staticmethod
     def _save_content(content):
@@ -99,6 +105,7 @@ class ConfigurationClient:
         except IOError as error:
             raise click.ClickException(f"Unable to save contents: {error}.")
 
+    @timings.timed('config.load')
     def list(self):
         """ List content
 
@@ -0,0 +1,167 @@
+"""Device inventory module for the CLI
+
+Example::
+
+    inventory_client = InventoryClient()
+    inventory_client.update('bigip_1', {'host': '192.0.2.10'}, {'facts': {'version': '15.1.0'}})
+    device = inventory_client.read()['bigip_1']
+"""
+
+import os
+import json
+import time
+
+import f5cli.constants as constants
+from f5cli.utils.device_queue import file_lock
+
+INVENTORY_LOCK_TIMEOUT = 30
+
+
+class InventoryClient:
+    """ A class used to cache the facts of each device, such as its version
+
+    Note: The backend storage method is a single JSON file in the
+    F5 CLI home directory (inventory.json), keyed by authentication
+    account. Each field of a device is refreshed separately, and is
+    stale once older than its time to live
+
+    Attributes
+    ----------
+
+    Methods
+    -------
+    read()
+        See method documentation for more details
+    get_stale_fields()
+        See method documentation for more details
+    update()
+        See method documentation for more details
+    """
+
+    def __init__(self, **kwargs):
+        """Class initialization
+
+        Parameters
+        ----------
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        ttl: dict
+            the number of seconds each field is valid for, defaults to the inventory TTLs
+
+        Returns
+        -------
+        None
+        """
+
+        self._ttl = kwargs.pop('ttl', constants.INVENTORY_TTL)
+
+    @staticmethod
+    def read():
+        """ Read the inventory
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict
+            the devices, keyed by account name
+
+            ::
+
+                {
+                    'bigip_1': {
+                        'host': '192.0.2.10',
+                        'port': 443,
+                        'fields': {
+                            'facts': {'value': {...}, 'updated': 1590000000.0},
+                            'extensions': {'value': {...}, 'error': '...',
+                                           'updated': 1590000000.0}
+                        }
+                    }
+                }
+        """
+
+        try:
+            with open(constants.F5_INVENTORY_FILE) as file:
+                return json.load(file).get('devices', {})
+        except (IOError, ValueError):
+            return {}
+
+    def get_stale_fields(self, device, fields=None):
+        """ Get the fields of a device which are missing, expired or failed to refresh
+
+        Parameters
+        ----------
+        device: dict
+            the device, as read from the inventory, or None
+        fields: list
+            the fields to check, defaults to every field
+
+        Returns
+        -------
+        list
+            the stale fields
+        """
+
+        cached = (device or {}).get('fields', {})
+        now = time.time()
+        stale = []
+        for field in fields or list(self._ttl):
+            entry = cached.get(field)
+            if entry is None or 'error' in entry or entry['updated'] + self._ttl[field] < now:
+                stale.append(field)
+        return stale
+
+    def update(self, name, device, fields):
+        """ Update the refreshed fields of a device
+
+        Note: The inventory is read again before writing, while holding
+        the inventory lock, so devices refreshed concurrently by other
+        threads or commands are kept
+
+        Parameters
+        ----------
+        name: str
+            the device (account) name
+        device: dict
+            the device properties, such as host and port
+        fields: dict
+            the refreshed fields, an Exception value records a failed refresh,
+            keeping the previous value of the field
+
+        Returns
+        -------
+        None
+        """
+
+        # serialize concurrent updates of the inventory, so no refreshed device is lost
+        with file_lock('inventory-%s' % constants.F5_INVENTORY_FILE,
+                       timeout=INVENTORY_LOCK_TIMEOUT):
+            devices = self.read()
+            entry = devices.setdefault(name, {'fields': {}})
+            entry.update(device)
+            now = time.time()
+            for field, value in fields.items():
+                if isinstance(value, Exception):
+                    # the last good value is still shown, the error marks it stale
+                    previous = entry['fields'].get(field, {})
+                    entry['fields'][field] = dict(
+                        {key: previous[key] for key in ['value'] if key in previous},
+                        error=str(value), updated=now)
+                else:
+                    entry['fields'][field] = {'value': value, 'updated': now}
+
+            directory = os.path.dirname(constants.F5_INVENTORY_FILE)
+            if not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            # write then rename, so concurrent readers never see a partial file
+            tmp_path = '%s.%s.tmp' % (constants.F5_INVENTORY_FILE, os.getpid())
+            with open(os.open(tmp_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600),
+                      'w') as file:
+                json.dump({'devices': devices}, file, indent=4, sort_keys=True)
+            os.replace(tmp_path, constants.F5_INVENTORY_FILE)
@@ -14,24 +14,67 @@ TELEMETRY_TYPE_VERSION = '1'
 F5_CLI_DIR = join(expanduser("~"), ".f5_cli")
 F5_CONFIG_FILE = join(F5_CLI_DIR, "config.yaml")
 F5_AUTH_FILE = join(F5_CLI_DIR, "auth.yaml")
+F5_CLI_LOCK_DIR = join(F5_CLI_DIR, "locks")
+F5_CLI_CACHE_DIR = join(F5_CLI_DIR, "cache")
+F5_CLI_SCHEMA_DIR = join(F5_CLI_DIR, "schemas")
+F5_INVENTORY_FILE = join(F5_CLI_DIR, "inventory.json")
 
 DEFAULT_BIGIP_PORT = 443
 
+# default number of concurrent workers for parallel operations
+DEFAULT_WORKERS = 4
+# default number of seconds to wait for a device busy with another operation
+DEFAULT_QUEUE_TIMEOUT = 600
+
 # Environment variables
 ENV_VARS = {
     'ALLOW_TELEMETRY': 'F5_ALLOW_TELEMETRY',
     'OUTPUT_FORMAT': 'F5_OUTPUT_FORMAT',
-    'DISABLE_SSL_WARNINGS': 'F5_DISABLE_SSL_WARNINGS'
+    'DISABLE_SSL_WARNINGS': 'F5_DISABLE_SSL_WARNINGS',
+    'CS_RESPONSE_CACHE': 'F5_CS_RESPONSE_CACHE',
+    'PROFILE': 'F5_CLI_PROFILE',
+    'TRACE_EXPORT': 'F5_CLI_TRACE_EXPORT',
+    'METRICS_FILE': 'F5_CLI_METRICS_FILE',
+    'TRACE_PARENT': 'TRACEPARENT'
 }
 
 # Output data format(s)
 FORMATS = {
     'JSON': 'json',
+    'JSON_COMPACT': 'json-compact',
     'TABLE': 'table',
+    'NDJSON': 'ndjson',
     'DEFAULT': 'json'
 }
 FORMATS_ENV_VAR = 'F5_OUTPUT_FORMAT_ENV'
 
+# Cloud Services list pagination
+CS_PAGINATION = {
+    'DEFAULT_PAGE_SIZE': 100,
+    'PAGE_SIZE_PARAMETER': 'limit',
+    'OFFSET_PARAMETER': 'offset'
+}
+
+# Cloud Services response cache time to live (in seconds), per command
+CS_CACHE_TTL = {
+    'ACCOUNT_SHOW_USER': 3600,
+    'SUBSCRIPTION_LIST': 300,
+    'SUBSCRIPTION_SHOW': 300,
+    'INSIGHTS_LIST': 60
+}
+
+# BIG-IP inventory time to live (in seconds), per field
+INVENTORY_TTL = {
+    'facts': 86400,
+    'extensions': 3600,
+    'availability': 300
+}
+
+# extension versions metadata time to live (in seconds), used to plan upgrades
+EXTENSION_METADATA_TTL = 86400
+# number of seconds an extension upgrade is estimated to take, without timings of earlier upgrades
+DEFAULT_UPGRADE_SECONDS = 60
+
 # Command group names
 CS_GROUP_NAME = 'CS'
 BIGIP_GROUP_NAME = 'BIGIP'
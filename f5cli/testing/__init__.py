@@ -0,0 +1,7 @@
+"""Testing utilities, such as a mock BIG-IP and F5 Cloud Services server """
+
+from .mock_server import MockServer
+
+__all__ = [
+    'MockServer'
+]
@@ -0,0 +1,674 @@
+""" A local HTTPS stand-in for BIG-IP and F5 Cloud Services, for end-to-end tests and benchmarks
+
+The server implements the endpoints the CLI uses: BIG-IP login, version,
+package management (query, upload, install and uninstall tasks), the AS3, DO, TS and
+CF declare, info, inspect, trigger and reset endpoints, the extension
+metadata file, and the Cloud Services login, account, subscription and
+Beacon endpoints. Packages, declarations and resources are kept in memory.
+Responses can be delayed, with jitter, and a fraction of requests can be
+failed, to measure commands against slow or unreliable devices.
+
+Notes
+-----
+The F5 SDK connects to Cloud Services, and downloads the extension metadata,
+on port 443 only, so the server must listen on port 443 to serve those
+endpoints to the CLI. BIG-IP endpoints can be served on any port.
+The server certificate is created using the cryptography package, installed
+with the testing extra (pip install f5-cli[testing]).
+
+Example::
+
+    with MockServer(latency=0.05, jitter=0.01) as server:
+        client = ManagementClient(server.host, port=server.port, user='admin', password='admin')
+"""
+
+import os
+import re
+import ssl
+import json
+import time
+import uuid
+import random
+import shutil
+import datetime
+import tempfile
+import functools
+import threading
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qs
+
+from f5sdk.bigip.extension import extension_metadata
+
+DEFAULT_USER = 'admin'
+DEFAULT_PASSWORD = 'admin'
+BIGIP_TOKEN_HEADER = 'X-F5-Auth-Token'
+BIGIP_TOKEN_TIMEOUT = 1200
+BIGIP_VERSION = '14.1.2.3'
+CS_TOKEN_TIMEOUT = 3600
+# the number of seconds stopping the server can take
+SHUTDOWN_POLL_INTERVAL = 0.05
+PACKAGE_TASKS_URI = '/mgmt/shared/iapp/package-management-tasks'
+UPLOADS_URI = '/mgmt/shared/file-transfer/uploads'
+# such as f5-appsvcs-3.18.0-4.noarch: (name, version, release)
+PACKAGE_NAME_REGEX = re.compile(r'^(.+?)-(\d+\.\d+\.\d+)-(\d+)\.noarch$')
+# components applying declarations asynchronously: 202, then the task is polled
+ASYNC_COMPONENTS = ['do']
+# Cloud Services resources: (uri, id key, id prefix)
+CS_RESOURCES = {
+    'subscriptions': ('/v1/svc-subscription/subscriptions', 'subscription_id', 's'),
+    'insights': ('/beacon/v1/insights', 'name', 'i'),
+    'tokens': ('/beacon/v1/telemetry-token', 'name', 't')
+}
+
+Request = namedtuple('Request', ['method', 'path', 'query', 'headers', 'body', 'params'])
+
+
+def _load_metadata():
+    """Load the extension metadata bundled with the F5 SDK """
+
+    path = os.path.join(os.path.dirname(extension_metadata.__file__),
+                        extension_metadata.EXTENSION_METADATA['FILE'])
+    with open(path) as file:
+        return json.load(file)
+
+
+def _create_certificate(directory):
+    """Create a self-signed certificate and key, the CLI does not verify certificates """
+
+    # pylint: disable=import-outside-toplevel
+    from cryptography import x509
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1(), default_backend())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.utcnow()
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(
+        key.public_key()
+    ).serial_number(x509.random_serial_number()).not_valid_before(
+        now - datetime.timedelta(days=1)
+    ).not_valid_after(
+        now + datetime.timedelta(days=1)
+    ).sign(key, hashes.SHA256(), default_backend())
+
+    cert_file = os.path.join(directory, 'cert.pem')
+    key_file = os.path.join(directory, 'key.pem')
+    with open(cert_file, 'wb') as file:
+        file.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_file, 'wb') as file:
+        file.write(key.private_bytes(serialization.Encoding.PEM,
+                                     serialization.PrivateFormat.TraditionalOpenSSL,
+                                     serialization.NoEncryption()))
+    return cert_file, key_file
+
+
+def _get_json(request):
+    """Get the JSON body of a request, an empty object if there is none """
+
+    try:
+        return json.loads(request.body.decode('utf-8')) if request.body else {}
+    except ValueError:
+        return {}
+
+
+def _get_tenants(declaration):
+    """Get the AS3 tenants, and the ADC declaration containing them """
+
+    if declaration.get('class') == 'AS3':
+        declaration = declaration.get('declaration', {})
+    tenants = [key for key, value in declaration.items()
+               if isinstance(value, dict) and value.get('class') == 'Tenant']
+    return tenants, declaration
+
+
+def _get_as3_results(tenants):
+    """Get the AS3 results of applying tenants """
+
+    return [{'code': 200, 'message': 'success', 'host': 'localhost', 'tenant': tenant}
+            for tenant in tenants]
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """ Dispatch each request to the mock server """
+
+    protocol_version = 'HTTP/1.1'
+    # respond without waiting for the delayed ACK of the headers
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        """Respond to a request """
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, response = self.server.mock.handle_request(
+            self.command, self.path, self.headers, body)
+        content = b'' if response is None else json.dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Do not log requests """
+
+
+class _HTTPServer(ThreadingMixIn, HTTPServer):
+    """ An HTTP server handling each connection in a thread """
+
+    daemon_threads = True
+    # accept a fleet of clients connecting at once
+    request_queue_size = 128
+
+    def __init__(self, address, mock):
+        super().__init__(address, _RequestHandler)
+        self.mock = mock
+
+
+# the settings of the served endpoints and the server, the in-memory state is grouped in _state
+class MockServer:  # pylint: disable=too-many-instance-attributes
+    """ A class used to serve BIG-IP and F5 Cloud Services endpoints locally
+
+    Attributes
+    ----------
+    host : str
+        the address the server listens on
+    port : int
+        the port the server listens on, once started
+    request_log : list
+        the (method, path, status code) of each request served
+
+    Methods
+    -------
+    start()
+        See method documentation for more details
+    stop()
+        See method documentation for more details
+    handle_request()
+        See method documentation for more details
+    """
+
+    def __init__(self, **kwargs):
+        """Class initialization
+
+        Parameters
+        ----------
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        host: str
+            the address to listen on, defaults to 127.0.0.1
+        port: int
+            the port to listen on, defaults to any free port
+        user: str
+            the user accepted by the login endpoints
+        password: str
+            the password accepted by the login endpoints
+        latency: float
+            the number of seconds each response is delayed
+        jitter: float
+            the maximum number of seconds added to, or removed from, the latency
+        error_rate: float
+            the fraction of requests failed, between 0 and 1
+        error_status: int
+            the status code of failed requests, defaults to 503
+        seed: int
+            the random seed for jitter and failed requests, for repeatable runs
+        packages: list
+            the components installed initially, such as ['as3'], defaults to all
+        subscriptions: int
+            the number of Cloud Services subscriptions, defaults to 2
+
+        Returns
+        -------
+        None
+        """
+
+        self.host = kwargs.pop('host', '127.0.0.1')
+        self._port = kwargs.pop('port', 0)
+        self._user = kwargs.pop('user', DEFAULT_USER)
+        self._password = kwargs.pop('password', DEFAULT_PASSWORD)
+        self._latency = kwargs.pop('latency', 0)
+        self._jitter = kwargs.pop('jitter', 0)
+        self._error_rate = kwargs.pop('error_rate', 0)
+        self._error_status = kwargs.pop('error_status', 503)
+        self._random = random.Random(kwargs.pop('seed', None))
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.request_log = []
+
+        self._metadata = _load_metadata()
+        # the latest package of each component, such as f5-appsvcs-3.18.0-4.noarch
+        self._latest_packages = {
+            component: [version['packageName'] for version in details['versions'].values()
+                        if version.get('latest')][0]
+            for component, details in self._metadata['components'].items()
+        }
+        self._package_names = {
+            component: PACKAGE_NAME_REGEX.match(package).group(1)
+            for component, package in self._latest_packages.items()
+        }
+        self._account_id = 'a-%s' % uuid.uuid4().hex[:10]
+        # the in-memory state of the served devices and Cloud Services account
+        self._state = {
+            # installed packages, keyed by package name, such as f5-appsvcs
+            'packages': {
+                self._package_names[component]: self._latest_packages[component]
+                for component in kwargs.pop('packages', list(self._latest_packages))
+            },
+            'uploads': {},
+            'tasks': {},
+            'declarations': {},
+            'bigip_tokens': set(),
+            'cs_tokens': set(),
+            'cs': {resource: {} for resource in CS_RESOURCES},
+            'beacon_declaration': []
+        }
+        for _ in range(kwargs.pop('subscriptions', 2)):
+            self._add_cs_item('subscriptions', {
+                'account_id': self._account_id,
+                'service_type': 'gslb',
+                'status': 'ACTIVE',
+                'configuration': {}
+            })
+        self._routes = self._get_routes()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def port(self):
+        """ The port the server listens on """
+
+        return self._server.server_address[1] if self._server else self._port
+
+    def _get_routes(self):
+        """Get the routes: (method, path regex, handler, authentication provider) """
+
+        routes = [
+            ('POST', '/mgmt/shared/authn/login', self._bigip_login, None),
+            ('PATCH', '/mgmt/shared/authz/tokens/(?P<token>[^/]+)',
+             self._bigip_extend_token, None),
+            ('POST', PACKAGE_TASKS_URI, self._create_package_task, 'bigip'),
+            ('GET', PACKAGE_TASKS_URI + '/(?P<task_id>[^/]+)', self._show_package_task, 'bigip'),
+            ('POST', UPLOADS_URI + '/(?P<file_name>[^/]+)', self._upload_file, 'bigip'),
+            ('GET', '/mgmt/tm/sys/version', self._show_sys_version, 'bigip'),
+            ('GET', urlsplit(extension_metadata.EXTENSION_METADATA['URL']).path,
+             self._show_metadata, None),
+            ('POST', '/v1/svc-auth/login', self._cs_login, None),
+            ('GET', '/v1/svc-account/user', self._cs_show_user, 'cs'),
+            ('POST', '/beacon/v1/declare', self._cs_declare, 'cs')
+        ]
+        for component, details in self._metadata['components'].items():
+            endpoints = details['endpoints']
+            uri = endpoints['configure']['uri']
+            bound = functools.partial(self._get_extension_handler, component)
+            routes.extend([
+                ('GET', uri, bound(self._show_declaration), 'bigip'),
+                ('POST', uri, bound(self._create_declaration), 'bigip'),
+                ('DELETE', uri, bound(self._delete_declaration), 'bigip'),
+                ('GET', uri + '/task/(?P<task_id>[^/]+)',
+                 bound(self._show_declaration_task), 'bigip'),
+                ('GET', endpoints['info']['uri'], bound(self._show_info), 'bigip')
+            ])
+            if component == 'as3':
+                routes.append(('POST', uri + '/(?P<tenant>[^/]+)',
+                               bound(self._create_tenant_declaration), 'bigip'))
+            if 'inspect' in endpoints:
+                routes.append(('GET', endpoints['inspect']['uri'],
+                               bound(self._show_inspect), 'bigip'))
+            if 'trigger' in endpoints:
+                routes.extend([
+                    ('GET', endpoints['trigger']['uri'], bound(self._show_trigger), 'bigip'),
+                    ('POST', endpoints['trigger']['uri'], bound(self._trigger), 'bigip')
+                ])
+            if 'reset' in endpoints:
+                routes.append(('POST', endpoints['reset']['uri'], bound(self._reset), 'bigip'))
+        for resource, (uri, _, _) in CS_RESOURCES.items():
+            bound = functools.partial(functools.partial, resource=resource)
+            routes.extend([
+                ('GET', uri, bound(self._cs_list), 'cs'),
+                ('POST', uri, bound(self._cs_create), 'cs'),
+                ('GET', uri + '/(?P<name>[^/]+)', bound(self._cs_show), 'cs'),
+                ('PUT', uri + '/(?P<name>[^/]+)', bound(self._cs_update), 'cs'),
+                ('DELETE', uri + '/(?P<name>[^/]+)', bound(self._cs_delete), 'cs')
+            ])
+        return [(method, re.compile('^%s$' % path), handler, provider)
+                for method, path, handler, provider in routes]
+
+    def start(self):
+        """ Start serving, in a background thread
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        self._server = _HTTPServer((self.host, self._port), self)
+        directory = tempfile.mkdtemp()
+        try:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*_create_certificate(directory))
+        finally:
+            shutil.rmtree(directory)
+        # the handshake happens in the connection thread, not while accepting connections
+        self._server.socket = context.wrap_socket(
+            self._server.socket, server_side=True, do_handshake_on_connect=False)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        kwargs={'poll_interval': SHUTDOWN_POLL_INTERVAL})
+        self._thread.start()
+
+    def stop(self):
+        """ Stop serving
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _delay(self):
+        """Delay a response by the latency, with jitter """
+
+        with self._lock:
+            delay = self._latency + self._random.uniform(-self._jitter, self._jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _is_authenticated(self, provider, headers):
+        """Check the request carries a token issued by the provider login endpoint """
+
+        if provider == 'bigip':
+            return headers.get(BIGIP_TOKEN_HEADER) in self._state['bigip_tokens']
+        token = (headers.get('Authorization') or '').replace('Bearer ', '')
+        return token in self._state['cs_tokens']
+
+    def _route(self, request):
+        """Get the status code and body of the response to a request """
+
+        allowed = False
+        for method, regex, handler, provider in self._routes:
+            match = regex.match(request.path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            if provider and not self._is_authenticated(provider, request.headers):
+                return 401, {'code': 401, 'message': 'Authorization failed'}
+            with self._lock:
+                return handler(request._replace(params=match.groupdict()))
+        if allowed:
+            return 405, {'code': 405, 'message': 'Method not allowed'}
+        return 404, {'code': 404, 'message': 'Public URI path not registered: %s' % request.path}
+
+    def handle_request(self, method, target, headers, body):
+        """ Handle a request, with the configured latency and failures
+
+        Parameters
+        ----------
+        method : str
+            the HTTP method
+        target : str
+            the request target, the path and query
+        headers : dict
+            the request headers
+        body : bytes
+            the request body
+
+        Returns
+        -------
+        tuple
+            the (status code, JSON body) of the response, the body is None if empty
+        """
+
+        url = urlsplit(target)
+        self._delay()
+        with self._lock:
+            failed = self._random.random() < self._error_rate
+        if failed:
+            status, response = self._error_status, {
+                'code': self._error_status, 'message': 'Injected failure'}
+        else:
+            status, response = self._route(Request(
+                method, url.path, parse_qs(url.query), headers, body, {}))
+        with self._lock:
+            self.request_log.append((method, url.path, status))
+        return status, response
+
+    # BIG-IP
+
+    def _bigip_login(self, request):
+        body = _get_json(request)
+        if (body.get('username'), body.get('password')) != (self._user, self._password):
+            return 401, {'code': 401, 'message': 'Authentication failed.'}
+        token = uuid.uuid4().hex.upper()
+        self._state['bigip_tokens'].add(token)
+        return 200, {
+            'username': self._user,
+            'token': {'token': token, 'timeout': BIGIP_TOKEN_TIMEOUT}
+        }
+
+    def _bigip_extend_token(self, request):
+        token = request.params['token']
+        if token not in self._state['bigip_tokens']:
+            return 404, {'code': 404, 'message': 'Token not found'}
+        return 200, {'token': token, 'timeout': _get_json(request).get('timeout')}
+
+    def _upload_file(self, request):
+        # Content-Range: <start>-<end>/<size>
+        end, size = re.match(r'^\d+-(\d+)/(\d+)$',
+                             request.headers.get('Content-Range', '')).groups()
+        self._state['uploads'][request.params['file_name']] = int(end) + 1
+        return 200, {'remainingByteCount': int(size) - int(end) - 1}
+
+    def _create_package_task(self, request):
+        body = _get_json(request)
+        task = {'id': str(uuid.uuid4()), 'operation': body.get('operation'), 'status': 'FINISHED'}
+        if task['operation'] == 'QUERY':
+            task['queryResponse'] = [
+                {'name': name, 'packageName': package,
+                 'version': PACKAGE_NAME_REGEX.match(package).group(2)}
+                for name, package in self._state['packages'].items()
+            ]
+        elif task['operation'] == 'INSTALL':
+            file_name = os.path.basename(body.get('packageFilePath', ''))
+            match = PACKAGE_NAME_REGEX.match(file_name[:-len('.rpm')])
+            if file_name not in self._state['uploads'] or not match:
+                task.update(status='FAILED', errorMessage='Package %s not found' % file_name)
+            else:
+                self._state['packages'][match.group(1)] = match.group(0)
+        elif task['operation'] == 'UNINSTALL':
+            for name, package in list(self._state['packages'].items()):
+                if package == body.get('packageName'):
+                    del self._state['packages'][name]
+        else:
+            return 400, {'code': 400, 'message': 'Unsupported operation'}
+        self._state['tasks'][task['id']] = task
+        return 202, task
+
+    def _show_package_task(self, request):
+        if request.params['task_id'] not in self._state['tasks']:
+            return 404, {'code': 404, 'message': 'Task not found'}
+        return 200, self._state['tasks'][request.params['task_id']]
+
+    def _show_sys_version(self, _):
+        return 200, {'entries': {'https://localhost/mgmt/tm/sys/version/0': {
+            'nestedStats': {'entries': {'Version': {'description': BIGIP_VERSION}}}}}}
+
+    def _show_metadata(self, _):
+        return 200, self._metadata
+
+    def _get_extension_handler(self, component, handler):
+        """Bind an extension handler to its component, not found unless it is installed """
+
+        def _handler(request):
+            package = self._state['packages'].get(self._package_names[component])
+            if not package:
+                return 404, {'code': 404,
+                             'message': 'Public URI path not registered: %s' % request.path}
+            return handler(component, request)
+        return _handler
+
+    def _get_version(self, component):
+        """Get the installed (version, release) of a component """
+
+        return PACKAGE_NAME_REGEX.match(
+            self._state['packages'][self._package_names[component]]).group(2, 3)
+
+    def _show_declaration(self, component, _):
+        declaration = self._state['declarations'].get(component)
+        if declaration is None:
+            return 204, None
+        return 200, declaration
+
+    def _create_declaration(self, component, request):
+        declaration = _get_json(request)
+        if component == 'as3':
+            tenants, self._state['declarations'][component] = _get_tenants(declaration)
+            return 200, {'results': _get_as3_results(tenants),
+                         'declaration': self._state['declarations'][component]}
+        self._state['declarations'][component] = declaration
+        result = {
+            'result': {'class': 'Result', 'code': 200, 'status': 'OK', 'message': 'success'},
+            'declaration': declaration
+        }
+        if component in ASYNC_COMPONENTS:
+            task_id = str(uuid.uuid4())
+            self._state['tasks'][task_id] = dict(result, id=task_id)
+            return 202, {
+                'id': task_id,
+                'selfLink': 'https://localhost%s/task/%s' % (request.path, task_id),
+                'result': {'class': 'Result', 'code': 202, 'status': 'RUNNING'}
+            }
+        return 200, result
+
+    def _create_tenant_declaration(self, component, request):
+        tenants, declaration = _get_tenants(_get_json(request))
+        stored = self._state['declarations'].setdefault(component, {'class': 'ADC'})
+        for tenant in tenants:
+            stored[tenant] = declaration[tenant]
+        return 200, {'results': _get_as3_results(tenants), 'declaration': stored}
+
+    def _show_declaration_task(self, _, request):
+        if request.params['task_id'] not in self._state['tasks']:
+            return 404, {'code': 404, 'message': 'Task not found'}
+        return 200, self._state['tasks'][request.params['task_id']]
+
+    def _delete_declaration(self, component, _):
+        declaration = self._state['declarations'].pop(component, None) or {}
+        tenants, _ = _get_tenants(declaration)
+        return 200, {'results': _get_as3_results(tenants)}
+
+    def _show_info(self, component, _):
+        version, release = self._get_version(component)
+        return 200, {'version': version, 'release': release, 'schemaCurrent': version}
+
+    def _show_inspect(self, component, _):
+        version, release = self._get_version(component)
+        return 200, {
+            'version': version,
+            'release': release,
+            'hostname': 'bigip.localhost',
+            'declaration': self._state['declarations'].get(component, {})
+        }
+
+    def _show_trigger(self, component, _):
+        return 200, self._state['declarations'].get('%s.trigger' % component, {
+            'taskState': 'SUCCEEDED', 'message': 'Failover Complete'})
+
+    def _trigger(self, component, _):
+        self._state['declarations']['%s.trigger' % component] = {
+            'taskState': 'SUCCEEDED',
+            'message': 'Failover Complete',
+            'timestamp': datetime.datetime.utcnow().isoformat()
+        }
+        return 200, self._state['declarations']['%s.trigger' % component]
+
+    def _reset(self, component, _):
+        self._state['declarations'].pop('%s.trigger' % component, None)
+        return 200, {'message': 'success'}
+
+    # Cloud Services
+
+    def _add_cs_item(self, resource, item):
+        """Add a Cloud Services resource item, generating its ID if required """
+
+        _, key, prefix = CS_RESOURCES[resource]
+        item = dict(item)
+        item.setdefault(key, '%s-%s' % (prefix, uuid.uuid4().hex[:10]))
+        self._state['cs'][resource][item[key]] = item
+        return item
+
+    def _cs_login(self, request):
+        body = _get_json(request)
+        if (body.get('username'), body.get('password')) != (self._user, self._password):
+            return 401, {'status': 401, 'message': 'Invalid username or password'}
+        token = uuid.uuid4().hex
+        self._state['cs_tokens'].add(token)
+        return 200, {'access_token': token, 'expires_at': CS_TOKEN_TIMEOUT}
+
+    def _cs_show_user(self, _):
+        return 200, {
+            'id': 'u-%s' % self._account_id[2:],
+            'email': self._user,
+            'primary_account_id': self._account_id
+        }
+
+    def _cs_declare(self, request):
+        body = _get_json(request)
+        if body.get('action') != 'get':
+            self._state['beacon_declaration'] = body.get('declaration', [])
+        return 200, {'declaration': self._state['beacon_declaration']}
+
+    def _cs_list(self, request, resource):
+        items = list(self._state['cs'][resource].values())
+        for key in ['account_id']:
+            if key in request.query:
+                items = [item for item in items if item.get(key) == request.query[key][0]]
+        offset = int(request.query.get('offset', [0])[0])
+        limit = int(request.query.get('limit', [len(items)])[0])
+        return 200, {resource: items[offset:offset + limit]}
+
+    def _cs_create(self, request, resource):
+        return 200, self._add_cs_item(resource, _get_json(request))
+
+    def _cs_show(self, request, resource):
+        if request.params['name'] not in self._state['cs'][resource]:
+            return 404, {'status': 404, 'message': 'Not found'}
+        return 200, self._state['cs'][resource][request.params['name']]
+
+    def _cs_update(self, request, resource):
+        if request.params['name'] not in self._state['cs'][resource]:
+            return 404, {'status': 404, 'message': 'Not found'}
+        self._state['cs'][resource][request.params['name']].update(_get_json(request))
+        return 200, self._state['cs'][resource][request.params['name']]
+
+    def _cs_delete(self, request, resource):
+        if self._state['cs'][resource].pop(request.params['name'], None) is None:
+            return 404, {'status': 404, 'message': 'Not found'}
+        return 200, {}
@@ -2,12 +2,13 @@
 
 import os
 import json
+import types
 import yaml
 
 import click
 
 from f5cli.constants import FORMATS, ENV_VARS
-from f5cli.config import ConfigurationClient
+from f5cli.utils import sharing
 
 
 def convert_to_absolute(file):
@@ -22,62 +23,221 @@ def write_file(filename, content):
     with open(os.open(filename,
                       os.O_CREAT | os.O_WRONLY, 0o600), 'w') as file:
         yaml.safe_dump(content, file, default_flow_style=False, sort_keys=False)
+    sharing.forget_file(filename)
 
 
-def _get_output_format():
-    """Get output format """
+def get_output_format(config=None):
+    """Get output format
 
-    config_client = ConfigurationClient()
+    Note: This reads the configuration file (unless provided), callers
+    should resolve the format once and pass it to format_output
+
+    Parameters
+    ----------
+    config : dict
+        the already loaded configuration, if available
+
+    Returns
+    -------
+    str
+        the output format
+    """
 
     # format discovery priority is as follows:
     # 1) environment variable
     # 2) config file
     # 3) default format
     if ENV_VARS['OUTPUT_FORMAT'] in os.environ:
-        output_format = os.environ[ENV_VARS['OUTPUT_FORMAT']]
-    elif config_client.list().get('output', None):
-        output_format = config_client.list().get('output', None)
-    else:
-        output_format = FORMATS['DEFAULT']
+        return os.environ[ENV_VARS['OUTPUT_FORMAT']]
 
-    return output_format
+    if config is None:
+        # imported here, the configuration module depends on this module
+        from f5cli.config import ConfigurationClient  # pylint: disable=import-outside-toplevel
+        config = ConfigurationClient().list()
+    return config.get('output', None) or FORMATS['DEFAULT']
 
 
-def _format_data_as_table(data):
-    """Format data as a table """
+TABLE_COLUMN_SEPARATOR = '\t\t'
+TABLE_TRUNCATION_MARKER = '...'
+TABLE_SCALAR_TYPES = (str, int, float, bool)
 
-    if isinstance(data, dict):
+
+def _format_table_cell(value):
+    """Format a single (non-string) table cell """
+
+    if value is None:
+        return ''
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return json.dumps(value, separators=(',', ':'))
+
+
+def _truncate_table_cell(cell, max_width):
+    """Truncate a single table cell to max_width """
+
+    if max_width > len(TABLE_TRUNCATION_MARKER):
+        return cell[:max_width - len(TABLE_TRUNCATION_MARKER)] + TABLE_TRUNCATION_MARKER
+    return cell[:max_width]
+
+
+def _format_data_as_table(data, **kwargs):
+    """Format data as a table
+
+    Note: Cells are rendered column by column, each column width is
+    computed from its rendered cells and rows are then joined, so
+    rendering is linear in the number of cells
+
+    Parameters
+    ----------
+    data : dict, list, str, None
+        the data to format, a scalar (such as a query result) is a single
+        value and None an empty table
+    **kwargs :
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    columns : list
+        the columns to include, defaults to all keys with a scalar value
+    max_column_width : int
+        truncate cells longer than this width
+
+    Returns
+    -------
+    str
+        data formatted as a table
+    """
+
+    columns = kwargs.pop('columns', None)
+    max_width = kwargs.pop('max_column_width', None)
+
+    if data is None:
+        data = []
+    elif not isinstance(data, list):
         data = [data]
+    # rows which are not objects, such as query results, become a single column
+    data = [entry if isinstance(entry, dict) else {'value': entry} for entry in data]
+
+    candidates = columns
+    if not candidates:
+        keys = set()
+        for entry in data:
+            keys.update(entry)
+        candidates = sorted(keys)
+
+    headers = []
+    widths = []
+    cells_by_column = []
+    for column in candidates:
+        values = [entry.get(column) for entry in data]
+        # by default, include any key with a scalar value in any row
+        if not columns and not any(isinstance(val, TABLE_SCALAR_TYPES) for val in values):
+            continue
+        cells = [val if isinstance(val, str) else _format_table_cell(val) for val in values]
+        if max_width:
+            cells = [_truncate_table_cell(cell, max_width) if len(cell) > max_width else cell
+                     for cell in cells]
+        headers.append(column)
+        widths.append(max(len(column), max(map(len, cells), default=0)))
+        cells_by_column.append(cells)
+    if not headers:
+        return ''
+
+    row_format = ''.join('{:%d}%s' % (width, TABLE_COLUMN_SEPARATOR) for width in widths)
+    lines = [row_format.format(*headers), row_format.format(*['-' * width for width in widths])]
+    lines.extend(row_format.format(*row) for row in zip(*cells_by_column))
+    return '\n'.join(lines)
+
+
+def _format_data_as_ndjson(data):
+    """Format data as newline delimited JSON, one compact record per line
+
+    Note: Records are generated lazily, so an iterator of records is
+    never materialized
+    """
+
+    if not isinstance(data, (list, types.GeneratorType)):
+        data = [data]
+
+    for record in data:
+        yield json.dumps(record, separators=(',', ':'))
 
-    # Get common keys
-    common_keys = {key for key, val in data[0].items() if isinstance(val, str)}
-    for idx in range(1, len(data)):
-        common_keys = common_keys.intersection(set(data[idx].keys()))
-    common_keys = sorted(common_keys)
-    # Construct output as table
-    column_width = {val: len(data[0][val]) for val in common_keys}
-    row_format = ''.join(['{:' + str(width) + '}\t\t' for _, width in column_width.items()])
-
-    title = row_format.format(*column_width.keys())
-
-    separator_column_width = ['-' * width for _, width in column_width.items()]
-    separator = row_format.format(*separator_column_width)
-    formatted_data = title + '\n' + separator
-
-    # Construct each row data
-    for entry in data:
-        row_data = [entry[key] for key in common_keys]
-        formatted_data += '\n' + row_format.format(*row_data)
-    return formatted_data
 
+def _normalize_data(data):
+    """Normalize data prior to formatting """
 
-def format_output(data):
+    # it is typical that data is machine readable, however
+    # if text is provided wrap it like so: {"message": "my message"}
+    if not isinstance(data, (dict, list, types.GeneratorType)):
+        data = {'message': data}
+    return data
+
+
+def _apply_query(data, query):
+    """Apply a compiled query (projection) to data
+
+    Note: For a list or generator the query is applied to each item
+    lazily and items without a result are dropped, so the whole
+    document is never projected (or serialized) at once
+    """
+
+    if query is None:
+        return data
+    if isinstance(data, dict):
+        return query.search(data)
+    return (result for result in map(query.search, data) if result is not None)
+
+
+def format_output_records(data, **kwargs):
+    """ Get data as a stream of NDJSON records
+
+        Parameters
+        ----------
+        data : dict, list, generator
+            output data in a machine readable format
+        **kwargs :
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        query : object
+            a compiled JMESPath expression, applied to each record
+
+        Returns
+        -------
+        generator
+            one compact JSON string per record, a list or generator
+            produces a record per item:
+            {"id":"624d58f0-6875-469a-ba12-d0f1390f7464","location":"westus"}
+            {"id":"17cd4583-f63b-4f38-a890-4bdee3d99e98","location":"westus"}
+    """
+
+    return _format_data_as_ndjson(
+        _apply_query(_normalize_data(data), kwargs.pop('query', None)))
+
+
+def format_output(data, **kwargs):
     """ Get data in specified format
 
         Parameters
         ----------
         data : dict
             output data in a machine readable format
+        **kwargs :
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        output_format : str
+            the output format, discovered using get_output_format if not provided
+        query : object
+            a compiled JMESPath expression, applied to the data (or to each
+            item of a list) prior to formatting
+        columns : list
+            the table columns to include (TABLE format only)
+        max_column_width : int
+            truncate table cells longer than this width (TABLE format only)
+
         Returns
         -------
         str
@@ -119,18 +279,32 @@ def format_output(data):
                     "test_cli": "f5"
                 }
             }
+
+            If output_format is JSON_COMPACT, output will be JSON without any whitespace:
+            [{"id":"624d58f0-6875-469a-ba12-d0f1390f7464","location":"westus",...},...]
+
+            If output_format is NDJSON, output will be one compact JSON record per line:
+            {"id":"624d58f0-6875-469a-ba12-d0f1390f7464","location":"westus",...}
+            {"id":"17cd4583-f63b-4f38-a890-4bdee3d99e98","location":"westus",...}
     """
-    output_format = _get_output_format()
+    output_format = kwargs.pop('output_format', None) or get_output_format()
 
-    # it is typical that data is machine readable, however
-    # if text is provided wrap it like so: {"message": "my message"}
-    if not isinstance(data, (dict, list)):
-        data = {'message': data}
+    data = _apply_query(_normalize_data(data), kwargs.pop('query', None))
+    if isinstance(data, types.GeneratorType) and output_format != FORMATS['NDJSON']:
+        data = list(data)
 
     if output_format == FORMATS['JSON']:
         formatted_data = json.dumps(data, indent=4, sort_keys=True)
+    elif output_format == FORMATS['JSON_COMPACT']:
+        formatted_data = json.dumps(data, separators=(',', ':'))
     elif output_format == FORMATS['TABLE']:
-        formatted_data = _format_data_as_table(data)
+        formatted_data = _format_data_as_table(
+            data,
+            columns=kwargs.pop('columns', None),
+            max_column_width=kwargs.pop('max_column_width', None)
+        )
+    elif output_format == FORMATS['NDJSON']:
+        formatted_data = '\n'.join(_format_data_as_ndjson(data))
     else:
         raise click.ClickException("Unsupported format {}".format(output_format))
 
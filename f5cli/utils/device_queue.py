@@ -0,0 +1,275 @@
+""" Per-device serialization of conflicting (write) operations
+
+Example::
+
+    with DeviceLock('192.0.2.10', timeout=600) as lock:
+        retry_on_busy(client.create_service, 'decl.json', deadline=lock.deadline)
+
+The same lock files serialize updates of local files, using file_lock
+"""
+
+import os
+import re
+import time
+import random
+import contextlib
+
+from f5sdk.exceptions import HTTPError
+
+from f5cli import constants
+
+if os.name == 'nt':
+    import msvcrt  # pylint: disable=import-error
+
+    def _lock_file(fileno):
+        """ Take an exclusive, non-blocking lock on the first byte of a file """
+        msvcrt.locking(fileno, msvcrt.LK_NBLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(fileno):
+        """ Take an exclusive, non-blocking lock on a file """
+        fcntl.flock(fileno, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+LOCK_POLL_INTERVAL = 0.5
+BUSY_STATUS_CODE = 'code: 503'
+BUSY_BACKOFF = {
+    'BASE_IN_SECS': 1,
+    'MAX_IN_SECS': 30
+}
+
+
+def _try_lock(file):
+    """Attempt to take an exclusive, non-blocking lock on an open file
+
+    Parameters
+    ----------
+    file : file
+        the open lock file
+
+    Returns
+    -------
+    bool
+        true if the lock was acquired
+    """
+
+    try:
+        _lock_file(file.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def _get_lock_path(name):
+    """ Get the path of the lock file of a name, in the lock directory """
+
+    return os.path.join(constants.F5_CLI_LOCK_DIR,
+                        '%s.lock' % re.sub(r'[^\w.-]', '_', str(name)))
+
+
+def _acquire_lock_file(path, deadline, timeout_message):
+    """Wait (up to the deadline) for an exclusive lock on a lock file
+
+    Parameters
+    ----------
+    path : str
+        the lock file path
+    deadline : float
+        monotonic time at which to stop waiting
+    timeout_message : str
+        the message of the error raised once the deadline expires
+
+    Returns
+    -------
+    file
+        the open, locked file, closing it releases the lock
+
+    Raises
+    ------
+    TimeoutError
+        if the lock is still held once the deadline expires
+    """
+
+    if not os.path.exists(constants.F5_CLI_LOCK_DIR):
+        os.makedirs(constants.F5_CLI_LOCK_DIR, mode=0o700, exist_ok=True)
+    # never follow a symlink planted in place of the lock file
+    file = os.fdopen(os.open(
+        path, os.O_CREAT | os.O_WRONLY | getattr(os, 'O_NOFOLLOW', 0), 0o600), 'w')
+    while not _try_lock(file):
+        if time.monotonic() >= deadline:
+            file.close()
+            raise TimeoutError(timeout_message)
+        time.sleep(LOCK_POLL_INTERVAL)
+    return file
+
+
+@contextlib.contextmanager
+def file_lock(name, timeout):
+    """Hold a cross-process lock on a name, such as a local file being updated
+
+    Parameters
+    ----------
+    name : str
+        the lock name, such as the path of the file
+    timeout : int
+        maximum number of seconds to wait for the lock
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    TimeoutError
+        if the lock is still held by another process once the timeout expires
+    """
+
+    file = _acquire_lock_file(
+        _get_lock_path(name), time.monotonic() + timeout,
+        f"Timed out after {timeout} seconds waiting for the lock on {name}")
+    try:
+        yield
+    finally:
+        file.close()
+
+
+class DeviceLock:
+    """ A cross-process lock used to serialize write operations against a device
+
+    Note: The lock is an OS level lock on a file in the (private) lock
+    directory of the user, it is released automatically if the holding
+    process exits
+
+    Attributes
+    ----------
+    deadline : float
+        monotonic time at which the queue timeout expires
+
+    Methods
+    -------
+    acquire()
+        See method documentation for more details
+    release()
+        See method documentation for more details
+    """
+
+    def __init__(self, host, **kwargs):
+        """Class initialization
+
+        Parameters
+        ----------
+        host : str
+            the device host, used as the lock key
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        timeout: int
+            maximum number of seconds to wait in the queue
+        enabled: bool
+            when false, no lock is taken (only the deadline is tracked)
+
+        Returns
+        -------
+        None
+        """
+
+        self._host = host
+        self._timeout = kwargs.pop('timeout', constants.DEFAULT_QUEUE_TIMEOUT)
+        self._enabled = kwargs.pop('enabled', True)
+        self._path = _get_lock_path(host)
+        self._file = None
+        self.deadline = None
+
+    def acquire(self):
+        """ Wait (up to the timeout) for the device lock
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        TimeoutError
+            if the lock is still held by another operation once the timeout expires
+        """
+
+        self.deadline = time.monotonic() + self._timeout
+        if not self._enabled:
+            return
+        self._file = _acquire_lock_file(
+            self._path, self.deadline,
+            f"Timed out after {self._timeout} seconds waiting for another "
+            f"operation against {self._host} to complete")
+
+    def release(self):
+        """ Release the device lock
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        if self._file is not None:
+            # closing the file releases the OS level lock
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+def retry_on_busy(func, *args, **kwargs):
+    """ Call func, retrying while the device reports it is busy (503)
+
+    Note: f5sdk surfaces only the status code of a failed request, so
+    the delay between attempts is a jittered exponential backoff
+
+    Parameters
+    ----------
+    func : function
+        the function to call
+    *args :
+        positional arguments passed to func
+    **kwargs:
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    deadline: float
+        monotonic time after which no further attempt is made
+
+    Returns
+    -------
+    object
+        the return value of func
+    """
+
+    deadline = kwargs.pop('deadline', None)
+    if deadline is None:
+        deadline = time.monotonic() + constants.DEFAULT_QUEUE_TIMEOUT
+
+    attempt = 0
+    while True:
+        try:
+            return func(*args)
+        except HTTPError as error:
+            remaining = deadline - time.monotonic()
+            if BUSY_STATUS_CODE not in str(error) or remaining <= 0:
+                raise
+        delay = min(BUSY_BACKOFF['MAX_IN_SECS'], BUSY_BACKOFF['BASE_IN_SECS'] * 2 ** attempt)
+        time.sleep(min(remaining, random.uniform(delay / 2, delay)))
+        attempt += 1
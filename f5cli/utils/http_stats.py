@@ -0,0 +1,204 @@
+""" HTTP request statistics, such as request counts, bytes and latency per endpoint
+
+Requests are recorded at the requests Session.send level, which every f5sdk
+request (and every other requests call) goes through, including each redirect
+
+Example::
+
+    http_stats.enable()
+    client.show_service()
+    rows = http_stats.get_http_stats(http_stats.disable())
+"""
+
+import re
+import math
+import time
+import functools
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+# path segments replaced by a placeholder in the path template, such as task
+# IDs, Cloud Services IDs (s-, a-, u-, ...) and package file names
+VARIABLE_SEGMENTS = [
+    re.compile(r'^\d+$'),
+    re.compile(r'^[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}$'),
+    re.compile(r'^[a-z]{1,2}-(?=.*[A-Z0-9])[A-Za-z0-9]{6,}$'),
+    re.compile(r'^[^.]+(\.[^.]+)*\.[A-Za-z]+$')
+]
+PERCENTILES = [50, 95]
+
+# recorded requests, None while statistics are disabled
+_RECORDS = None
+_LOCK = threading.Lock()
+# the Session.send wrapped while statistics are enabled
+_SEND = requests.Session.send
+
+
+def _get_size(body):
+    """Get the size of a request body, 0 if it is streamed (unknown size) """
+
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    return 0
+
+
+def get_transferred_bytes(request, response=None, stream=False):
+    """Get the number of bytes sent and received by a request
+
+    Parameters
+    ----------
+    request : object
+        the prepared request
+    response : object
+        the response, None if the request failed
+    stream : bool
+        the response content is streamed, its size is taken from the headers
+
+    Returns
+    -------
+    tuple
+        a (sent, received) tuple
+    """
+
+    sent = _get_size(request.body) or int(request.headers.get('Content-Length', 0))
+    if response is None:
+        return sent, 0
+    if stream:
+        return sent, int(response.headers.get('Content-Length', 0))
+    return sent, len(response.content or b'')
+
+
+@functools.wraps(requests.Session.send)
+def _send(session, request, **kwargs):
+    """Send a request, recording it while statistics are enabled """
+
+    if _RECORDS is None:
+        return _SEND(session, request, **kwargs)
+    response = None
+    start = time.monotonic()
+    try:
+        response = _SEND(session, request, **kwargs)
+        return response
+    finally:
+        elapsed = time.monotonic() - start
+        sent, received = get_transferred_bytes(request, response, kwargs.get('stream'))
+        url = urlsplit(request.url)
+        with _LOCK:
+            if _RECORDS is not None:
+                _RECORDS.append((request.method, url.netloc, url.path, sent, received, elapsed))
+
+
+def enable():
+    """Start recording requests, discarding any previously recorded
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+
+    global _RECORDS, _SEND  # pylint: disable=global-statement
+    with _LOCK:
+        _RECORDS = []
+    # wrap the current send, which may itself be wrapped, such as for tracing
+    if requests.Session.send is not _send:
+        _SEND = requests.Session.send
+        requests.Session.send = _send
+
+
+def disable():
+    """Stop recording requests
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    list
+        the recorded requests
+    """
+
+    global _RECORDS  # pylint: disable=global-statement
+    if requests.Session.send is _send:
+        requests.Session.send = _SEND
+    with _LOCK:
+        records, _RECORDS = _RECORDS, None
+    return records or []
+
+
+def get_path_template(path):
+    """Get the path template, with variable segments replaced by a placeholder
+
+    Parameters
+    ----------
+    path : str
+        the request path, such as /mgmt/shared/appsvcs/task/<task id>
+
+    Returns
+    -------
+    str
+        the path template, such as /mgmt/shared/appsvcs/task/{id}
+    """
+
+    return '/'.join(
+        '{id}' if any(pattern.match(segment) for pattern in VARIABLE_SEGMENTS) else segment
+        for segment in path.split('/')
+    )
+
+
+def _percentile(latencies, percentile):
+    """Get a percentile of sorted latencies, using the nearest rank """
+
+    return latencies[max(0, math.ceil(percentile / 100 * len(latencies)) - 1)]
+
+
+def _get_row(method, host, path, records):
+    """Summarize the requests to an endpoint """
+
+    latencies = sorted(record[5] for record in records)
+    row = {
+        'method': method,
+        'host': host,
+        'path': path,
+        'count': len(records),
+        'sent_bytes': sum(record[3] for record in records),
+        'received_bytes': sum(record[4] for record in records)
+    }
+    for percentile in PERCENTILES:
+        row['p%d_ms' % percentile] = round(_percentile(latencies, percentile) * 1000, 3)
+    row['max_ms'] = round(latencies[-1] * 1000, 3)
+    return row
+
+
+def get_http_stats(records):
+    """Get the request statistics per endpoint (method, host and path template)
+
+    Parameters
+    ----------
+    records : list
+        the recorded requests, see disable()
+
+    Returns
+    -------
+    list
+        a dict per endpoint, most requested first, followed by the totals
+    """
+
+    if not records:
+        return []
+    endpoints = {}
+    for record in records:
+        key = (record[0], record[1], get_path_template(record[2]))
+        endpoints.setdefault(key, []).append(record)
+    rows = sorted((_get_row(*key, endpoint_records) for key, endpoint_records in endpoints.items()),
+                  key=lambda row: (-row['count'], row['host'], row['path'], row['method']))
+    rows.append(_get_row('*', '*', '*', records))
+    return rows
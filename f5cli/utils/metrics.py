@@ -0,0 +1,333 @@
+""" Prometheus textfile metrics of operations, for the node_exporter textfile collector
+
+Operations are counted per component and action, with a duration histogram,
+along with the HTTP requests made and the bytes transferred. Metrics are
+merged into the file, so counters keep increasing across runs, and the file
+is replaced atomically. Long running invocations, such as a REPL session,
+also write the metrics periodically
+
+Example::
+
+    with MetricsRecorder('/var/lib/node_exporter/textfile/f5.prom') as recorder:
+        with operation('as3', 'create'):
+            client.create_service(declaration)
+    recorder.flush()
+"""
+
+import os
+import re
+import time
+import functools
+import threading
+from contextlib import contextmanager
+
+import requests
+
+from f5cli.utils.device_queue import file_lock
+from f5cli.utils.http_stats import get_transferred_bytes
+
+# metric families: (type, help)
+METRICS = {
+    'f5cli_operations_total': (
+        'counter', 'Completed extension and Cloud Services operations, by status.'),
+    'f5cli_operation_duration_seconds': (
+        'histogram', 'Duration of extension and Cloud Services operations.'),
+    'f5cli_http_requests_total': ('counter', 'HTTP requests made.'),
+    'f5cli_http_sent_bytes_total': ('counter', 'HTTP request body bytes sent.'),
+    'f5cli_http_received_bytes_total': ('counter', 'HTTP response body bytes received.'),
+    'f5cli_last_write_timestamp_seconds': ('gauge', 'Time the metrics were last written.')
+}
+HISTOGRAM_SUFFIXES = ['_bucket', '_sum', '_count']
+# extension operations, such as installs and declarations, can take minutes
+DURATION_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+FLUSH_INTERVAL = 60
+METRICS_LOCK_TIMEOUT = 30
+SAMPLE_REGEX = re.compile(r'^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)$')
+LABEL_REGEX = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+ESCAPE_REGEX = re.compile(r'\\(.)')
+
+# the recorder of the current invocation, if any
+_RECORDER = None
+
+
+def _format_value(value):
+    """Format a label or sample value """
+
+    if isinstance(value, float):
+        return repr(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+def _format_labels(labels):
+    """Format sample labels, such as {component="as3",action="create"} """
+
+    if not labels:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (
+        key, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    ) for key, value in labels)
+
+
+def _get_family(name):
+    """Get the metric family of a sample name, None if it is not a known metric """
+
+    if name in METRICS:
+        return name
+    for suffix in HISTOGRAM_SUFFIXES:
+        if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+            return name[:-len(suffix)]
+    return None
+
+
+def read_samples(path):
+    """Read the samples of known metrics from a textfile
+
+    Parameters
+    ----------
+    path : str
+        the textfile
+
+    Returns
+    -------
+    dict
+        the sample values, keyed by (name, labels) where labels is a tuple of (key, value)
+    """
+
+    samples = {}
+    if not os.path.exists(path):
+        return samples
+    with open(path) as file:
+        for line in file:
+            match = SAMPLE_REGEX.match(line.strip())
+            if not match or not _get_family(match.group(1)):
+                continue
+            labels = tuple(
+                (key, ESCAPE_REGEX.sub(lambda match: '\n' if match.group(1) == 'n'
+                                       else match.group(1), value))
+                for key, value in LABEL_REGEX.findall(match.group(2) or '')
+            )
+            samples[(match.group(1), labels)] = float(match.group(3))
+    return samples
+
+
+def format_samples(samples):
+    """Format samples in the Prometheus text format, grouped by metric family
+
+    Parameters
+    ----------
+    samples : dict
+        the sample values, keyed by (name, labels)
+
+    Returns
+    -------
+    str
+        the text
+    """
+
+    families = list(METRICS)
+
+    def _sort_key(key):
+        name, labels = key
+        family = _get_family(name)
+        suffix = name[len(family):]
+        le = dict(labels).get('le')
+        return (families.index(family), [label for label in labels if label[0] != 'le'],
+                HISTOGRAM_SUFFIXES.index(suffix) if suffix else 0,
+                float(le) if le is not None else 0)
+
+    lines = []
+    family = None
+    for key in sorted(samples, key=_sort_key):
+        name, labels = key
+        if _get_family(name) != family:
+            family = _get_family(name)
+            lines.append('# HELP %s %s' % (family, METRICS[family][1]))
+            lines.append('# TYPE %s %s' % (family, METRICS[family][0]))
+        lines.append('%s%s %s' % (name, _format_labels(labels), _format_value(samples[key])))
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsRecorder:
+    """ A class used to record the metrics of an invocation and write them to a textfile
+
+    Attributes
+    ----------
+
+    Methods
+    -------
+    observe_operation()
+        See method documentation for more details
+    flush()
+        See method documentation for more details
+    """
+
+    def __init__(self, path, **kwargs):
+        """Class initialization
+
+        Parameters
+        ----------
+        path : str
+            the textfile, such as in the node_exporter textfile collector directory
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        interval: int
+            the number of seconds between periodic writes, 0 to only write on exit
+
+        Returns
+        -------
+        None
+        """
+
+        self._path = os.path.abspath(path)
+        self._interval = kwargs.pop('interval', FLUSH_INTERVAL)
+        # increments not yet written to the file
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._send = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        global _RECORDER  # pylint: disable=global-statement
+        _RECORDER = self
+        self._send = requests.Session.send
+        requests.Session.send = self._get_counted_send(self._send)
+        if self._interval:
+            self._thread = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        global _RECORDER  # pylint: disable=global-statement
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        requests.Session.send = self._send
+        _RECORDER = None
+
+    def _flush_periodically(self):
+        """Write the metrics every interval, until stopped """
+
+        while not self._stopped.wait(self._interval):
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                pass  # retried at the next interval, and on exit
+
+    def _increment(self, name, labels, value=1):
+        """Increment a sample, pending the next write """
+
+        with self._lock:
+            self._pending[(name, labels)] = self._pending.get((name, labels), 0) + value
+
+    def _get_counted_send(self, send):
+        """Wrap Session.send, counting requests and bytes transferred """
+
+        @functools.wraps(send)
+        def _send(session, request, **kwargs):
+            response = None
+            try:
+                response = send(session, request, **kwargs)
+                return response
+            finally:
+                sent, received = get_transferred_bytes(request, response, kwargs.get('stream'))
+                self._increment('f5cli_http_requests_total', (('method', request.method),))
+                self._increment('f5cli_http_sent_bytes_total', (), sent)
+                self._increment('f5cli_http_received_bytes_total', (), received)
+        return _send
+
+    def observe_operation(self, component, action, duration, failed=False):
+        """ Record a completed operation
+
+        Parameters
+        ----------
+        component : str
+            the component, such as as3 or cs.account
+        action : str
+            the action, such as create
+        duration : float
+            the operation duration, in seconds
+        failed : bool
+            the operation failed
+
+        Returns
+        -------
+        None
+        """
+
+        labels = (('component', component), ('action', action))
+        self._increment('f5cli_operations_total',
+                        labels + (('status', 'failure' if failed else 'success'),))
+        for bucket in DURATION_BUCKETS:
+            if duration <= bucket:
+                self._increment('f5cli_operation_duration_seconds_bucket',
+                                labels + (('le', _format_value(float(bucket))),))
+        self._increment('f5cli_operation_duration_seconds_bucket', labels + (('le', '+Inf'),))
+        self._increment('f5cli_operation_duration_seconds_sum', labels, duration)
+        self._increment('f5cli_operation_duration_seconds_count', labels)
+
+    def flush(self):
+        """ Merge the pending increments into the textfile, replacing it atomically
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        try:
+            # serialize concurrent runs writing the same file, so no increments are lost
+            with file_lock('metrics-%s' % self._path, timeout=METRICS_LOCK_TIMEOUT):
+                samples = read_samples(self._path)
+                for key, value in pending.items():
+                    samples[key] = samples.get(key, 0) + value
+                samples[('f5cli_last_write_timestamp_seconds', ())] = float(int(time.time()))
+                tmp_path = '%s.%s.tmp' % (self._path, os.getpid())
+                with open(tmp_path, 'w') as file:
+                    file.write(format_samples(samples))
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self._path)
+        except Exception:
+            # keep the increments for the next write
+            with self._lock:
+                for key, value in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + value
+            raise
+
+
+@contextmanager
+def operation(component, action):
+    """Record an operation, if metrics are being recorded
+
+    Parameters
+    ----------
+    component : str
+        the component, such as as3 or cs.account
+    action : str
+        the action, such as create
+
+    Returns
+    -------
+    object
+        the context manager
+    """
+
+    recorder = _RECORDER
+    if recorder is None:
+        yield
+        return
+    start = time.monotonic()
+    try:
+        yield
+    except Exception:
+        recorder.observe_operation(component, action, time.monotonic() - start, failed=True)
+        raise
+    recorder.observe_operation(component, action, time.monotonic() - start)
@@ -0,0 +1,92 @@
+""" Lazy pagination of list operations
+
+Example::
+
+    for item in paginate(SubscriptionClient(mgmt_client).list, page_size=50):
+        print(item)
+"""
+
+from f5cli import constants
+
+
+def get_page_items(response):
+    """Get the items contained in a single page (or unpaginated) list response
+
+    Parameters
+    ----------
+    response : dict, list
+        the list response, either a list or an object containing a list
+
+    Returns
+    -------
+    list
+        the items in the page
+    """
+
+    if isinstance(response, list):
+        return response
+    for val in (response or {}).values():
+        if isinstance(val, list):
+            return val
+    return []
+
+
+def paginate(list_func, **kwargs):
+    """ Iterate the items of a list operation, one page at a time
+
+    Note: A page is only requested once every item of the previous page
+    has been consumed, so the first items are available as soon as the
+    first page arrives
+
+    Parameters
+    ----------
+    list_func : function
+        the list operation, accepting a 'query_parameters' keyword argument
+    **kwargs:
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    page_size: int
+        number of items requested per page
+    max_items: int
+        stop after this many items
+    query_parameters: dict
+        additional query parameters for each request
+
+    Returns
+    -------
+    generator
+        the items, across all pages
+    """
+
+    page_size = kwargs.pop('page_size', None) or constants.CS_PAGINATION['DEFAULT_PAGE_SIZE']
+    max_items = kwargs.pop('max_items', None)
+    query_parameters = kwargs.pop('query_parameters', None) or {}
+    if max_items:
+        page_size = min(page_size, max_items)
+
+    count = 0
+    offset = 0
+    first_item = None
+    while True:
+        page_parameters = dict(query_parameters)
+        page_parameters[constants.CS_PAGINATION['PAGE_SIZE_PARAMETER']] = page_size
+        page_parameters[constants.CS_PAGINATION['OFFSET_PARAMETER']] = offset
+        items = get_page_items(list_func(query_parameters=page_parameters))
+
+        # an API ignoring the offset returns the same page again
+        if not items or (offset and items[0] == first_item):
+            return
+        first_item = items[0]
+
+        for item in items:
+            yield item
+            count += 1
+            if max_items and count >= max_items:
+                return
+
+        # a short (or unpaginated) page is the last page
+        if len(items) != page_size:
+            return
+        offset += len(items)
@@ -0,0 +1,281 @@
+""" Profiling of a whole command invocation, CPU time or memory allocations
+
+Example::
+
+    with CommandProfiler('/tmp/f5.pstats') as profiler:
+        invoke_command()
+    ctx.log(profiler.summary())
+"""
+
+import pstats
+import cProfile
+import tracemalloc
+
+# values of the F5_CLI_PROFILE environment variable which enable a summary only
+PROFILE_ENABLED_VALUES = ['', '1', 'true', 'yes']
+# values of the F5_CLI_PROFILE environment variable which disable profiling
+PROFILE_DISABLED_VALUES = ['0', 'false', 'no']
+PROFILE_TOP_N = 25
+PROFILE_SORT_KEY = 'cumulative'
+MEMPROFILE_TOP_N = 10
+# a snapshot is expensive, a checkpoint only takes one once traced memory grew by
+# this fraction (and at least this number of bytes) since the previous snapshot
+MEMPROFILE_SNAPSHOT_GROWTH = 0.25
+MEMPROFILE_SNAPSHOT_MIN_GROWTH_BYTES = 1024 * 1024
+# allocations made by the import machinery and tracemalloc itself are not reported
+MEMPROFILE_IGNORED_FILES = ['<frozen importlib._bootstrap>',
+                            '<frozen importlib._bootstrap_external>',
+                            tracemalloc.__file__]
+
+# the memory profiler tracing the current invocation, if any
+_MEMORY_PROFILER = None
+
+
+def is_profile_disabled(value):
+    """Check if the --profile option value disables profiling, such as false
+
+    Parameters
+    ----------
+    value : str
+        the option value
+
+    Returns
+    -------
+    bool
+        true if profiling is disabled
+    """
+
+    return value is None or value.lower() in PROFILE_DISABLED_VALUES
+
+
+def get_profile_path(value):
+    """Get the pstats dump file from the --profile option value
+
+    Parameters
+    ----------
+    value : str
+        the option value, empty (or a true value) if no dump file is requested
+
+    Returns
+    -------
+    str
+        the dump file, or None
+    """
+
+    if value is None or value.lower() in PROFILE_ENABLED_VALUES:
+        return None
+    return value
+
+
+class CommandProfiler:
+    """ A class used to profile a command invocation using cProfile
+
+    Attributes
+    ----------
+
+    Methods
+    -------
+    summary()
+        See method documentation for more details
+    dump()
+        See method documentation for more details
+    """
+
+    def __init__(self, path=None, **kwargs):
+        """Class initialization
+
+        Parameters
+        ----------
+        path : str
+            the file to dump the pstats data to, or None
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        top: int
+            the number of functions included in the summary
+
+        Returns
+        -------
+        None
+        """
+
+        self._path = path
+        self._top = kwargs.pop('top', PROFILE_TOP_N)
+        self._profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, *args):
+        self._profiler.disable()
+
+    def summary(self):
+        """ Summarize the functions with the highest cumulative time
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list
+            a dict per function, sorted by cumulative time
+        """
+
+        stats = pstats.Stats(self._profiler).sort_stats(PROFILE_SORT_KEY)
+        rows = []
+        for func in stats.fcn_list[:self._top]:  # pylint: disable=no-member
+            primitive_calls, calls, total_time, cumulative_time, _ = stats.stats[func]
+            filename, line, name = func
+            rows.append({
+                'calls': calls if calls == primitive_calls else '%d/%d' % (calls, primitive_calls),
+                'tottime': round(total_time, 6),
+                'cumtime': round(cumulative_time, 6),
+                'function': '%s:%d(%s)' % (filename, line, name)
+            })
+        return rows
+
+    def dump(self):
+        """ Dump the pstats data to the file, if any
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        str
+            the file, or None
+        """
+
+        if self._path:
+            self._profiler.dump_stats(self._path)
+        return self._path
+
+
+def memory_checkpoint():
+    """Snapshot the traced allocations of the current invocation, if memory profiling is enabled
+
+    Notes
+    -----
+    Called while a command's output is held in memory, such as when it is
+    formatted, so the summary shows the sites allocating the output rather
+    than only what is left at exit. Checkpoints are cheap unless memory grew
+    significantly since the previous snapshot, so they may be frequent
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+
+    if _MEMORY_PROFILER is not None:
+        _MEMORY_PROFILER.checkpoint()
+
+
+class MemoryProfiler:
+    """ A class used to trace the memory allocations of a command invocation using tracemalloc
+
+    Attributes
+    ----------
+    peak : int
+        the peak traced memory, in bytes
+
+    Methods
+    -------
+    summary()
+        See method documentation for more details
+    """
+
+    def __init__(self, **kwargs):
+        """Class initialization
+
+        Parameters
+        ----------
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        top: int
+            the number of allocation sites included in the summary
+        frames: int
+            the number of frames stored per allocation, sites are grouped by the full traceback
+
+        Returns
+        -------
+        None
+        """
+
+        self._top = kwargs.pop('top', MEMPROFILE_TOP_N)
+        self._frames = kwargs.pop('frames', 1)
+        self._snapshot = None
+        self._snapshot_size = -1
+        self.peak = 0
+
+    def __enter__(self):
+        global _MEMORY_PROFILER  # pylint: disable=global-statement
+        _MEMORY_PROFILER = self
+        tracemalloc.start(self._frames)
+        return self
+
+    def __exit__(self, *args):
+        global _MEMORY_PROFILER  # pylint: disable=global-statement
+        self.checkpoint(throttle=False)
+        _, self.peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        _MEMORY_PROFILER = None
+
+    def checkpoint(self, throttle=True):
+        """ Snapshot the traced allocations, if more memory is in use than at the previous snapshot
+
+        Parameters
+        ----------
+        throttle : bool
+            only snapshot once memory grew significantly (see MEMPROFILE_SNAPSHOT_GROWTH)
+
+        Returns
+        -------
+        None
+        """
+
+        current, _ = tracemalloc.get_traced_memory()
+        threshold = self._snapshot_size
+        if throttle and self._snapshot is not None:
+            threshold += max(self._snapshot_size * MEMPROFILE_SNAPSHOT_GROWTH,
+                             MEMPROFILE_SNAPSHOT_MIN_GROWTH_BYTES)
+        if current > threshold:
+            self._snapshot_size = current
+            self._snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, filename) for filename in MEMPROFILE_IGNORED_FILES]
+            )
+
+    def summary(self):
+        """ Summarize the allocation sites holding the most memory, at the largest snapshot
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list
+            a dict per allocation site, largest first
+        """
+
+        group_by = 'traceback' if self._frames > 1 else 'lineno'
+        rows = []
+        for stat in self._snapshot.statistics(group_by)[:self._top]:
+            rows.append({
+                'size_kib': round(stat.size / 1024, 1),
+                'count': stat.count,
+                'site': ' <- '.join('%s:%d' % (frame.filename, frame.lineno)
+                                    for frame in stat.traceback)
+            })
+        return rows
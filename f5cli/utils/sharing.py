@@ -0,0 +1,164 @@
+""" State shared by the commands of a batch, such as logged in clients and loaded files
+
+Each command normally loads the configuration and authentication files and
+logs in again. Once enabled, such as by 'f5 batch', clients are created once
+per account and files are parsed once per modification, so every command
+after the first skips the login and the YAML parsing
+
+Example::
+
+    sharing.enable()
+    client = sharing.get_client(('bigip', host, port, user, password),
+                                lambda: ManagementClient(host, user=user, password=password))
+    sharing.disable()
+"""
+
+import os
+import copy
+import time
+import threading
+
+# clients are logged in again before their token (valid for an hour) expires
+CLIENT_MAX_AGE = 1800
+
+# shared clients and files, None while sharing is disabled
+_STATE = None
+_LOCK = threading.Lock()
+
+
+def enable():
+    """Start sharing clients and loaded files
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+
+    global _STATE  # pylint: disable=global-statement
+    with _LOCK:
+        if _STATE is None:
+            _STATE = {'clients': {}, 'client_locks': {}, 'files': {}}
+
+
+def disable():
+    """Stop sharing, discarding the shared clients and loaded files
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+
+    global _STATE  # pylint: disable=global-statement
+    with _LOCK:
+        _STATE = None
+
+
+def is_enabled():
+    """Check if clients and loaded files are being shared
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    bool
+        True if sharing is enabled
+    """
+
+    return _STATE is not None
+
+
+def get_client(key, factory):
+    """Get a client, shared by every caller with the same key while sharing is enabled
+
+    Notes
+    -----
+    Concurrent callers with the same key wait for a single client to be created
+
+    Parameters
+    ----------
+    key : tuple
+        identifies the account, such as the provider, host and credentials
+    factory : function
+        creates (and logs in) the client
+
+    Returns
+    -------
+    object
+        the client
+    """
+
+    state = _STATE
+    if state is None:
+        return factory()
+    with _LOCK:
+        key_lock = state['client_locks'].setdefault(key, threading.Lock())
+    with key_lock:
+        created, client = state['clients'].get(key, (None, None))
+        if created is None or time.monotonic() - created > CLIENT_MAX_AGE:
+            client = factory()
+            state['clients'][key] = (time.monotonic(), client)
+        return client
+
+
+def load_file(path, loader):
+    """Load a file, parsing it again only once modified while sharing is enabled
+
+    Parameters
+    ----------
+    path : str
+        the file
+    loader : function
+        reads and parses the file
+
+    Returns
+    -------
+    object
+        the loaded contents, a copy callers are free to modify
+    """
+
+    state = _STATE
+    if state is None:
+        return loader()
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return loader()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _LOCK:
+        cached = state['files'].get(path)
+    if cached is not None and cached[0] == signature:
+        return copy.deepcopy(cached[1])
+    contents = loader()
+    with _LOCK:
+        state['files'][path] = (signature, copy.deepcopy(contents))
+    return contents
+
+
+def forget_file(path):
+    """Forget the loaded contents of a file, after writing it
+
+    Parameters
+    ----------
+    path : str
+        the file
+
+    Returns
+    -------
+    None
+    """
+
+    state = _STATE
+    if state is None:
+        return
+    with _LOCK:
+        state['files'].pop(path, None)
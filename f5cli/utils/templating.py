@@ -0,0 +1,272 @@
+""" Render declarations from a JSON template and a CSV file of variables
+
+Placeholders have the form ${name}, or ${name:type} where type is one of
+str (default), int, float, bool or json. A typed placeholder must be the
+entire string value, for example "virtualPort": "${port:int}"
+
+Example::
+
+    declaration = render_declaration('template.json', 'apps.csv')
+"""
+
+import re
+import csv
+import json
+from itertools import islice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+PLACEHOLDER = re.compile(r'\$\{(\w+)(?::(\w+))?\}')
+CONVERTERS = {
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': lambda value: value.strip().lower() in ['true', 'yes', '1'],
+    'json': json.loads
+}
+# inputs with fewer rows are always rendered in process, the process pool start up cost dominates
+PROCESS_POOL_THRESHOLD = 1000
+RENDER_CHUNK_SIZE = 250
+
+# the compiled template, in a render worker process
+_WORKER_RENDER = None
+
+
+def _compile_string(value):
+    """Compile a template string into a function of the row variables """
+
+    parts = PLACEHOLDER.split(value)
+    if len(parts) == 1:
+        return lambda variables: value
+
+    # a placeholder which is the entire string may convert the value type
+    if len(parts) == 4 and not parts[0] and not parts[3]:
+        name, type_name = parts[1], parts[2] or 'str'
+        if type_name not in CONVERTERS:
+            raise Exception('Unknown placeholder type: %s' % type_name)
+        converter = CONVERTERS[type_name]
+        return lambda variables: converter(variables[name])
+
+    literals = parts[0::3]
+    names = parts[1::3]
+    if any(parts[2::3]):
+        raise Exception('Typed placeholders must be the entire string: %s' % value)
+
+    def _render(variables):
+        rendered = [literals[0]]
+        for name, literal in zip(names, literals[1:]):
+            rendered.append(variables[name])
+            rendered.append(literal)
+        return ''.join(rendered)
+    return _render
+
+
+def compile_template(template):
+    """Compile a template once, into a function rendering a declaration from row variables
+
+    Parameters
+    ----------
+    template : dict, list, str
+        the parsed JSON template
+
+    Returns
+    -------
+    function
+        called with a dict of variables, returns the rendered declaration
+    """
+
+    if isinstance(template, dict):
+        items = [(_compile_string(key), compile_template(val)) for key, val in template.items()]
+        return lambda variables: {key(variables): val(variables) for key, val in items}
+    if isinstance(template, list):
+        items = [compile_template(val) for val in template]
+        return lambda variables: [val(variables) for val in items]
+    if isinstance(template, str):
+        return _compile_string(template)
+    return lambda variables: template
+
+
+def read_variables(vars_file):
+    """Read rows of variables from a CSV file with a header row, one row at a time
+
+    Parameters
+    ----------
+    vars_file : str
+        the CSV file
+
+    Returns
+    -------
+    generator
+        a dict of variables per row
+    """
+
+    with open(vars_file, newline='') as file:
+        for row in csv.DictReader(file):
+            yield row
+
+
+def _render_row(render, index, row):
+    """Render a single row, identifying the row in any error """
+
+    # a CSV row with fewer columns than the header has no value (None) for the rest
+    missing = [name for name, value in row.items() if value is None]
+    if missing:
+        raise Exception('Row %d: no value for %s, the row has fewer columns than the header'
+                        % (index, ', '.join(missing)))
+    try:
+        return render(row)
+    except KeyError as error:
+        raise Exception('Row %d: variable %s is not defined' % (index, error))
+    except ValueError as error:
+        raise Exception('Row %d: %s' % (index, error))
+
+
+def _init_worker(template):
+    """Compile the template once per worker process """
+
+    global _WORKER_RENDER  # pylint: disable=global-statement
+    _WORKER_RENDER = compile_template(template)
+
+
+def _render_chunk(chunk):
+    """Render a chunk of (index, row) tuples in a worker process """
+
+    return [_render_row(_WORKER_RENDER, index, row) for index, row in chunk]
+
+
+def render_rows(template, rows, parallel=1):
+    """Render a declaration per row of variables
+
+    Notes
+    -----
+    If parallel is greater than 1, large inputs are rendered in a process
+    pool, in chunks, with a bounded number of chunks in flight so rows are
+    streamed rather than read up front. Returning rendered declarations
+    from the workers can cost as much as rendering simple templates, so
+    the pool is opt-in. Declarations are yielded in row order
+
+    Parameters
+    ----------
+    template : dict
+        the parsed JSON template
+    rows : iterable
+        a dict of variables per row
+    parallel : int
+        the maximum number of worker processes, 1 renders in process
+
+    Returns
+    -------
+    generator
+        the rendered declarations
+    """
+
+    rows = enumerate(rows, start=1)
+    head = list(islice(rows, PROCESS_POOL_THRESHOLD))
+    if len(head) < PROCESS_POOL_THRESHOLD or parallel == 1:
+        render = compile_template(template)
+        for index, row in head:
+            yield _render_row(render, index, row)
+        for index, row in rows:
+            yield _render_row(render, index, row)
+        return
+
+    def _chunks():
+        for start in range(0, len(head), RENDER_CHUNK_SIZE):
+            yield head[start:start + RENDER_CHUNK_SIZE]
+        while True:
+            chunk = list(islice(rows, RENDER_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield chunk
+
+    with ProcessPoolExecutor(max_workers=parallel, initializer=_init_worker,
+                             initargs=(template,)) as executor:
+        pending = deque()
+        for chunk in _chunks():
+            pending.append(executor.submit(_render_chunk, chunk))
+            if len(pending) >= parallel * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _merge(target, source, path):
+    """Recursively merge source into target, raising on conflicting values """
+
+    for key, val in source.items():
+        if key not in target:
+            target[key] = val
+        elif isinstance(target[key], dict) and isinstance(val, dict):
+            _merge(target[key], val, '%s/%s' % (path, key))
+        elif target[key] != val:
+            raise Exception('Conflicting values for /%s' % '/'.join(
+                part for part in [path.strip('/'), key] if part))
+
+
+def merge_declarations(declarations):
+    """Merge rendered declarations into a single declaration
+
+    Parameters
+    ----------
+    declarations : iterable
+        the rendered declarations
+
+    Returns
+    -------
+    dict
+        the merged declaration
+    """
+
+    merged = {}
+    for declaration in declarations:
+        _merge(merged, declaration, '')
+    return merged
+
+
+def render_files(template_file, vars_file, parallel=1):
+    """Render a declaration per row of a CSV variables file
+
+    Parameters
+    ----------
+    template_file : str
+        the JSON template file
+    vars_file : str
+        the CSV variables file, with a header row naming the variables
+    parallel : int
+        the maximum number of worker processes
+
+    Returns
+    -------
+    generator
+        the rendered declarations
+    """
+
+    try:
+        with open(template_file) as file:
+            template = json.load(file)
+    except (IOError, ValueError) as error:
+        raise Exception('Unable to load template %s: %s' % (template_file, error))
+    # compile up front, so template errors are raised before any row is read
+    compile_template(template)
+    return render_rows(template, read_variables(vars_file), parallel)
+
+
+def render_declaration(template_file, vars_file, parallel=1):
+    """Render a declaration per row of a CSV variables file, merged into a single declaration
+
+    Parameters
+    ----------
+    template_file : str
+        the JSON template file
+    vars_file : str
+        the CSV variables file, with a header row naming the variables
+    parallel : int
+        the maximum number of worker processes
+
+    Returns
+    -------
+    dict
+        the merged declaration
+    """
+
+    return merge_declarations(render_files(template_file, vars_file, parallel))
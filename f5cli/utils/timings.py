@@ -0,0 +1,268 @@
+""" Lightweight phase timings, such as config load, login and each operation
+
+Spans are only recorded once enabled, otherwise span() returns a shared
+no-op context manager and timed() functions make a single extra check.
+Recorded spans keep their parent span, so they can also be exported as a trace
+
+Example::
+
+    timings.enable()
+    with timings.span('auth.login'):
+        login()
+    rows = timings.get_timings(timings.disable())
+"""
+
+import time
+import random
+import functools
+import threading
+
+SPAN_KINDS = {
+    'INTERNAL': 1,
+    'CLIENT': 3
+}
+
+# recorded spans, None while timings are disabled
+_RECORDS = None
+# the number of enable() calls not yet matched by a disable() call
+_ENABLED = 0
+_STATE = threading.local()
+
+
+class _NoopSpan:
+    """ Span used while timings are disabled """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def set_attribute(self, key, value):
+        """ Ignore the attribute """
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+# the fields of an exported (OTLP) span, slotted since a span is created per timed call
+class _Span:  # pylint: disable=too-many-instance-attributes
+    """ A monotonic span, nested under the span open in the same thread (if any) """
+
+    __slots__ = ('name', 'kind', 'attributes', 'span_id', 'parent_id', 'depth',
+                 'start', 'end', 'error')
+
+    def __init__(self, name, kind=SPAN_KINDS['INTERNAL'], attributes=None):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.span_id = random.getrandbits(64) or 1
+        self.parent_id = None
+        self.depth = 0
+        self.start = None
+        self.end = None
+        self.error = None
+
+    def __enter__(self):
+        stack = getattr(_STATE, 'stack', None)
+        if stack is None:
+            stack = _STATE.stack = []
+        if stack:
+            self.parent_id = stack[-1].span_id
+            self.depth = stack[-1].depth + 1
+        stack.append(self)
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end = time.monotonic()
+        if exc_type is not None:
+            self.error = '%s: %s' % (exc_type.__name__, exc_value)
+        _STATE.stack.remove(self)
+        records = _RECORDS
+        if records is not None:
+            records.append(self)
+
+    def set_attribute(self, key, value):
+        """ Set an attribute, such as the response status of a request """
+
+        self.attributes[key] = value
+
+
+def enable():
+    """Start recording spans
+
+    Notes
+    -----
+    Calls are counted, spans are recorded until every call is matched by a disable() call
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+
+    global _RECORDS, _ENABLED  # pylint: disable=global-statement
+    if _RECORDS is None:
+        _RECORDS = []
+    _ENABLED += 1
+
+
+def disable():
+    """Stop recording spans, unless still enabled by an outer caller
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    list
+        the spans recorded so far
+    """
+
+    global _RECORDS, _ENABLED  # pylint: disable=global-statement
+    records = list(_RECORDS or [])
+    _ENABLED = max(0, _ENABLED - 1)
+    if not _ENABLED:
+        _RECORDS = None
+    return records
+
+
+def is_enabled():
+    """Check if spans are being recorded
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    bool
+        True if spans are being recorded
+    """
+
+    return _RECORDS is not None
+
+
+def span(name, **kwargs):
+    """Time a phase, for use as a context manager
+
+    Parameters
+    ----------
+    name : str
+        the phase name, such as 'auth.login'
+    **kwargs:
+        optional keyword arguments
+
+    Keyword Arguments
+    -----------------
+    kind: int
+        the span kind, see SPAN_KINDS
+    attributes: dict
+        attributes describing the phase, such as the component
+
+    Returns
+    -------
+    object
+        the span context manager
+    """
+
+    if _RECORDS is None:
+        return _NOOP_SPAN
+    return _Span(name, **kwargs)
+
+
+def timed(name):
+    """Time every call of a function as a phase, for use as a decorator
+
+    Parameters
+    ----------
+    name : str
+        the phase name, such as 'auth.login'
+
+    Returns
+    -------
+    function
+        the decorator
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _RECORDS is None:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(func):
+    """Run a function in another thread nested under the span open in this thread
+
+    Parameters
+    ----------
+    func : function
+        the function, such as one mapped over a thread pool
+
+    Returns
+    -------
+    function
+        the function, wrapped if a span is open in this thread
+    """
+
+    stack = getattr(_STATE, 'stack', None)
+    if _RECORDS is None or not stack:
+        return func
+    parent = stack[-1]
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        worker_stack = getattr(_STATE, 'stack', None)
+        _STATE.stack = [parent]
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _STATE.stack = worker_stack or []
+    return wrapper
+
+
+def get_timings(records, indent=True):
+    """Get the breakdown of recorded spans, in start order
+
+    Parameters
+    ----------
+    records : list
+        the recorded spans, see disable()
+    indent : bool
+        indent nested phase names, for table output
+
+    Returns
+    -------
+    list
+        a dict per span, with start offset and duration in milliseconds
+    """
+
+    if not records:
+        return []
+    records = sorted(records, key=lambda record: (record.start, record.depth))
+    origin = records[0].start
+    min_depth = min(record.depth for record in records)
+    rows = []
+    for record in records:
+        depth = record.depth - min_depth
+        row = {
+            'phase': '  ' * depth + record.name if indent else record.name,
+            'start_ms': round((record.start - origin) * 1000, 3),
+            'duration_ms': round((record.end - record.start) * 1000, 3)
+        }
+        if not indent:
+            row['depth'] = depth
+        rows.append(row)
+    return rows
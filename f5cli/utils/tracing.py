@@ -0,0 +1,228 @@
+""" Export a trace of a command invocation as OpenTelemetry (OTLP/JSON) spans
+
+The root span covers the whole invocation, recorded phases (login, package
+check, each extension operation or Cloud Services command) and each HTTP
+request (upload chunks, declarations, task polls) are nested under it.
+The trace is appended to a local file, one OTLP/JSON export request per
+line, or posted to an OTLP/HTTP collector endpoint
+
+Example::
+
+    with Tracer('f5 bigip extension as3 show') as tracer:
+        invoke_command()
+    tracer.export('/tmp/f5-traces.jsonl')
+"""
+
+import os
+import re
+import json
+import time
+import random
+import socket
+import functools
+from urllib.parse import urlsplit
+
+import requests
+
+from f5cli import constants
+from f5cli.utils import timings
+from f5cli.utils.http_stats import get_path_template
+
+OTLP_TIMEOUT = 5
+OTLP_SCOPE = 'f5cli'
+STATUS_CODES = {
+    'UNSET': 0,
+    'ERROR': 2
+}
+# W3C trace context, used to nest the trace under a parent span, such as a fleet run
+TRACEPARENT_REGEX = r'^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$'
+
+
+def _get_attribute_value(value):
+    """Get an OTLP/JSON attribute value """
+
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _get_attributes(attributes):
+    """Get OTLP/JSON attributes """
+
+    return [{'key': key, 'value': _get_attribute_value(value)}
+            for key, value in sorted(attributes.items())]
+
+
+# the root span is only created on entering, once timings are enabled
+class Tracer:  # pylint: disable=too-many-instance-attributes
+    """ A class used to record a trace of a command invocation
+
+    Attributes
+    ----------
+    trace_id : str
+        the trace ID, as 32 hex characters
+
+    Methods
+    -------
+    get_trace()
+        See method documentation for more details
+    export()
+        See method documentation for more details
+    """
+
+    def __init__(self, name, **kwargs):
+        """Class initialization
+
+        Parameters
+        ----------
+        name : str
+            the root span name, such as the command
+        **kwargs:
+            optional keyword arguments
+
+        Keyword Arguments
+        -----------------
+        traceparent: str
+            a W3C traceparent header value, the trace is nested under this parent span
+        attributes: dict
+            the root span attributes
+
+        Returns
+        -------
+        None
+        """
+
+        self._name = name
+        self._attributes = kwargs.pop('attributes', {})
+        self._parent_id = None
+        match = re.match(TRACEPARENT_REGEX, kwargs.pop('traceparent', None) or '')
+        if match:
+            self.trace_id, self._parent_id = match.group(1), match.group(2)
+        else:
+            self.trace_id = '%032x' % random.getrandbits(128)
+        self._root = None
+        self._send = None
+        self._spans = []
+        # converts monotonic span times to wall clock times
+        self._epoch = time.time() - time.monotonic()
+
+    def __enter__(self):
+        timings.enable()
+        self._send = requests.Session.send
+        requests.Session.send = self._get_traced_send(self._send)
+        self._root = timings.span(self._name, attributes=self._attributes)
+        self._root.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self._root.__exit__(*args)
+        requests.Session.send = self._send
+        self._spans = timings.disable()
+
+    @staticmethod
+    def _get_traced_send(send):
+        """Wrap Session.send, recording a client span for each request """
+
+        @functools.wraps(send)
+        def _send(session, request, **kwargs):
+            url = urlsplit(request.url)
+            with timings.span(
+                    '%s %s' % (request.method, get_path_template(url.path)),
+                    kind=timings.SPAN_KINDS['CLIENT'],
+                    attributes={
+                        'http.method': request.method,
+                        'http.url': '%s://%s%s' % (url.scheme, url.netloc, url.path),
+                        'net.peer.name': url.hostname
+                    }) as span:
+                response = send(session, request, **kwargs)
+                span.set_attribute('http.status_code', response.status_code)
+                return response
+        return _send
+
+    def _get_span(self, record):
+        """Get the OTLP/JSON span of a recorded span """
+
+        if record is self._root:
+            parent_id = self._parent_id
+        else:
+            # spans recorded in threads without an open span belong to the root span
+            parent_id = '%016x' % (record.parent_id or self._root.span_id)
+        span = {
+            'traceId': self.trace_id,
+            'spanId': '%016x' % record.span_id,
+            'name': record.name,
+            'kind': record.kind,
+            'startTimeUnixNano': str(int((self._epoch + record.start) * 1e9)),
+            'endTimeUnixNano': str(int((self._epoch + record.end) * 1e9)),
+            'attributes': _get_attributes(record.attributes),
+            'status': {'code': STATUS_CODES['UNSET']}
+        }
+        if parent_id:
+            span['parentSpanId'] = parent_id
+        error = record.error
+        if not error and record.attributes.get('http.status_code', 0) >= 400:
+            error = 'HTTP %s' % record.attributes['http.status_code']
+        if error:
+            span['status'] = {'code': STATUS_CODES['ERROR'], 'message': error}
+        return span
+
+    def get_trace(self):
+        """ Get the recorded trace, as an OTLP/JSON export trace service request
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict
+            the trace
+        """
+
+        resource = {
+            'service.name': 'f5-cli',
+            'service.version': constants.VERSION,
+            'host.name': socket.gethostname(),
+            'process.pid': os.getpid()
+        }
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': _get_attributes(resource)},
+                'scopeSpans': [{
+                    'scope': {'name': OTLP_SCOPE, 'version': constants.VERSION},
+                    'spans': [self._get_span(record) for record in
+                              sorted(self._spans, key=lambda record: record.start)]
+                }]
+            }]
+        }
+
+    def export(self, destination):
+        """ Export the recorded trace
+
+        Parameters
+        ----------
+        destination : str
+            a file, the trace is appended as a single line, or an OTLP/HTTP
+            collector traces endpoint, such as http://localhost:4318/v1/traces
+
+        Returns
+        -------
+        None
+        """
+
+        trace = json.dumps(self.get_trace(), separators=(',', ':'))
+        if re.match(r'^https?://', destination):
+            response = requests.post(destination, data=trace, timeout=OTLP_TIMEOUT,
+                                     headers={'Content-Type': 'application/json'})
+            response.raise_for_status()
+            return
+        # a single append, so concurrent commands (such as a fleet run) do not interleave
+        file_descriptor = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            os.write(file_descriptor, (trace + '\n').encode('utf-8'))
+        finally:
+            os.close(file_descriptor)
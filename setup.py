@@ -14,9 +14,18 @@ DEPENDENCIES = [
     'pyyaml>=5',
     'click-repl>=0',
     'f5-sdk-python>=0',
-    'f5-teem>=1'
+    'f5-teem>=1',
+    'jmespath>=0.9',
+    'jsonschema>=3'
 ]
 
+# optional dependencies, such as of the mock server in f5cli.testing
+EXTRAS = {
+    'testing': [
+        'cryptography>=2.5'
+    ]
+}
+
 def get_long_description():
     """ Get project description """
     with open('./README.md', 'r') as readme:
@@ -68,5 +77,6 @@ setuptools.setup(
             'f5 = f5cli.cli:cli'
         ]
     },
-    install_requires=DEPENDENCIES
+    install_requires=DEPENDENCIES,
+    extras_require=EXTRAS
 )
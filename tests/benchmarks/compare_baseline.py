@@ -0,0 +1,80 @@
+""" Compare microbenchmark results to the baseline, relative to the calibration benchmark
+
+The minimum time of each benchmark is divided by the minimum time of the
+calibration benchmark of the same run, so the baseline does not need to be
+recorded on the host (or runner class) the results come from. The ratios do
+depend on the Python version, so record the baseline with the version CI
+runs. A benchmark fails when its ratio is more than the tolerance above its
+baseline ratio.
+
+Usage::
+
+    python -m tests.benchmarks.compare_baseline <BASELINE> <RESULTS> [<TOLERANCE_PERCENT>]
+"""
+
+import sys
+import json
+
+CALIBRATION_BENCHMARK = 'test_bench_calibration'
+DEFAULT_TOLERANCE = 25
+
+
+def load_ratios(path):
+    """ Load the benchmark results of a pytest-benchmark JSON file, as calibration ratios
+
+    Returns the Python version the results were recorded with and the ratios
+    """
+
+    with open(path) as file:
+        data = json.load(file)
+    benchmarks = {item['name']: item['stats']['min'] for item in data['benchmarks']}
+    if CALIBRATION_BENCHMARK not in benchmarks:
+        raise ValueError('%s does not contain %s' % (path, CALIBRATION_BENCHMARK))
+    calibration = benchmarks.pop(CALIBRATION_BENCHMARK)
+    python_version = data['machine_info']['python_version'].rsplit('.', 1)[0]
+    return python_version, {name: value / calibration for name, value in benchmarks.items()}
+
+
+def compare(baseline, results, tolerance=DEFAULT_TOLERANCE):
+    """ Compare the calibration ratios of the results to the baseline
+
+    Returns a row per benchmark and whether any regressed beyond the tolerance,
+    benchmarks missing from the baseline are reported but never fail
+    """
+
+    rows = []
+    regressed = False
+    for name, ratio in sorted(results.items()):
+        expected = baseline.get(name)
+        change = None if expected is None else (ratio / expected - 1) * 100
+        failed = change is not None and change > tolerance
+        regressed = regressed or failed
+        rows.append((name, expected, ratio, change, failed))
+    return rows, regressed
+
+
+def main(argv):
+    """ Print the comparison, exiting non-zero if a benchmark regressed """
+
+    baseline_path, results_path = argv[:2]
+    tolerance = float(argv[2]) if len(argv) > 2 else DEFAULT_TOLERANCE
+    baseline_version, baseline = load_ratios(baseline_path)
+    results_version, results = load_ratios(results_path)
+    if baseline_version != results_version:
+        print('Warning: the baseline was recorded with Python %s, the results with Python %s'
+              % (baseline_version, results_version))
+    rows, regressed = compare(baseline, results, tolerance)
+    print('%-60s %12s %12s %9s' % ('benchmark', 'baseline', 'current', 'change'))
+    for name, expected, ratio, change, failed in rows:
+        print('%-60s %12s %12.4f %9s%s' % (
+            name, '-' if expected is None else '%.4f' % expected, ratio,
+            'new' if change is None else '%+.1f%%' % change, '  REGRESSED' if failed else ''))
+    if regressed:
+        print('Benchmarks regressed more than %s%% relative to %s'
+              % (tolerance, CALIBRATION_BENCHMARK))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
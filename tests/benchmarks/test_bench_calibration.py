@@ -0,0 +1,31 @@
+""" Benchmark: calibration, the speed of the host the benchmarks run on
+
+The other microbenchmarks are checked against the baseline relative to this one
+(see compare_baseline.py), so a baseline recorded on one host is comparable to
+the results of another, such as a CI runner
+"""
+
+import json
+
+CALIBRATION_ROWS = 2000
+
+
+def _reference_workload(rows):
+    """ Pure Python work resembling the hot paths: build, serialize, parse and sort rows """
+
+    data = [{'name': 'item_%d' % idx, 'index': idx, 'tags': {'owner': 'OWNER'}}
+            for idx in range(rows)]
+    parsed = json.loads(json.dumps(data))
+    return sorted(parsed, key=lambda item: item['name'])
+
+
+def test_bench_calibration(benchmark):
+    """ Run the reference workload
+
+    Then
+    - every row is returned
+    """
+
+    result = benchmark(_reference_workload, CALIBRATION_ROWS)
+
+    assert len(result) == CALIBRATION_ROWS
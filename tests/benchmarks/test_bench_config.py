@@ -0,0 +1,105 @@
+""" Benchmark: configuration and authentication files """
+
+from f5cli import constants
+from f5cli.config import AuthConfigurationClient, ConfigurationClient
+from f5cli.utils import core as core_utils
+
+from ..global_test_imports import pytest
+
+ACCOUNT_COUNTS = [10, 1000, 10000]
+CONFIG = {
+    'output': 'json',
+    'allowTelemetry': False,
+    'disableSSLWarnings': True,
+    'csResponseCache': True,
+    'firstRunComplete': True
+}
+
+
+def _generate_accounts(count):
+    """ Generate BIG-IP and Cloud Services accounts, the last of each is the default """
+
+    return [
+        {
+            'name': 'account_%d' % idx,
+            'authentication-type': 'bigip' if idx % 2 else 'cs',
+            'default': idx >= count - 2,
+            'host': '192.0.2.%d' % (idx % 250 + 1),
+            'port': 443,
+            'user': 'admin',
+            'password': 'PASSWORD'
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.fixture
+def config_dir_fixture(monkeypatch, tmp_path):
+    """ Keep the configuration and authentication files in a temporary directory """
+
+    monkeypatch.setattr(constants, 'F5_CLI_DIR', str(tmp_path))
+    monkeypatch.setattr(constants, 'F5_CONFIG_FILE', str(tmp_path / 'config.yaml'))
+    monkeypatch.setattr(constants, 'F5_AUTH_FILE', str(tmp_path / 'auth.yaml'))
+    core_utils.write_file(constants.F5_CONFIG_FILE, CONFIG)
+    return tmp_path
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_bench_config_list(benchmark, config_dir_fixture):
+    """ Load the configuration, as every command does
+
+    Then
+    - the configuration is loaded
+    """
+
+    result = benchmark(ConfigurationClient().list)
+
+    assert result == CONFIG
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_bench_config_create_or_update(benchmark, config_dir_fixture):
+    """ Update a configuration value, as 'f5 config set-defaults' does
+
+    Then
+    - the configuration is updated
+    """
+
+    client = ConfigurationClient()
+
+    benchmark(client.create_or_update, {'output': 'table'})
+
+    assert client.list() == dict(CONFIG, output='table')
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+@pytest.mark.parametrize('accounts', ACCOUNT_COUNTS)
+def test_bench_auth_read(benchmark, config_dir_fixture, accounts):
+    """ Read the default account, as every BIG-IP and Cloud Services command does
+
+    Then
+    - the default account is read
+    """
+
+    core_utils.write_file(constants.F5_AUTH_FILE, _generate_accounts(accounts))
+
+    result = benchmark(AuthConfigurationClient().read_auth, 'bigip')
+
+    assert result['name'] == 'account_%d' % (accounts - 1)
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+@pytest.mark.parametrize('accounts', ACCOUNT_COUNTS)
+def test_bench_auth_store(benchmark, config_dir_fixture, accounts):
+    """ Update an account, as 'f5 login' does for an existing account
+
+    Then
+    - the account is updated
+    """
+
+    core_utils.write_file(constants.F5_AUTH_FILE, _generate_accounts(accounts))
+    account = dict(_generate_accounts(1)[0], password='NEW_PASSWORD')
+
+    benchmark(AuthConfigurationClient(auth=account).store_auth, 'update')
+
+    assert AuthConfigurationClient().read_auth('cs')['password'] == 'NEW_PASSWORD'
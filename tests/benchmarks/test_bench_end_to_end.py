@@ -0,0 +1,146 @@
+""" Benchmark: end-to-end command latency and fleet throughput, against a mock server """
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from f5sdk.bigip import ManagementClient
+from f5sdk.bigip.extension import extension_metadata
+
+from f5cli import constants
+from f5cli.cli import cli as basecli
+from f5cli.api.bigip import process_extension_component_command
+from f5cli.api.extension_operations import ExtensionOperationsClient, COMPONENTS
+from f5cli.config import AuthConfigurationClient
+from f5cli.testing import MockServer
+
+from ..global_test_imports import pytest, CliRunner
+
+ROUNDS = 20
+# the F5 SDK only connects to Cloud Services and the extension metadata host on port 443
+MOCK_SERVER_PORT = 443
+FLEET_SIZE = 16
+# round trip time of a device in another region
+DEVICE_LATENCY = 0.05
+DEVICE_JITTER = 0.01
+DECLARATIONS = {
+    'as3': {
+        'class': 'AS3',
+        'declaration': {'class': 'ADC', 'schemaVersion': '3.0.0', 'tenant_1': {'class': 'Tenant'}}
+    },
+    'do': {'class': 'DO', 'declaration': {'class': 'Device', 'schemaVersion': '1.0.0'}}
+}
+COMMANDS = {
+    'login': ['login', '--authentication-provider', 'bigip', '--host', '127.0.0.1',
+              '--user', 'admin', '--password', 'admin'],
+    'bigip-as3-show': ['bigip', 'extension', 'as3', 'show'],
+    'bigip-as3-create': ['bigip', 'extension', 'as3', 'create', '--declaration', 'as3.json'],
+    'bigip-do-create': ['bigip', 'extension', 'do', 'create', '--declaration', 'do.json'],
+    'bigip-ts-show-info': ['bigip', 'extension', 'ts', 'show-info'],
+    'cs-account-show-user': ['cs', 'account', 'show-user'],
+    'cs-subscription-list': ['cs', 'subscription', 'list']
+}
+
+
+def _start_server(monkeypatch, **kwargs):
+    """ Start the mock server on port 443, serving the extension metadata """
+
+    server = MockServer(port=MOCK_SERVER_PORT, **kwargs)
+    try:
+        server.start()
+    except OSError as error:
+        pytest.skip('Unable to listen on port %s: %s' % (MOCK_SERVER_PORT, error))
+    monkeypatch.setitem(
+        extension_metadata.EXTENSION_METADATA, 'URL',
+        extension_metadata.EXTENSION_METADATA['URL'].replace('cdn.f5.com', server.host))
+    return server
+
+
+@pytest.fixture
+def config_fixture(monkeypatch, tmp_path):
+    """ Keep the CLI configuration, cache and locks in a temporary directory """
+
+    for name in ['F5_CLI_DIR', 'F5_CLI_LOCK_DIR', 'F5_CLI_CACHE_DIR', 'F5_CLI_SCHEMA_DIR']:
+        monkeypatch.setattr(constants, name, str(tmp_path / name.lower()))
+    monkeypatch.setattr(constants, 'F5_CONFIG_FILE', str(tmp_path / 'config.yaml'))
+    monkeypatch.setattr(constants, 'F5_AUTH_FILE', str(tmp_path / 'auth.yaml'))
+    monkeypatch.setenv(constants.ENV_VARS['ALLOW_TELEMETRY'], 'false')
+    monkeypatch.setenv(constants.ENV_VARS['DISABLE_SSL_WARNINGS'], 'true')
+    monkeypatch.chdir(tmp_path)
+    for component, declaration in DECLARATIONS.items():
+        (tmp_path / ('%s.json' % component)).write_text(json.dumps(declaration))
+    return tmp_path
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+@pytest.fixture
+def server_fixture(monkeypatch, config_fixture):
+    """ Start the mock server, and log in to it """
+
+    server = _start_server(monkeypatch)
+    result = CliRunner().invoke(basecli, COMMANDS['login'])
+    assert result.exit_code == 0, result.output
+    AuthConfigurationClient(auth={
+        'name': 'login_cs',
+        'authentication-type': constants.AUTHENTICATION_PROVIDERS['CS'],
+        'default': True,
+        'user': 'admin',
+        'password': 'admin',
+        'api_endpoint': server.host
+    }).store_auth('create')
+    yield server
+    server.stop()
+
+
+# pylint: disable=redefined-outer-name
+@pytest.mark.parametrize('command', list(COMMANDS))
+def test_bench_command_latency(benchmark, server_fixture, command):
+    """ Run a command end-to-end, against a device without network latency
+
+    Then
+    - the command succeeds, the number of requests per run is recorded
+    """
+
+    runner = CliRunner()
+    requests_before = len(server_fixture.request_log)
+
+    result = benchmark.pedantic(runner.invoke, args=(basecli, COMMANDS[command]),
+                                rounds=ROUNDS, warmup_rounds=1)
+
+    assert result.exit_code == 0, result.output
+    benchmark.extra_info['requests'] = (
+        len(server_fixture.request_log) - requests_before) / (ROUNDS + 1)
+
+
+def _show_as3(host, port):
+    """ Show the AS3 declaration of a device, as the CLI does """
+
+    client = ExtensionOperationsClient(
+        ManagementClient(host, port=port, user='admin', password='admin'), 'as3', None, None)
+    client.install_component_if_required(True)
+    return process_extension_component_command(client, COMPONENTS['as3']['actions'], 'show')
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+@pytest.mark.parametrize('workers', [1, constants.DEFAULT_WORKERS, FLEET_SIZE])
+def test_bench_fleet_throughput(benchmark, monkeypatch, config_fixture, workers):
+    """ Show the AS3 declaration of every device in a fleet, with network latency
+
+    Then
+    - every device is shown, the number of devices per second is recorded
+    """
+
+    server = _start_server(monkeypatch, latency=DEVICE_LATENCY, jitter=DEVICE_JITTER, seed=0)
+
+    def _run_fleet():
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda _: _show_as3(server.host, server.port),
+                                     range(FLEET_SIZE)))
+
+    try:
+        results = benchmark.pedantic(_run_fleet, rounds=3)
+    finally:
+        server.stop()
+
+    assert len(results) == FLEET_SIZE
+    benchmark.extra_info['devices_per_second'] = round(
+        FLEET_SIZE / benchmark.stats.stats.mean, 1)
@@ -0,0 +1,55 @@
+""" Benchmark: output formatting """
+
+from f5cli.constants import FORMATS
+from f5cli.utils import core as core_utils
+
+from ..global_test_imports import pytest
+
+ROWS = 100000
+ROW_COUNTS = [10, 1000, 100000]
+
+
+def _generate_rows(count):
+    """ Generate rows resembling a large list response """
+
+    return [
+        {
+            'id': 'a%07d-6875-469a-ba12-d0f1390f7464' % idx,
+            'name': 'app_%d' % idx,
+            'location': 'westus' if idx % 2 else 'eastus2',
+            'port': 443,
+            'tags': {'owner': 'OWNER'}
+        }
+        for idx in range(count)
+    ]
+
+
+def test_bench_format_table_100k(benchmark):
+    """ Render a 100k row table
+
+    Then
+    - rendering completes in well under a second
+    """
+
+    data = _generate_rows(ROWS)
+
+    result = benchmark(core_utils._format_data_as_table, data)  # pylint: disable=protected-access
+
+    assert result.count('\n') == ROWS + 1
+    assert benchmark.stats.stats.mean < 1.0
+
+
+@pytest.mark.parametrize('rows', ROW_COUNTS)
+@pytest.mark.parametrize('output_format', [FORMATS['JSON'], FORMATS['TABLE']])
+def test_bench_format_output(benchmark, output_format, rows):
+    """ Format a list response, as every command does before logging it
+
+    Then
+    - the output contains every row
+    """
+
+    data = _generate_rows(rows)
+
+    result = benchmark(core_utils.format_output, data, output_format=output_format)
+
+    assert result.count('app_%d' % (rows - 1)) == 1
@@ -0,0 +1,50 @@
+""" Benchmark: startup, loading the help and importing the command modules """
+
+import os
+import sys
+import subprocess
+
+import f5cli
+from f5cli import docs
+
+from ..global_test_imports import pytest
+
+IMPORT_ROUNDS = 5
+MODULES = [
+    'f5cli.cli',
+    'f5cli.commands.cmd_batch',
+    'f5cli.commands.cmd_bigip',
+    'f5cli.commands.cmd_config',
+    'f5cli.commands.cmd_cs',
+    'f5cli.commands.cmd_declaration',
+    'f5cli.commands.cmd_login'
+]
+
+
+def test_bench_get_docs(benchmark):
+    """ Load the help, as each command module does on import
+
+    Then
+    - the help is loaded
+    """
+
+    result = benchmark(docs.get_docs)
+
+    assert 'LOGIN_HELP' in result
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_bench_cold_import(benchmark, module):
+    """ Import a module in a new interpreter, as each 'f5' invocation does
+
+    Then
+    - the module is imported
+    """
+
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(f5cli.__file__)))
+
+    result = benchmark.pedantic(subprocess.run,
+                                args=([sys.executable, '-c', 'import %s' % module],),
+                                kwargs={'env': env}, rounds=IMPORT_ROUNDS, warmup_rounds=1)
+
+    assert result.returncode == 0
@@ -0,0 +1 @@
+"""Denotes directory is a package """
@@ -0,0 +1,89 @@
+"""Test: api.bigip """
+
+from f5sdk.bigip import ManagementClient
+
+from f5cli import api, constants
+from f5cli.testing import MockServer
+from f5cli.utils.device_queue import DeviceLock
+
+from ...global_test_imports import pytest
+
+AS3_DECLARATION = {
+    'class': 'AS3',
+    'declaration': {'class': 'ADC', 'schemaVersion': '3.0.0', 'tenant_1': {'class': 'Tenant'}}
+}
+
+
+@pytest.fixture
+def server_fixture(monkeypatch, tmp_path):
+    """Test fixture """
+    monkeypatch.setattr(constants, 'F5_CLI_LOCK_DIR', str(tmp_path))
+    with MockServer() as server:
+        yield server
+
+
+# pylint: disable=redefined-outer-name
+def test_extension_with_provided_client(server_fixture, capsys):
+    """ Perform extension actions with a provided client
+    Given
+    - A client of a device with AS3 installed
+
+    When
+    - A declaration is created and shown
+
+    Then
+    - The responses are returned, and nothing is written to stdout
+    """
+
+    client = ManagementClient(server_fixture.host, port=server_fixture.port,
+                              user='admin', password='admin')
+
+    created = api.extension('as3', 'create', client=client, declaration=AS3_DECLARATION)
+    shown = api.extension('as3', 'show', client=client)
+
+    assert created['results'][0]['tenant'] == 'tenant_1'
+    assert shown == AS3_DECLARATION['declaration']
+    assert capsys.readouterr().out == ''
+
+
+def test_extension_invalid_action():
+    """ Reject an action the component does not implement
+    Given
+    - The CF component
+
+    When
+    - The validate action is performed
+
+    Then
+    - An error is raised, without connecting to a device
+    """
+
+    with pytest.raises(api.ApiError) as error:
+        api.extension('cf', 'validate')
+
+    assert str(error.value) == "Action 'validate' not implemented"
+
+
+# pylint: disable=redefined-outer-name
+def test_extension_queue_timeout(server_fixture):
+    """ Time out waiting for another operation against the device
+    Given
+    - Another operation holds the lock of the device
+
+    When
+    - A declaration is created, with a queue timeout of 0 seconds
+
+    Then
+    - An ApiError is raised, naming the device
+    """
+
+    client = ManagementClient(server_fixture.host, port=server_fixture.port,
+                              user='admin', password='admin')
+
+    with DeviceLock(server_fixture.host):
+        with pytest.raises(api.ApiError) as error:
+            api.extension('as3', 'create', client=client, declaration=AS3_DECLARATION,
+                          queue_timeout=0)
+
+    assert 'waiting for another operation against %s' % server_fixture.host \
+        in str(error.value)
@@ -0,0 +1,63 @@
+"""Test: api.cs """
+
+from f5sdk.cs import ManagementClient
+from f5sdk.cs.subscriptions import SubscriptionClient
+from f5sdk.cs.beacon.token import TokenClient
+
+from f5cli import api, constants
+from f5cli.config import AuthConfigurationClient
+
+MOCK_AUTH = {
+    'user': 'test_user',
+    'password': 'test_password'
+}
+
+
+def test_subscription_list_with_provided_auth(mocker):
+    """ List subscriptions of a provided account
+    Given
+    - The credentials of an account
+
+    When
+    - The subscriptions of an account ID are listed
+
+    Then
+    - The response is returned, without reading the CLI authentication
+    """
+
+    mock_read_auth = mocker.patch.object(AuthConfigurationClient, 'read_auth')
+    mocker.patch.object(ManagementClient, '__init__', return_value=None)
+    mock_list = mocker.patch.object(SubscriptionClient, 'list',
+                                    return_value={'subscriptions': [{'subscription_id': 's-1'}]})
+
+    response = api.cs.subscription.list(auth=MOCK_AUTH, account_id_filter='a-1', no_cache=True)
+
+    assert response == {'subscriptions': [{'subscription_id': 's-1'}]}
+    mock_list.assert_called_once_with(query_parameters={'account_id': 'a-1'})
+    assert not mock_read_auth.called
+
+
+def test_token_delete_invalidates_cache(mocker, tmp_path):
+    """ Invalidate cached responses after a change
+    Given
+    - A cached subscription list
+
+    When
+    - A token is deleted
+
+    Then
+    - The subscriptions are listed again
+    """
+
+    mocker.patch.dict('os.environ', {constants.ENV_VARS['CS_RESPONSE_CACHE']: 'true'})
+    mocker.patch.object(constants, 'F5_CLI_CACHE_DIR', str(tmp_path))
+    mocker.patch.object(ManagementClient, '__init__', return_value=None)
+    mock_list = mocker.patch.object(SubscriptionClient, 'list', return_value={})
+    mocker.patch.object(TokenClient, 'delete', return_value={})
+
+    api.cs.subscription.list(auth=MOCK_AUTH)
+    api.cs.subscription.list(auth=MOCK_AUTH)
+    assert api.cs.beacon.token.delete(name='token-1', auth=MOCK_AUTH) == {}
+    api.cs.subscription.list(auth=MOCK_AUTH)
+
+    assert mock_list.call_count == 2
@@ -0,0 +1,140 @@
+"""Test: api.inventory """
+
+
+from f5cli import api, constants
+from f5cli.commands.cmd_bigip import cli
+from f5cli.config import AuthConfigurationClient, InventoryClient
+from f5cli.testing import MockServer
+
+from ...global_test_imports import pytest, CliRunner
+
+
+@pytest.fixture
+def inventory_fixture(monkeypatch, tmp_path):
+    """Test fixture, two devices: one with every extension installed, one with DO only """
+    monkeypatch.setattr(constants, 'F5_CLI_DIR', str(tmp_path))
+    monkeypatch.setattr(constants, 'F5_AUTH_FILE', str(tmp_path / 'auth.yaml'))
+    monkeypatch.setattr(constants, 'F5_INVENTORY_FILE', str(tmp_path / 'inventory.json'))
+    monkeypatch.setattr(constants, 'F5_CLI_LOCK_DIR', str(tmp_path / 'locks'))
+    with MockServer() as server_1, MockServer(packages=['do']) as server_2:
+        for name, server in [('bigip_1', server_1), ('bigip_2', server_2)]:
+            AuthConfigurationClient(auth={
+                'name': name,
+                'authentication-type': 'bigip',
+                'host': server.host,
+                'port': server.port,
+                'user': 'admin',
+                'password': 'admin'
+            }).store_auth('create')
+        yield server_1, server_2
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_refresh_expired_fields_only(inventory_fixture, mocker):
+    """ Refresh the fields of each device once expired
+    Given
+    - Two BIG-IP authentication accounts
+
+    When
+    - The inventory is refreshed, refreshed again, and refreshed once availability expired
+
+    Then
+    - Every field is gathered, then none, then availability only
+    """
+
+    first = api.inventory.refresh(parallel=2)
+    second = api.inventory.refresh()
+    mocker.patch('f5cli.config.inventory.time.time',
+                 return_value=InventoryClient().read()['bigip_1']['fields'][
+                     'availability']['updated'] + constants.INVENTORY_TTL['availability'] + 1)
+    third = api.inventory.refresh(targets=['bigip_1'])
+
+    assert [result['refreshed'] for result in first] == [
+        ['facts', 'extensions', 'availability']] * 2
+    assert [result['refreshed'] for result in second] == [[], []]
+    assert [(result['name'], result['refreshed'], result['cached']) for result in third] == [
+        ('bigip_1', ['availability'], ['facts', 'extensions'])]
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_refresh_failure_keeps_value(inventory_fixture, mocker):
+    """ Keep the last good value of a field which failed to refresh
+    Given
+    - The inventory of a device
+
+    When
+    - The device cannot be logged in to while refreshing its facts
+
+    Then
+    - The error is recorded next to the previous facts, which are still shown
+    """
+
+    api.inventory.refresh(targets=['bigip_1'])
+    version = api.inventory.show(targets=['bigip_1'])[0]['version']
+    mocker.patch('f5cli.api.inventory.get_mgmt_client', side_effect=Exception('timed out'))
+
+    result = api.inventory.refresh(targets=['bigip_1'], fields=['facts'], force=True)
+
+    facts = InventoryClient().read()['bigip_1']['fields']['facts']
+    assert result[0]['errors'] == {'facts': 'timed out'}
+    assert facts['error'] == 'timed out'
+    assert facts['value']['version'] == version
+    record = api.inventory.show(targets=['bigip_1'])[0]
+    assert record['version'] == version
+    assert 'facts' in record['stale']
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_show_query(inventory_fixture):
+    """ Query the cached inventory
+    Given
+    - The inventory of two devices, one without AS3
+
+    When
+    - The devices running AS3 < 3.30, without AS3, and with DO available are shown
+
+    Then
+    - Versions are compared numerically, and missing extensions only match none
+    """
+
+    api.inventory.refresh()
+
+    assert [record['name'] for record in api.inventory.show(query=['as3<3.30'])] == ['bigip_1']
+    assert [record['name'] for record in api.inventory.show(query=['as3<3.9'])] == []
+    assert [record['name'] for record in api.inventory.show(
+        query=['as3=none,available=do', 'version>=14.1'])] == ['bigip_2']
+    assert api.inventory.show(query=['do>=1.11.1'])[0]['do'] == '1.11.1'
+    with pytest.raises(api.ApiError):
+        api.inventory.show(query=['available<as3'])
+
+
+def test_refresh_command_failure(mocker, tmp_path):
+    """ Inventory refresh command, of an unreachable device
+    Given
+    - A BIG-IP authentication account, for a device which cannot be logged in to
+
+    When
+    - User refreshes the inventory
+
+    Then
+    - The error is reported per field, and the command fails
+    """
+
+    mocker.patch('f5cli.constants.F5_INVENTORY_FILE', str(tmp_path / 'inventory.json'))
+    mocker.patch('f5cli.constants.F5_CLI_LOCK_DIR', str(tmp_path / 'locks'))
+    mocker.patch.object(AuthConfigurationClient, 'list_auth', return_value=[{
+        'name': 'bigip_1',
+        'authentication-type': 'bigip',
+        'host': '1.2.3.4',
+        'port': '1234',
+        'type': 'BIGIP',
+        'user': 'test_user',
+        'password': 'test_password'
+    }])
+    mocker.patch('f5cli.api.bigip.ManagementClient', side_effect=Exception('timed out'))
+
+    result = CliRunner().invoke(cli, ['inventory', 'refresh', '--fields', 'facts'])
+
+    assert result.exit_code == 1
+    assert '"facts": "timed out"' in result.output
+    assert 'Error: 1 of 1 devices failed to refresh' in result.output
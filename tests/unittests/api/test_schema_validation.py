@@ -0,0 +1,221 @@
+"""Test: api.schema_validation """
+
+import json
+
+import jsonschema
+from f5sdk.bigip import ManagementClient
+
+from f5cli.config import AuthConfigurationClient
+from f5cli.commands.cmd_bigip import cli
+from f5cli.api import schema_validation
+
+from ...global_test_imports import MagicMock, PropertyMock, pytest, CliRunner
+
+MOCK_CONFIG_CLIENT_READ_AUTH_RETURN_VALUE = {
+    'host': '1.2.3.4',
+    'port': '1234',
+    'type': 'BIGIP',
+    'user': 'test_user',
+    'password': 'test_password'
+}
+
+MOCK_IS_INSTALLED_RETURN_VALUE = {
+    'installed': True,
+    'installed_version': '1.10.0',
+    'latest_version': '1.10.0'
+}
+
+TEST_SCHEMA = {
+    '$schema': 'http://json-schema.org/draft-07/schema#',
+    'type': 'object',
+    'required': ['class'],
+    'properties': {
+        'class': {'enum': ['Device']}
+    }
+}
+
+
+class TestSchemaValidation(object):
+    """ Test Class: declaration schema validation """
+    @classmethod
+    def setup_class(cls):
+        """ Setup func """
+        cls.runner = CliRunner()
+
+    @classmethod
+    def teardown_class(cls):
+        """ Teardown func """
+
+    @staticmethod
+    @pytest.fixture
+    def do_extension_client_fixture(mocker):
+        """Test fixture """
+        mock_extension_client = mocker.patch(
+            "f5sdk.bigip.extension.DOClient")
+
+        mock = MagicMock()
+        mock.is_installed.return_value = MOCK_IS_INSTALLED_RETURN_VALUE
+        type(mock_extension_client.return_value).package = PropertyMock(return_value=mock)
+        return mock_extension_client
+
+    @staticmethod
+    @pytest.fixture
+    def config_client_read_auth_fixture(mocker):
+        """ PyTest fixture mocking AuthConfigurationClient's read_auth method """
+        mock_config_client_read_auth = mocker.patch.object(
+            AuthConfigurationClient, "read_auth")
+        mock_config_client_read_auth.return_value = MOCK_CONFIG_CLIENT_READ_AUTH_RETURN_VALUE
+
+    @staticmethod
+    @pytest.fixture
+    def mgmt_client_fixture(mocker):
+        """ PyTest fixture returning mocked BigIP Management Client """
+        mock_management_client = mocker.patch.object(ManagementClient, '__init__')
+        mock_management_client.return_value = None
+        mocker.patch.object(ManagementClient, 'host', '1.2.3.4', create=True)
+        return mock_management_client
+
+    def test_cmd_service_validate_declaration_dir(self, tmp_path):
+        """ Command service validate a directory of declarations
+        Given
+        - A schema file
+        - A directory containing a valid and an invalid declaration
+        When
+        - User attempts to validate the directory, in parallel
+        Then
+        - The invalid declaration is reported, with a non-zero exit code
+        - The device is not contacted
+        """
+        schema_file = tmp_path / 'schema.json'
+        schema_file.write_text(json.dumps(TEST_SCHEMA))
+        declaration_dir = tmp_path / 'declarations'
+        declaration_dir.mkdir()
+        (declaration_dir / 'a.json').write_text(json.dumps({'class': 'Device'}))
+        (declaration_dir / 'b.json').write_text(json.dumps({'class': 'Devcie'}))
+
+        result = self.runner.invoke(cli, ['extension', 'do', 'validate',
+                                          '--declaration', str(declaration_dir),
+                                          '--schema', str(schema_file), '--parallel', '2'])
+
+        assert result.exit_code == 1
+        assert '1 of 2 declarations are invalid' in result.output
+        assert 'b.json' in result.output and 'a.json' not in result.output
+
+    def test_cmd_service_validate_declaration(self, tmp_path):
+        """ Command service validate a valid declaration
+        Given
+        - A schema file and a valid declaration
+        When
+        - User attempts to validate the declaration
+        Then
+        - The declaration is reported as valid
+        """
+        schema_file = tmp_path / 'schema.json'
+        schema_file.write_text(json.dumps(TEST_SCHEMA))
+        declaration_file = tmp_path / 'declaration.json'
+        declaration_file.write_text(json.dumps({'class': 'Device'}))
+
+        result = self.runner.invoke(cli, ['extension', 'do', 'validate',
+                                          '--declaration', str(declaration_file),
+                                          '--schema', str(schema_file)])
+
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output) == [
+            {'file': str(declaration_file), 'valid': True, 'errors': []}
+        ]
+
+    def test_cmd_service_validate_schema_cached(self, mocker, tmp_path):
+        """ Command service validate using the published schema
+        Given
+        - The published schema for the version is not cached locally
+        - The schema references a sibling schema file
+        When
+        - Declarations are validated against the version, then in a new process
+        Then
+        - The schema and the referenced file are downloaded once, and compiled once per process
+        - The referenced file is read from the cache when validating
+        """
+        mocker.patch('f5cli.constants.F5_CLI_SCHEMA_DIR', str(tmp_path))
+        documents = {
+            'base.schema.json': {
+                '$schema': 'http://json-schema.org/draft-07/schema#',
+                'type': 'object',
+                'properties': {'class': {'$ref': 'system.schema.json#/definitions/class'}}
+            },
+            'system.schema.json': {'definitions': {'class': {'enum': ['Device']}}}
+        }
+
+        def get_side_effect(url, **kwargs):  # pylint: disable=unused-argument
+            response = MagicMock()
+            response.json.return_value = documents[url.rsplit('/', 1)[-1]]
+            return response
+        mock_get = mocker.patch('f5cli.api.schema_validation.requests.get',
+                                side_effect=get_side_effect)
+        schema_validation.get_validator.cache_clear()
+
+        errors = []
+        for _ in range(2):
+            schema_validation.load_schema('do', '1.11.1')
+            validator = schema_validation.get_validator('do', '1.11.1')
+            errors.append(schema_validation.validate_declaration(validator, {'class': 'Devcie'}))
+            assert schema_validation.get_validator.cache_info().misses == 1
+            schema_validation.get_validator.cache_clear()
+
+        assert [call[0][0].rsplit('/v1.11.1/', 1)[-1] for call in mock_get.call_args_list] == [
+            'src/schema/1.11.1/base.schema.json', 'src/schema/1.11.1/system.schema.json']
+        assert len(errors[0]) == 1 and errors[0] == errors[1]
+
+    def test_cmd_service_validate_schema_unavailable(self, mocker, tmp_path):
+        """ Command service validate using the published schema, offline
+        Given
+        - The published schema for the version is not cached locally
+        - The schema cannot be downloaded
+        When
+        - Declarations are validated against the version twice
+        Then
+        - Both validations fail, the download is only attempted once
+        """
+        mocker.patch('f5cli.constants.F5_CLI_SCHEMA_DIR', str(tmp_path))
+        mock_get = mocker.patch('f5cli.api.schema_validation.requests.get',
+                                side_effect=IOError('network is unreachable'))
+
+        with pytest.raises(IOError):
+            schema_validation.load_schema('do', '1.11.1')
+        with pytest.raises(Exception) as error:
+            schema_validation.load_schema('do', '1.11.1')
+
+        assert 'its download recently failed' in str(error.value)
+        assert mock_get.call_count == 1
+
+    # pylint: disable=unused-argument
+    def test_cmd_service_create_invalid_declaration(self,
+                                                    mocker,
+                                                    tmp_path,
+                                                    config_client_read_auth_fixture,
+                                                    mgmt_client_fixture,
+                                                    do_extension_client_fixture):
+        """ Command service create an invalid declaration
+        Given
+        - BIG-IP is up
+        - 'do' component is installed
+        - The schema for the installed version is available
+        When
+        - User attempts to create an invalid 'do' declaration
+        Then
+        - The declaration is rejected before it is submitted
+        """
+        mocker.patch(
+            'f5cli.api.schema_validation.get_validator',
+            return_value=jsonschema.Draft7Validator(TEST_SCHEMA))
+        mock_service = MagicMock()
+        type(do_extension_client_fixture.return_value).service = PropertyMock(
+            return_value=mock_service)
+        declaration_file = tmp_path / 'declaration.json'
+        declaration_file.write_text(json.dumps({'class': 'Devcie'}))
+
+        result = self.runner.invoke(cli, ['extension', 'do', 'create',
+                                          '--declaration', str(declaration_file)])
+
+        assert result.exit_code == 1
+        assert 'Declaration is invalid: /class:' in result.output
+        mock_service.create.assert_not_called()
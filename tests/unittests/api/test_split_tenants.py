@@ -0,0 +1,234 @@
+"""Test: splitting AS3 declarations by tenant """
+
+import json
+
+from f5sdk.bigip import ManagementClient
+
+from f5cli.config import AuthConfigurationClient
+from f5cli.commands.cmd_bigip import cli
+
+from ...global_test_imports import MagicMock, PropertyMock, pytest, CliRunner
+
+MOCK_CONFIG_CLIENT_READ_AUTH_RETURN_VALUE = {
+    'host': '1.2.3.4',
+    'port': '1234',
+    'type': 'BIGIP',
+    'user': 'test_user',
+    'password': 'test_password'
+}
+
+
+class TestSplitTenants(object):
+    """ Test Class: extension create --split-tenants """
+    @classmethod
+    def setup_class(cls):
+        """ Setup func """
+        cls.runner = CliRunner()
+
+    @classmethod
+    def teardown_class(cls):
+        """ Teardown func """
+
+    @staticmethod
+    @pytest.fixture
+    def as3_extension_client_fixture(mocker):
+        """Test fixture """
+        mock_extension_client = mocker.patch(
+            "f5sdk.bigip.extension.AS3Client")
+
+        mock = MagicMock()
+        mock.is_installed.return_value = {
+            'installed': True
+        }
+        type(mock_extension_client.return_value).package = PropertyMock(return_value=mock)
+        return mock_extension_client
+
+    @staticmethod
+    @pytest.fixture
+    def config_client_read_auth_fixture(mocker):
+        """ PyTest fixture mocking AuthConfigurationClient's read_auth method """
+        mock_config_client_read_auth = mocker.patch.object(
+            AuthConfigurationClient, "read_auth")
+        mock_config_client_read_auth.return_value = MOCK_CONFIG_CLIENT_READ_AUTH_RETURN_VALUE
+
+    @staticmethod
+    @pytest.fixture
+    def mgmt_client_fixture(mocker):
+        """ PyTest fixture returning mocked BigIP Management Client """
+        mock_management_client = mocker.patch.object(ManagementClient, '__init__')
+        mock_management_client.return_value = None
+        mocker.patch.object(ManagementClient, 'host', '1.2.3.4', create=True)
+        return mock_management_client
+
+    # pylint: disable=unused-argument
+    def test_cmd_service_create_declaration_split_tenants(self,
+                                                          mocker,
+                                                          tmp_path,
+                                                          config_client_read_auth_fixture,
+                                                          mgmt_client_fixture,
+                                                          as3_extension_client_fixture):
+        """ Command service create declaration split by tenant
+        Given
+        - BIG-IP is up
+        - 'as3' component is installed
+        - declaration contains 'Common' and two other tenants
+        When
+        - User attempts to create a 'as3' declaration with --split-tenants
+        Then
+        - each tenant is posted to the tenant-scoped endpoint, 'Common' first
+        - per-tenant results are merged
+        """
+        declaration = {
+            'class': 'AS3',
+            'declaration': {
+                'class': 'ADC',
+                'schemaVersion': '3.0.0',
+                'tenant_b': {'class': 'Tenant'},
+                'Common': {'class': 'Tenant'},
+                'tenant_a': {'class': 'Tenant'}
+            }
+        }
+        declaration_file = tmp_path / 'declaration.json'
+        declaration_file.write_text(json.dumps(declaration))
+
+        mock_service = MagicMock()
+        mock_service._get_configure_endpoint.return_value = {  # pylint: disable=protected-access
+            'uri': '/mgmt/shared/appsvcs/declare'
+        }
+        type(as3_extension_client_fixture.return_value).service = PropertyMock(
+            return_value=mock_service)
+
+        def make_request_side_effect(uri, **kwargs):
+            tenant = uri.split('/')[-1]
+            tenants = [key for key, val in kwargs['body']['declaration'].items()
+                       if isinstance(val, dict)]
+            assert tenants == [tenant]
+            return {'results': [{'tenant': tenant, 'code': 200}]}, 200
+        mock_make_request = mocker.patch.object(
+            ManagementClient, 'make_request', side_effect=make_request_side_effect)
+
+        result = self.runner.invoke(cli, ['extension', 'as3', 'create',
+                                          '--declaration', str(declaration_file),
+                                          '--split-tenants', '--parallel', '2'])
+
+        assert result.exit_code == 0, result.output
+        assert mock_make_request.call_args_list[0][0][0] == '/mgmt/shared/appsvcs/declare/Common'
+        assert json.loads(result.output) == {
+            'results': [
+                {'tenant': 'Common', 'code': 200},
+                {'tenant': 'tenant_b', 'code': 200},
+                {'tenant': 'tenant_a', 'code': 200}
+            ]
+        }
+
+    # pylint: disable=unused-argument
+    def test_cmd_service_create_declaration_split_tenants_failure(self,
+                                                                  mocker,
+                                                                  tmp_path,
+                                                                  config_client_read_auth_fixture,
+                                                                  mgmt_client_fixture,
+                                                                  as3_extension_client_fixture):
+        """ Command service create declaration split by tenant, a tenant failing
+        Given
+        - BIG-IP is up
+        - 'as3' component is installed
+        - declaration contains two tenants, one of which is rejected
+        When
+        - User attempts to create a 'as3' declaration with --split-tenants
+        Then
+        - Every tenant is posted
+        - The failed tenant is reported, with a non-zero exit code
+        """
+        declaration_file = tmp_path / 'declaration.json'
+        declaration_file.write_text(json.dumps({
+            'class': 'ADC',
+            'schemaVersion': '3.0.0',
+            'tenant_a': {'class': 'Tenant'},
+            'tenant_b': {'class': 'Tenant'}
+        }))
+
+        mock_service = MagicMock()
+        mock_service._get_configure_endpoint.return_value = {  # pylint: disable=protected-access
+            'uri': '/mgmt/shared/appsvcs/declare'
+        }
+        type(as3_extension_client_fixture.return_value).service = PropertyMock(
+            return_value=mock_service)
+
+        def make_request_side_effect(uri, **kwargs):
+            tenant = uri.split('/')[-1]
+            if tenant == 'tenant_a':
+                raise Exception('declaration is invalid')
+            return {'results': [{'tenant': tenant, 'code': 200}]}, 200
+        mock_make_request = mocker.patch.object(
+            ManagementClient, 'make_request', side_effect=make_request_side_effect)
+
+        result = self.runner.invoke(cli, ['extension', 'as3', 'create',
+                                          '--declaration', str(declaration_file),
+                                          '--split-tenants'])
+
+        assert result.exit_code == 1
+        assert mock_make_request.call_count == 2
+        assert '1 of 2 tenants failed (tenant_a)' in result.output
+
+    # pylint: disable=unused-argument
+    def test_cmd_service_create_declaration_split_tenants_rejected(self,
+                                                                   mocker,
+                                                                   tmp_path,
+                                                                   config_client_read_auth_fixture,
+                                                                   mgmt_client_fixture,
+                                                                   as3_extension_client_fixture):
+        """ Command service create declaration split by tenant, a tenant rejected by AS3
+        Given
+        - BIG-IP is up
+        - 'as3' component is installed
+        - declaration contains two tenants, the task result of one is a 422
+        When
+        - User attempts to create a 'as3' declaration with --split-tenants
+        Then
+        - The rejected tenant is reported, with a non-zero exit code
+        """
+        declaration_file = tmp_path / 'declaration.json'
+        declaration_file.write_text(json.dumps({
+            'class': 'ADC',
+            'schemaVersion': '3.0.0',
+            'tenant_a': {'class': 'Tenant'},
+            'tenant_b': {'class': 'Tenant'}
+        }))
+
+        mock_service = MagicMock()
+        mock_service._get_configure_endpoint.return_value = {  # pylint: disable=protected-access
+            'uri': '/mgmt/shared/appsvcs/declare'
+        }
+        mock_service._wait_for_task.side_effect = lambda link: {  # pylint: disable=protected-access
+            'results': [{'tenant': link.split('/')[-1], 'code': 422,
+                         'message': 'declaration failed'}]
+        } if link.endswith('tenant_a') else {
+            'results': [{'tenant': link.split('/')[-1], 'code': 200, 'message': 'success'}]
+        }
+        type(as3_extension_client_fixture.return_value).service = PropertyMock(
+            return_value=mock_service)
+        mocker.patch.object(ManagementClient, 'make_request', side_effect=lambda uri, **kwargs: (
+            {'selfLink': 'https://localhost/mgmt/shared/appsvcs/task/%s' % uri.split('/')[-1]},
+            202))
+
+        result = self.runner.invoke(cli, ['extension', 'as3', 'create',
+                                          '--declaration', str(declaration_file),
+                                          '--split-tenants'])
+
+        assert result.exit_code == 1
+        assert '1 of 2 tenants failed (tenant_a)' in result.output
+        assert '"message": "declaration failed"' in result.output
+
+    def test_cmd_service_split_tenants_unsupported_action(self):
+        """ Command service split tenants on a non-create action
+        Given
+        - BIG-IP is up
+        When
+        - User attempts to perform 'show' action with --split-tenants
+        Then
+        - Unsupported option exception is thrown
+        """
+
+        result = self.runner.invoke(cli, ['extension', 'as3', 'show', '--split-tenants'])
+        assert result.exception
+        assert 'only supported by the create action' in result.output
@@ -0,0 +1,118 @@
+"""Test: api.upgrade """
+
+
+from f5cli import api, constants
+from f5cli.api import upgrade
+from f5cli.config import InventoryClient
+
+from ...global_test_imports import pytest
+
+METADATA = {
+    'components': {
+        component: {'versions': {
+            '1.9.0': {'latest': False},
+            '1.10.0': {'latest': True}
+        }} for component in ['as3', 'do', 'ts', 'cf']
+    }
+}
+INSTALLED = {'as3': '1.9.0', 'do': '1.10.0', 'ts': None, 'cf': '1.9.0'}
+
+
+@pytest.fixture
+def inventory_fixture(mocker, tmp_path):
+    """Test fixture, the inventory of two devices and the extension metadata """
+    mocker.patch.object(constants, 'F5_INVENTORY_FILE', str(tmp_path / 'inventory.json'))
+    mocker.patch.object(constants, 'F5_CLI_LOCK_DIR', str(tmp_path / 'locks'))
+    mocker.patch.object(constants, 'F5_CLI_CACHE_DIR', str(tmp_path / 'cache'))
+    metadata_client = mocker.patch(
+        'f5sdk.bigip.extension.extension_metadata.MetadataClient')
+    metadata_client.return_value.extension_metadata = METADATA
+    for name in ['bigip_1', 'bigip_2']:
+        InventoryClient().update(name, {'host': name}, {'extensions': INSTALLED})
+    return metadata_client
+
+
+# pylint: disable=redefined-outer-name
+def test_plan_from_inventory(inventory_fixture, tmp_path):
+    """ Plan upgrades from the cached inventory and metadata
+    Given
+    - The inventory of two devices, with an older AS3 and CF, and the latest DO
+    - The metrics of two earlier AS3 upgrades
+
+    When
+    - Upgrades are planned twice, devices upgraded two at a time
+
+    Then
+    - AS3 and CF upgrades are planned per device, estimated from the metrics when recorded
+    - The metadata is only fetched once
+    """
+
+    metrics_file = tmp_path / 'f5.prom'
+    metrics_file.write_text(
+        'f5cli_operation_duration_seconds_sum{component="as3",action="upgrade"} 50\n'
+        'f5cli_operation_duration_seconds_count{component="as3",action="upgrade"} 2\n')
+
+    upgrade.plan(targets=['bigip_1'])
+    upgrade_plan = upgrade.plan(parallel=2, metrics_file=str(metrics_file))
+
+    assert inventory_fixture.call_count == 1
+    assert [(step['name'], step['component'], step['action']) for step in upgrade_plan['steps']
+            if step['name'] == 'bigip_1'] == [
+                ('bigip_1', 'as3', 'upgrade'), ('bigip_1', 'do', 'current'),
+                ('bigip_1', 'ts', 'skip'), ('bigip_1', 'cf', 'upgrade')]
+    assert upgrade_plan['steps'][0]['estimated_seconds'] == 25.0
+    assert upgrade_plan['summary']['upgrades'] == 4
+    assert upgrade_plan['summary']['total_seconds'] == 2 * 25.0 + 2 * 60.0
+    assert upgrade_plan['summary']['estimated_seconds'] == 25.0 + 60.0
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_plan_invalid_version(inventory_fixture):
+    """ Reject a target version which is not available
+    Given
+    - The extension metadata
+
+    When
+    - An upgrade to an unknown AS3 version is planned
+
+    Then
+    - An error is raised
+    """
+
+    with pytest.raises(api.ApiError) as error:
+        upgrade.plan(versions={'as3': '2.0.0'})
+
+    assert "Version '2.0.0' of 'as3' is not available" in str(error.value)
+
+
+def test_replay(mocker):
+    """ Replay the upgrade steps of a component
+    Given
+    - A plan upgrading AS3 on two devices, one of which was already upgraded, and DO on one
+
+    When
+    - The AS3 upgrades of the plan are replayed
+
+    Then
+    - Only the AS3 upgrade of the device not yet upgraded is performed
+    """
+
+    mocker.patch('f5cli.api.upgrade.get_accounts', side_effect=lambda names: [{
+        'name': names[0]}])
+    mocker.patch('f5cli.api.upgrade.get_mgmt_client', side_effect=lambda auth: auth['name'])
+    versions = {'bigip_1': '1.9.0', 'bigip_2': '1.10.0'}
+    mock_extension = mocker.patch('f5cli.api.upgrade.extension', side_effect=lambda component,
+                                  action, client, **kwargs: {
+                                      'installed': True, 'installed_version': versions[client]
+                                  } if action == 'verify' else 'upgraded')
+    steps = [{'name': name, 'host': name, 'component': component, 'version': '1.10.0',
+              'action': 'upgrade'} for name, component in [
+                  ('bigip_1', 'as3'), ('bigip_2', 'as3'), ('bigip_1', 'do')]]
+
+    results = api.upgrade.replay('as3', {'steps': steps})
+
+    assert [(result['name'], result['status']) for result in results] == [
+        ('bigip_1', 'success'), ('bigip_2', 'current')]
+    assert [call[0][:2] + (call[1].get('version'),) for call in
+            mock_extension.call_args_list if call[0][1] == 'upgrade'] == [
+                ('as3', 'upgrade', '1.10.0')]
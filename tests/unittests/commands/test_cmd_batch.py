@@ -0,0 +1,228 @@
+""" Test batch command """
+
+import os
+import json
+
+from f5cli import constants
+from f5cli.cli import cli
+from f5cli.config import AuthConfigurationClient
+
+from ...global_test_imports import pytest, CliRunner
+
+TEMPLATE = {'class': 'ADC', 'schemaVersion': '3.0.0', '${tenant}': {'class': 'Tenant'}}
+MOCK_CS_AUTH = {
+    'user': 'test_user',
+    'password': 'test_password'
+}
+
+
+class TestCommandBatch(object):
+    """ Test Class: command batch """
+
+    @classmethod
+    def setup_class(cls):
+        """ Setup func """
+        cls.runner = CliRunner()
+
+    @staticmethod
+    @pytest.fixture
+    def config_fixture(monkeypatch, tmp_path):
+        """ PyTest fixture keeping the configuration in a temporary directory, with a template """
+        monkeypatch.setattr(constants, 'F5_CLI_DIR', str(tmp_path))
+        monkeypatch.setattr(constants, 'F5_CONFIG_FILE', str(tmp_path / 'config.yaml'))
+        monkeypatch.setattr(constants, 'F5_AUTH_FILE', str(tmp_path / 'auth.yaml'))
+        monkeypatch.setenv(constants.ENV_VARS['ALLOW_TELEMETRY'], 'false')
+        monkeypatch.delenv(constants.ENV_VARS['OUTPUT_FORMAT'], raising=False)
+        (tmp_path / 'template.json').write_text(json.dumps(TEMPLATE))
+        (tmp_path / 'vars.csv').write_text('tenant\nt1\n')
+        return tmp_path
+
+    @staticmethod
+    def _render(tmp_path):
+        return 'f5 declaration render --template %s --vars %s' % (
+            tmp_path / 'template.json', tmp_path / 'vars.csv')
+
+    @staticmethod
+    def _get_results(output):
+        return [json.loads(line) for line in output.splitlines() if line.startswith('{')]
+
+    # pylint: disable=redefined-outer-name,unused-argument
+    def test_cmd_batch_runs_lines(self, config_fixture):
+        """ Run each line as a command
+
+        Given
+        - A batch with a comment, a blank line and two commands
+
+        When
+        - User executes 'batch', reading the batch from standard input
+
+        Then
+        - A result is written per command, containing its output
+        """
+
+        batch = '# render\n\n%s\n%s --mode per-tenant\n' % (
+            self._render(config_fixture), self._render(config_fixture))
+
+        result = self.runner.invoke(cli, ['batch'], input=batch)
+
+        assert result.exit_code == 0, result.output
+        results = self._get_results(result.output)
+        assert [item['line'] for item in results] == [3, 4]
+        assert [item['status'] for item in results] == ['success', 'success']
+        assert results[0]['output'] == {'class': 'ADC', 'schemaVersion': '3.0.0',
+                                        't1': {'class': 'Tenant'}}
+        assert results[1]['output'][0]['tenant'] == 't1'
+
+    # pylint: disable=redefined-outer-name,unused-argument
+    def test_cmd_batch_stop_on_error(self, config_fixture):
+        """ Skip the remaining lines once a line fails
+
+        Given
+        - A batch where the first command fails
+
+        When
+        - User executes 'batch' with '--stop-on-error'
+
+        Then
+        - The failure is reported, the next command is skipped and the batch fails
+        """
+
+        batch_file = config_fixture / 'batch.txt'
+        batch_file.write_text('declaration render --template missing.json --vars missing.csv\n'
+                              '%s\n' % self._render(config_fixture))
+
+        result = self.runner.invoke(cli, ['batch', '--file', str(batch_file),
+                                          '--stop-on-error'])
+
+        assert result.exit_code == 1
+        results = self._get_results(result.output)
+        assert [item['status'] for item in results] == ['failure', 'skipped']
+        assert results[0]['exit_code'] == 1
+        assert results[0]['error']
+        assert 'Error: 2 of 2 commands failed or were skipped' in result.output
+
+    # pylint: disable=redefined-outer-name,unused-argument
+    def test_cmd_batch_parallel_waits_for_config(self, config_fixture):
+        """ Run a config line alone, before the lines after it
+
+        Given
+        - A batch changing the output format, followed by commands
+
+        When
+        - User executes 'batch' with '--parallel 4'
+
+        Then
+        - The commands after the config line use the new output format
+        """
+
+        batch = 'config set-defaults --output table --auto-approve\n%s\n%s\n' % (
+            self._render(config_fixture), self._render(config_fixture))
+
+        result = self.runner.invoke(cli, ['batch', '--parallel', '4'], input=batch)
+
+        assert result.exit_code == 0, result.output
+        results = self._get_results(result.output)
+        assert results[0]['line'] == 1
+        assert sorted(item['line'] for item in results[1:]) == [2, 3]
+        assert all(isinstance(item['output'], str) for item in results[1:])
+
+    # pylint: disable=redefined-outer-name,unused-argument
+    def test_cmd_batch_invalid_line(self, config_fixture):
+        """ Validate every line before running any
+
+        Given
+        - A batch with a nested batch command
+
+        When
+        - User executes 'batch'
+
+        Then
+        - The batch fails without running the first command
+        """
+
+        batch = '%s\nf5 batch --file other.txt\n' % self._render(config_fixture)
+
+        result = self.runner.invoke(cli, ['batch'], input=batch)
+
+        assert result.exit_code == 1
+        assert 'Line 2: batch commands cannot be nested' in result.output
+        assert not self._get_results(result.output)
+
+    # pylint: disable=redefined-outer-name,unused-argument
+    def test_cmd_batch_shares_clients(self, config_fixture, mocker):
+        """ Login once per account
+
+        Given
+        - A batch running three Cloud Services commands, for the same account
+
+        When
+        - User executes 'batch' with '--parallel 3'
+
+        Then
+        - A single management client is created
+        """
+
+        mocker.patch.object(AuthConfigurationClient, 'read_auth', return_value=MOCK_CS_AUTH)
+        mock_management_client = mocker.patch('f5cli.api.cs.core.ManagementClient')
+        mock_account_client = mocker.patch('f5cli.api.cs.account.AccountClient')
+        mock_account_client.return_value.show_user.return_value = {'id': 'u-1'}
+
+        result = self.runner.invoke(cli, ['batch', '--parallel', '3'],
+                                    input='cs account show-user\n' * 3)
+
+        assert result.exit_code == 0, result.output
+        results = self._get_results(result.output)
+        assert [item['output'] for item in results] == [{'id': 'u-1'}] * 3
+        assert mock_management_client.call_count == 1
+
+    # pylint: disable=redefined-outer-name,unused-argument
+    @pytest.mark.parametrize('option', ['--timings', '--http-stats=json', '--profile'])
+    def test_cmd_batch_instrument_option_in_line(self, config_fixture, option):
+        """ Reject a line enabling an instrument recording the whole process
+
+        Given
+        - A batch with a line passing a global instrument option
+
+        When
+        - User executes 'batch'
+
+        Then
+        - The batch fails before any line is run, naming the option
+        """
+
+        batch = '%s\nf5 %s bigip extension as3 show\n' % (self._render(config_fixture), option)
+
+        result = self.runner.invoke(cli, ['batch'], input=batch)
+
+        assert result.exit_code == 1
+        assert 'Line 2: %s records the whole process' % option.split('=')[0] in result.output
+        assert not self._get_results(result.output)
+
+    # pylint: disable=redefined-outer-name,unused-argument
+    def test_cmd_batch_instrument_env_var(self, config_fixture, monkeypatch, mocker):
+        """ Enable an instrument once for the whole batch
+
+        Given
+        - The metrics file environment variable is set
+
+        When
+        - User executes 'batch'
+
+        Then
+        - The lines run without the environment variable, which is restored afterwards
+        """
+
+        envvar = constants.ENV_VARS['METRICS_FILE']
+        monkeypatch.setenv(envvar, str(config_fixture / 'metrics.jsonl'))
+        environments = []
+
+        def mock_run_line(root, line):
+            environments.append(envvar in os.environ)
+            return {'line': line.number, 'command': line.text, 'status': 'success'}
+        mocker.patch('f5cli.commands.cmd_batch.run_line', side_effect=mock_run_line)
+
+        result = self.runner.invoke(cli, ['batch'], input=self._render(config_fixture))
+
+        assert result.exit_code == 0, result.output
+        assert environments == [False]
+        assert os.environ[envvar] == str(config_fixture / 'metrics.jsonl')
@@ -97,6 +97,7 @@ class TestCommandBigIp(object):
         """ PyTest fixture returning mocked BigIP Management Client """
         mock_management_client = mocker.patch.object(ManagementClient, '__init__')
         mock_management_client.return_value = None
+        mocker.patch.object(ManagementClient, 'host', '1.2.3.4', create=True)
         return mock_management_client
 
     # pylint: disable=unused-argument
@@ -724,6 +725,48 @@ class TestCommandBigIp(object):
         mock_utils_core_convert.assert_has_calls(
             [call('./test/fake_declaration.json')])
 
+    # pylint: disable=unused-argument
+    def test_cmd_service_create_declaration_template(self,
+                                                     tmp_path,
+                                                     config_client_read_auth_fixture,
+                                                     mgmt_client_fixture,
+                                                     as3_extension_client_fixture):
+        """ Command service create declaration rendered from a template
+        Given
+        - BIG-IP is up
+        - 'as3' component is installed
+        - A template and a variables file with a row per application
+        When
+        - User attempts to create a 'as3' declaration using --template and --vars
+        Then
+        - The merged, rendered declaration is created without an intermediate file
+        """
+        template_file = tmp_path / 'template.json'
+        template_file.write_text(json.dumps({
+            'class': 'ADC',
+            '${tenant}': {'class': 'Tenant', '${app}': {'class': 'Application'}}
+        }))
+        vars_file = tmp_path / 'apps.csv'
+        vars_file.write_text('tenant,app\nt1,a1\nt1,a2\n')
+        mock_service = MagicMock()
+        mock_service.create.return_value = {'foo': 'bar'}
+        type(as3_extension_client_fixture.return_value).service = PropertyMock(
+            return_value=mock_service)
+
+        result = self.runner.invoke(cli, ['extension', 'as3', 'create',
+                                          '--template', str(template_file),
+                                          '--vars', str(vars_file)])
+
+        assert result.exit_code == 0, result.output
+        mock_service.create.assert_called_once_with(config={
+            'class': 'ADC',
+            't1': {
+                'class': 'Tenant',
+                'a1': {'class': 'Application'},
+                'a2': {'class': 'Application'}
+            }
+        })
+
     # pylint: disable=unused-argument
     def test_cmd_service_show_failover_cf_component(self,
                                                     mocker,
@@ -888,3 +931,30 @@ class TestCommandBigIp(object):
             cli, ['extension', 'as3', 'remove'])
         assert "invalid choice: remove" in result.output
         assert result.exception
+
+    def test_cmd_upgrade_plan(self, mocker):
+        """ Replay the upgrades of a plan
+        Given
+        - An upgrade plan file
+
+        When
+        - User upgrades AS3 with --plan, then shows AS3 with --plan
+
+        Then
+        - The AS3 upgrades of the plan are replayed, without performing the action itself
+        - The plan is rejected by other actions
+        """
+
+        mock_replay = mocker.patch('f5cli.api.upgrade.replay', return_value=[])
+        mock_extension = mocker.patch('f5cli.api.bigip.extension')
+
+        upgraded = self.runner.invoke(cli, ['extension', 'as3', 'upgrade', '--plan', 'plan.json',
+                                            '--parallel', '4'])
+        shown = self.runner.invoke(cli, ['extension', 'as3', 'show', '--plan', 'plan.json'])
+
+        assert upgraded.exit_code == 0, upgraded.output
+        mock_replay.assert_called_once_with('as3', 'plan.json', parallel=4,
+                                            queue_timeout=mocker.ANY)
+        assert shown.exit_code == 1
+        assert 'The --plan option is only supported by the upgrade action' in shown.output
+        assert not mock_extension.called
@@ -10,6 +10,8 @@ from f5sdk.cs.subscriptions import SubscriptionClient
 
 from f5cli.config import AuthConfigurationClient
 from f5cli.commands.cmd_cs import cli
+from f5cli.utils.metrics import MetricsRecorder, read_samples
+from f5cli import constants
 
 from ...global_test_imports import pytest, CliRunner
 
@@ -92,6 +94,33 @@ class TestCommandBigIp(object):
         result = self.runner.invoke(cli, ['account', 'show-user'])
         assert result.output == json.dumps(mock_response, indent=4, sort_keys=True) + '\n'
 
+    @pytest.mark.usefixtures("config_client_read_auth_fixture")
+    @pytest.mark.usefixtures("mgmt_client_fixture")
+    def test_cmd_cs_account_show_user_metrics(self, mocker, tmp_path):
+        """ Count a Cloud Services command as an operation
+
+        Given
+        - Metrics are being recorded
+        - The Account Client fails to show the user
+
+        When
+        - User executes a 'show_user'
+
+        Then
+        - The command is counted as a failed show-user operation of the account component
+        """
+
+        mocker.patch.object(AccountClient, "show_user", side_effect=Exception('Unauthorized'))
+        path = str(tmp_path / 'f5.prom')
+
+        with MetricsRecorder(path, interval=0) as recorder:
+            result = self.runner.invoke(cli, ['account', 'show-user'])
+        recorder.flush()
+
+        assert result.exit_code != 0
+        assert read_samples(path)[('f5cli_operations_total', (
+            ('component', 'cs.account'), ('action', 'show-user'), ('status', 'failure')))] == 1
+
     @pytest.mark.usefixtures("config_client_read_auth_fixture")
     @pytest.mark.usefixtures("mgmt_client_fixture")
     def test_cmd_cs_subscription_list(self, mocker):
@@ -149,6 +178,72 @@ class TestCommandBigIp(object):
         _, kwargs = mock_subscription_client_list.call_args
         assert kwargs['query_parameters']['account_id'] == 'foo'
 
+    @pytest.mark.usefixtures("config_client_read_auth_fixture")
+    @pytest.mark.usefixtures("mgmt_client_fixture")
+    def test_cmd_cs_subscription_list_paginated(self, mocker):
+        """ List subscriptions, one page at a time
+
+        Given
+        - The Subscription Client returns two full pages and a partial page
+
+        When
+        - User executes the 'list' command with a page size and NDJSON output
+
+        Then
+        - Each item is logged as its own record
+        - Each page is requested with the page size, offset and account id filter
+        """
+
+        mocker.patch.dict('os.environ', {'F5_OUTPUT_FORMAT': 'ndjson'})
+        pages = [
+            {'subscriptions': [{'id': 's-1'}, {'id': 's-2'}]},
+            {'subscriptions': [{'id': 's-3'}, {'id': 's-4'}]},
+            {'subscriptions': [{'id': 's-5'}]}
+        ]
+        mock_subscription_client_list = mocker.patch.object(
+            SubscriptionClient,
+            "list",
+            side_effect=pages
+        )
+
+        result = self.runner.invoke(cli, ['subscription', 'list', '--account-id-filter', 'foo',
+                                          '--page-size', '2'])
+
+        assert result.output == ''.join('{"id":"s-%d"}\n' % idx for idx in range(1, 6))
+        assert [call[1]['query_parameters'] for call in
+                mock_subscription_client_list.call_args_list] == [
+                    {'account_id': 'foo', 'limit': 2, 'offset': 0},
+                    {'account_id': 'foo', 'limit': 2, 'offset': 2},
+                    {'account_id': 'foo', 'limit': 2, 'offset': 4}
+                ]
+
+    @pytest.mark.usefixtures("config_client_read_auth_fixture")
+    @pytest.mark.usefixtures("mgmt_client_fixture")
+    def test_cmd_cs_subscription_list_max_items(self, mocker):
+        """ List subscriptions, up to a maximum number of items
+
+        Given
+        - The Subscription Client returns full pages
+
+        When
+        - User executes the 'list' command with max items
+
+        Then
+        - Only max items are logged
+        - No page is requested beyond the one containing the last item
+        """
+
+        mock_subscription_client_list = mocker.patch.object(
+            SubscriptionClient,
+            "list",
+            return_value={'subscriptions': [{'id': 's-1'}, {'id': 's-2'}, {'id': 's-3'}]}
+        )
+
+        result = self.runner.invoke(cli, ['subscription', 'list', '--max-items', '3'])
+
+        assert json.loads(result.output) == [{'id': 's-1'}, {'id': 's-2'}, {'id': 's-3'}]
+        assert mock_subscription_client_list.call_count == 1
+
     @pytest.mark.usefixtures("config_client_read_auth_fixture")
     @pytest.mark.usefixtures("mgmt_client_fixture")
     def test_cmd_cs_subscription_show(self, mocker):
@@ -253,3 +348,71 @@ class TestCommandBigIp(object):
                                           SUBSCRIPTION_ID, '--declaration', 'decl.json'])
         assert result.output == json.dumps(mock_update_return, indent=4, sort_keys=True) + '\n'
         assert mock_subscription_client_update.call_args[1]['config_file'] == expected_config_file
+
+    @staticmethod
+    @pytest.fixture
+    def response_cache_fixture(mocker, tmp_path):
+        """ PyTest fixture enabling the response cache in a temporary directory """
+        mocker.patch('f5cli.constants.F5_CLI_CACHE_DIR', str(tmp_path))
+        mocker.patch.dict(os.environ, {constants.ENV_VARS['CS_RESPONSE_CACHE']: 'true'})
+        return tmp_path
+
+    @pytest.mark.usefixtures("config_client_read_auth_fixture")
+    @pytest.mark.usefixtures("mgmt_client_fixture")
+    @pytest.mark.usefixtures("response_cache_fixture")
+    def test_cmd_cs_account_show_user_cached(self, mocker):
+        """ Show currently authenticated CS user, using the response cache
+
+        Given
+        - The response cache is enabled
+        - The Account Client returns a successful response
+
+        When
+        - User executes 'show-user' twice, then with --refresh and --no-cache
+
+        Then
+        - The second response is served from the cache
+        - --refresh and --no-cache both call the API
+        """
+
+        mock_show_user = mocker.patch.object(
+            AccountClient, "show_user", return_value={'foo': 'bar'})
+
+        for _ in range(2):
+            result = self.runner.invoke(cli, ['account', 'show-user'])
+            assert json.loads(result.output) == {'foo': 'bar'}
+        assert mock_show_user.call_count == 1
+
+        self.runner.invoke(cli, ['account', 'show-user', '--refresh'])
+        self.runner.invoke(cli, ['account', 'show-user', '--no-cache'])
+        assert mock_show_user.call_count == 3
+
+    @pytest.mark.usefixtures("config_client_read_auth_fixture")
+    @pytest.mark.usefixtures("mgmt_client_fixture")
+    @pytest.mark.usefixtures("response_cache_fixture")
+    def test_cmd_cs_subscription_update_invalidates_cache(self, mocker):
+        """ Update a subscription after showing it, using the response cache
+
+        Given
+        - The response cache is enabled
+        - The subscription has been shown (and cached)
+
+        When
+        - User updates the subscription, then shows it again
+
+        Then
+        - The subscription is fetched again, rather than served from the cache
+        """
+
+        mock_show = mocker.patch.object(
+            SubscriptionClient, "show", return_value={'subscription_id': SUBSCRIPTION_ID})
+        mocker.patch.object(SubscriptionClient, "update", return_value={})
+
+        self.runner.invoke(cli, ['subscription', 'show', '--subscription-id', SUBSCRIPTION_ID])
+        self.runner.invoke(cli, ['subscription', 'show', '--subscription-id', SUBSCRIPTION_ID])
+        assert mock_show.call_count == 1
+
+        self.runner.invoke(cli, ['subscription', 'update', '--subscription-id',
+                                 SUBSCRIPTION_ID, '--declaration', 'decl.json'])
+        self.runner.invoke(cli, ['subscription', 'show', '--subscription-id', SUBSCRIPTION_ID])
+        assert mock_show.call_count == 2
@@ -72,6 +72,32 @@ class TestCommandBeacon(object):
         result = self.runner.invoke(cli, ['beacon', 'insights', 'list'])
         assert result.output == json.dumps(mock_response, indent=4, sort_keys=True) + '\n'
 
+    @pytest.mark.usefixtures("config_client_read_auth_fixture")
+    @pytest.mark.usefixtures("mgmt_client_fixture")
+    def test_cmd_beacon_insights_list_paginated(self, mocker):
+        """ List beacon insights, one page at a time
+
+        Given
+        - The Insights Client ignores pagination and returns every insight
+
+        When
+        - User executes a 'list' with a page size
+
+        Then
+        - Each insight is logged once
+        """
+
+        mock_insights_list = mocker.patch.object(
+            InsightsClient,
+            "list",
+            return_value={'insights': [{'name': 'a'}, {'name': 'b'}]}
+        )
+
+        result = self.runner.invoke(cli, ['beacon', 'insights', 'list', '--page-size', '2'])
+
+        assert json.loads(result.output) == [{'name': 'a'}, {'name': 'b'}]
+        assert mock_insights_list.call_count == 2
+
     @pytest.mark.usefixtures("config_client_read_auth_fixture")
     @pytest.mark.usefixtures("mgmt_client_fixture")
     def test_cmd_beacon_insights_create(self, mocker):
@@ -323,3 +349,91 @@ class TestCommandBeacon(object):
 
         result = self.runner.invoke(cli, ['beacon', 'token', 'list'])
         assert result.output == json.dumps(mock_response, indent=4, sort_keys=True) + '\n'
+
+    @pytest.mark.usefixtures("config_client_read_auth_fixture")
+    @pytest.mark.usefixtures("mgmt_client_fixture")
+    def test_cmd_beacon_token_create_declaration_dir(self, mocker, tmp_path):
+        """ Creating beacon tokens from a directory of declarations
+
+        Given
+        - A directory containing an unchanged, a new and an invalid declaration
+        - The Token Client lists the unchanged token as existing
+
+        When
+        - User executes a 'create' with the declaration directory
+
+        Then
+        - Existing tokens are listed once, without paging
+        - Only the new token is created
+        - A result is returned for every declaration file
+        - The invalid declaration fails the command
+        """
+
+        (tmp_path / 'a.json').write_text(json.dumps({'name': 'a', 'description': 'same'}))
+        (tmp_path / 'b.json').write_text(json.dumps({'name': 'b', 'description': 'new'}))
+        (tmp_path / 'c.json').write_text('{')
+        mock_list = mocker.patch.object(TokenClient, "list", return_value={
+            'tokens': [{'name': 'a', 'description': 'same', 'id': 't-1'}]
+        })
+        mock_create = mocker.patch.object(TokenClient, "create", return_value={'name': 'b'})
+
+        result = self.runner.invoke(cli, ['beacon', 'token', 'create',
+                                          '--declaration-dir', str(tmp_path), '--parallel', '2'])
+        output, error = result.output.rsplit('\n', 2)[:2]
+        assert [(item['file'], item['status']) for item in json.loads(output)['results']] \
+            == [('a.json', 'unchanged'), ('b.json', 'created'), ('c.json', 'failed')]
+        assert result.exit_code == 1
+        assert error == 'Error: 1 of 3 items failed'
+        mock_list.assert_called_once_with()
+        mock_create.assert_called_once_with(config={'name': 'b', 'description': 'new'})
+
+    @pytest.mark.usefixtures("config_client_read_auth_fixture")
+    @pytest.mark.usefixtures("mgmt_client_fixture")
+    def test_cmd_beacon_insights_delete_names_file(self, mocker, tmp_path):
+        """ Deleting beacon insights named in a file
+
+        Given
+        - A names file containing two names, a comment and a blank line
+        - The Insights Client fails to delete one of the insights
+
+        When
+        - User executes a 'delete' with the names file
+
+        Then
+        - Both insights are deleted, with a result per insight
+        - The failed deletion fails the command
+        """
+
+        names_file = tmp_path / 'names.txt'
+        names_file.write_text('# insights\nfoo\n\nbar\n')
+        mocker.patch.object(InsightsClient, "delete", side_effect=[{}, Exception('not found')])
+
+        result = self.runner.invoke(cli, ['beacon', 'insights', 'delete', '--names-file',
+                                          str(names_file), '--parallel', '1', '--auto-approve'])
+        output, error = result.output.rsplit('\n', 2)[:2]
+        assert json.loads(output)['results'] == [
+            {'name': 'foo', 'status': 'deleted'},
+            {'name': 'bar', 'status': 'failed', 'error': 'not found'}
+        ]
+        assert result.exit_code == 1
+        assert error == 'Error: 1 of 2 items failed'
+
+    @pytest.mark.usefixtures("config_client_read_auth_fixture")
+    @pytest.mark.usefixtures("mgmt_client_fixture")
+    def test_cmd_beacon_token_create_requires_one_declaration_option(self):
+        """ Creating a beacon token without a declaration
+
+        Given
+        - The CLI exists
+
+        When
+        - User executes a 'create' without --declaration or --declaration-dir
+
+        Then
+        - An error is returned
+        """
+
+        result = self.runner.invoke(cli, ['beacon', 'token', 'create'])
+        assert result.exception
+        assert 'Exactly one of the --declaration, --declaration-dir options is required' \
+            in result.output
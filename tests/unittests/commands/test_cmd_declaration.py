@@ -0,0 +1,115 @@
+""" Test declaration command """
+
+import json
+
+from f5cli.commands.cmd_declaration import cli
+
+from ...global_test_imports import pytest, CliRunner
+
+TEMPLATE = {
+    'class': 'ADC',
+    'schemaVersion': '3.0.0',
+    '${tenant}': {
+        'class': 'Tenant',
+        '${app}': {
+            'class': 'Application',
+            'virtualPort': '${port:int}'
+        }
+    }
+}
+VARS = 'tenant,app,port\nt1,a1,443\nt1,a2,80\nt2,a1,8443\n'
+
+
+class TestCommandDeclaration(object):
+    """ Test Class: command declaration """
+
+    @classmethod
+    def setup_class(cls):
+        """ Setup func """
+        cls.runner = CliRunner()
+
+    @staticmethod
+    @pytest.fixture
+    def template_fixture(tmp_path):
+        """ PyTest fixture writing a template and variables file """
+        template_file = tmp_path / 'template.json'
+        template_file.write_text(json.dumps(TEMPLATE))
+        vars_file = tmp_path / 'apps.csv'
+        vars_file.write_text(VARS)
+        return str(template_file), str(vars_file)
+
+    def test_cmd_declaration_render_merged(self, template_fixture):
+        """ Render a merged declaration
+
+        Given
+        - A template and a variables file with three rows, for two tenants
+
+        When
+        - User executes 'render'
+
+        Then
+        - A single declaration containing every application is returned
+        """
+
+        template_file, vars_file = template_fixture
+        result = self.runner.invoke(cli, ['render', '--template', template_file,
+                                          '--vars', vars_file])
+
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output) == {
+            'class': 'ADC',
+            'schemaVersion': '3.0.0',
+            't1': {
+                'class': 'Tenant',
+                'a1': {'class': 'Application', 'virtualPort': 443},
+                'a2': {'class': 'Application', 'virtualPort': 80}
+            },
+            't2': {
+                'class': 'Tenant',
+                'a1': {'class': 'Application', 'virtualPort': 8443}
+            }
+        }
+
+    def test_cmd_declaration_render_per_tenant(self, template_fixture):
+        """ Render a declaration per tenant
+
+        Given
+        - A template and a variables file with three rows, for two tenants
+
+        When
+        - User executes 'render' with '--mode per-tenant'
+
+        Then
+        - A declaration is returned for each tenant
+        """
+
+        template_file, vars_file = template_fixture
+        result = self.runner.invoke(cli, ['render', '--template', template_file,
+                                          '--vars', vars_file, '--mode', 'per-tenant'])
+
+        assert result.exit_code == 0, result.output
+        output = json.loads(result.output)
+        assert [item['tenant'] for item in output] == ['t1', 't2']
+        assert sorted(output[1]['declaration']) == ['class', 'schemaVersion', 't2']
+
+    def test_cmd_declaration_render_missing_variable(self, template_fixture, tmp_path):
+        """ Render a template with a missing variable
+
+        Given
+        - A variables file without the 'port' column
+
+        When
+        - User executes 'render'
+
+        Then
+        - An error identifying the row and variable is returned
+        """
+
+        template_file = template_fixture[0]
+        vars_file = tmp_path / 'missing.csv'
+        vars_file.write_text('tenant,app\nt1,a1\n')
+        result = self.runner.invoke(cli, ['render', '--template', template_file,
+                                          '--vars', str(vars_file)])
+
+        assert result.exit_code == 1
+        assert "Row 1: variable 'port' is not defined" in result.output
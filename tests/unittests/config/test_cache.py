@@ -0,0 +1,82 @@
+""" Test response cache """
+
+from f5cli.config import ResponseCacheClient
+
+from ...global_test_imports import pytest, Mock
+
+ACCOUNT = ['test_user', None]
+
+
+@pytest.fixture
+def cache_dir_fixture(mocker, tmp_path):
+    """Test fixture """
+    mocker.patch('f5cli.constants.F5_CLI_CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_get_or_fetch_expires(mocker, cache_dir_fixture):
+    """ Fetch a response while the cached response is valid, then expired
+    Given
+    - The cache is enabled
+
+    When
+    - The same request is made before and after the TTL expires
+
+    Then
+    - The response is fetched once per TTL
+    """
+
+    mock_time = mocker.patch('f5cli.config.cache.time.time', return_value=1000)
+    fetch = Mock(return_value={'foo': 'bar'})
+    cache_client = ResponseCacheClient(account=ACCOUNT, enabled=True)
+
+    assert cache_client.get_or_fetch(['account', 'show-user'], fetch, 60) == {'foo': 'bar'}
+    assert cache_client.get_or_fetch(['account', 'show-user'], fetch, 60) == {'foo': 'bar'}
+    assert fetch.call_count == 1
+
+    mock_time.return_value = 1061
+    cache_client.get_or_fetch(['account', 'show-user'], fetch, 60)
+    assert fetch.call_count == 2
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_cache_keyed_by_account_and_request(cache_dir_fixture):
+    """ Cache responses for different accounts and requests
+    Given
+    - A response is cached for an account and request
+
+    When
+    - A different request, or the same request for a different account, is made
+
+    Then
+    - Neither is served from the cache
+    """
+
+    ResponseCacheClient(account=ACCOUNT, enabled=True).set(['a'], {'foo': 'bar'}, 60)
+
+    assert ResponseCacheClient(account=ACCOUNT, enabled=True).get(['a']) == (True, {'foo': 'bar'})
+    assert ResponseCacheClient(account=ACCOUNT, enabled=True).get(['b']) == (False, None)
+    assert ResponseCacheClient(account=['other_user', None], enabled=True).get(['a']) \
+        == (False, None)
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_disabled_and_invalidate(cache_dir_fixture):
+    """ Use a disabled cache, and invalidate an account
+    Given
+    - A response is cached for an account
+
+    When
+    - The cache is read while disabled
+    - The account is invalidated by a disabled client
+
+    Then
+    - The disabled client does not read the response, but does invalidate it
+    """
+
+    ResponseCacheClient(account=ACCOUNT, enabled=True).set(['a'], {'foo': 'bar'}, 60)
+
+    assert ResponseCacheClient(account=ACCOUNT).get(['a']) == (False, None)
+    ResponseCacheClient(account=ACCOUNT).invalidate()
+    assert ResponseCacheClient(account=ACCOUNT, enabled=True).get(['a']) == (False, None)
@@ -0,0 +1,52 @@
+"""Test: demos/serverless/config_mgmt """
+
+import os
+import importlib.util
+
+from f5sdk.exceptions import HTTPError
+
+from ...global_test_imports import pytest
+
+pytest.importorskip('azure.functions')
+
+FUNCTION_FILE = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'demos', 'serverless',
+                             'config_mgmt', '__init__.py')
+DEVICE = ('192.0.2.10', 443, 'admin', 'admin', {'class': 'AS3'})
+
+
+@pytest.fixture
+def config_mgmt_fixture():
+    """Test fixture, the function module """
+    spec = importlib.util.spec_from_file_location('config_mgmt', FUNCTION_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# pylint: disable=redefined-outer-name
+@pytest.mark.parametrize('error, attempts', [
+    (HTTPError('Bad request for URL: https://192.0.2.10 code: 422 reason: Unprocessable'), 1),
+    (HTTPError('Bad request for URL: https://192.0.2.10 code: 401 reason: Unauthorized'), 2)
+])
+def test_process_retries_stale_client_only(config_mgmt_fixture, mocker, error, attempts):
+    """ Retry a target with a new client only once the reused client is stale
+    Given
+    - The cached client of a device is reused
+
+    When
+    - Applying the declaration fails, with a 422 or a 401
+
+    Then
+    - A rejected declaration (422) is raised without posting it again
+    - An unauthorized client (401) is replaced, and the target retried once
+    """
+
+    mocker.patch.object(config_mgmt_fixture, '_get_device', return_value={'reused': True})
+    mock_configure = mocker.patch.object(config_mgmt_fixture, '_configure',
+                                         side_effect=error)
+
+    with pytest.raises(HTTPError) as raised:
+        config_mgmt_fixture._process(*DEVICE)  # pylint: disable=protected-access
+
+    assert raised.value is error
+    assert mock_configure.call_count == attempts
@@ -2,14 +2,17 @@
 
 import sys
 import json
+import pstats
 import click
+import jmespath
+import requests
 
 import f5cli
 from f5cli.constants import FORMATS, ENV_VARS
 from f5cli.cli import PASS_CONTEXT, AliasedGroup
 from f5cli.cli import cli as basecli
 
-from ..global_test_imports import pytest, Mock, PropertyMock, CliRunner
+from ..global_test_imports import pytest, Mock, PropertyMock, CliRunner, call
 
 
 class TestBaseCli(object):
@@ -170,6 +173,350 @@ class TestBaseCli(object):
         # validate telemetry data was NOT sent
         assert not mock_request.called
 
+    def test_cli_invalid_query(self):
+        """ Test CLI rejects an invalid query
+
+        Given
+        - CLI is installed
+
+        When
+        - User provides an invalid --query expression
+
+        Then
+        - CLI should exit with a usage error
+        """
+
+        result = self.runner.invoke(basecli, ['--query', 'foo[', 'config', 'list-defaults'])
+
+        assert result.exit_code == 2
+        assert "Invalid value for '--query'" in result.output
+
+    def test_cli_query_compiled_once(self, mocker):
+        """ Test CLI compiles the query once
+
+        Given
+        - CLI is installed
+
+        When
+        - User provides a valid --query expression
+
+        Then
+        - The query is compiled once and applied to the output
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+        mock_compile = mocker.patch('f5cli.cli.jmespath.compile', wraps=jmespath.compile)
+
+        result = self.runner.invoke(basecli, ['--query', 'output', 'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        assert result.output == '"json-compact"\n'
+        assert mock_compile.call_count == 1
+
+    def test_cli_profile(self, mocker):
+        """ Test CLI profiles the command
+
+        Given
+        - CLI is installed
+
+        When
+        - User provides --profile without a path
+
+        Then
+        - The command output is followed by the profile summary
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+
+        result = self.runner.invoke(basecli, ['--profile', 'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        output, summary = result.output.splitlines()
+        assert json.loads(output)['output'] == 'json-compact'
+        assert sorted(json.loads(summary)[0]) == ['calls', 'cumtime', 'function', 'tottime']
+
+    def test_cli_profile_with_query(self, mocker):
+        """ Test CLI profiles the command, the query only applying to the command output
+
+        Given
+        - CLI is installed
+
+        When
+        - User provides --profile and a --query matching nothing in the profile summary
+
+        Then
+        - The command output is projected, the profile summary is not
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+
+        result = self.runner.invoke(basecli, ['--profile', '--query', 'output',
+                                              'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        output, summary = result.output.splitlines()
+        assert json.loads(output) == 'json-compact'
+        assert sorted(json.loads(summary)[0]) == ['calls', 'cumtime', 'function', 'tottime']
+
+    def test_cli_profile_env_var(self, mocker, tmp_path):
+        """ Test CLI profiles the command using the environment variable
+
+        Given
+        - CLI is installed
+        - The F5_CLI_PROFILE environment variable is set to a path
+
+        When
+        - User executes a command
+
+        Then
+        - The pstats data is written to the path
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+        path = str(tmp_path / 'f5.pstats')
+
+        result = self.runner.invoke(basecli, ['config', 'list-defaults'],
+                                    env={ENV_VARS['PROFILE']: path})
+
+        assert result.exit_code == 0, result.output
+        assert 'Profile data written to %s' % path in result.output
+        assert pstats.Stats(path).total_calls > 0
+
+    @pytest.mark.parametrize('value', ['false', '0', 'No'])
+    def test_cli_profile_env_var_disabled(self, mocker, value):
+        """ Test CLI does not profile the command when the environment variable is false
+
+        Given
+        - CLI is installed
+        - The F5_CLI_PROFILE environment variable is set to a false value
+
+        When
+        - User executes a command
+
+        Then
+        - The command is not profiled, and no pstats data is written
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+        mock_profiler = mocker.patch('f5cli.cli.CommandProfiler')
+
+        result = self.runner.invoke(basecli, ['config', 'list-defaults'],
+                                    env={ENV_VARS['PROFILE']: value})
+
+        assert result.exit_code == 0, result.output
+        assert len(result.output.splitlines()) == 1
+        mock_profiler.assert_not_called()
+
+    def test_cli_memprofile(self, mocker):
+        """ Test CLI traces the memory allocations of the command
+
+        Given
+        - CLI is installed
+        - The command output is large
+
+        When
+        - User provides --memprofile
+
+        Then
+        - The command output is followed by the allocation sites and the peak traced memory
+        - The allocation sites are snapshot while the output is held in memory
+        """
+
+        def _list():
+            return {'output': 'json-compact', 'firstRunComplete': True,
+                    'large': ['x' * 100 for _ in range(10000)]}
+
+        mocker.patch('f5cli.config.core.ConfigurationClient.list', side_effect=_list)
+
+        result = self.runner.invoke(basecli, ['--memprofile', 'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        _, summary, peak = result.output.splitlines()
+        summary = json.loads(summary)
+        assert sorted(summary[0]) == ['count', 'site', 'size_kib']
+        assert summary[0]['size_kib'] > 1000
+        assert json.loads(peak)['message'].startswith('Peak traced memory: ')
+
+    def test_cli_memprofile_with_query(self, mocker):
+        """ Test CLI traces the memory allocations, the query only applying to the command output
+
+        Given
+        - CLI is installed
+
+        When
+        - User provides --memprofile and a --query matching nothing in the memory report
+
+        Then
+        - The command output is projected, the allocation sites and peak are not
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+
+        result = self.runner.invoke(basecli, ['--memprofile', '--query', 'output',
+                                              'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        output, summary, peak = result.output.splitlines()
+        assert json.loads(output) == 'json-compact'
+        assert sorted(json.loads(summary)[0]) == ['count', 'site', 'size_kib']
+        assert json.loads(peak)['message'].startswith('Peak traced memory: ')
+
+    def test_cli_timings(self, mocker):
+        """ Test CLI reports the phase timings as JSON
+
+        Given
+        - CLI is installed
+
+        When
+        - User provides --timings=json
+
+        Then
+        - The command output is followed by the timed phases, starting with the total
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+
+        result = self.runner.invoke(basecli, ['--timings=json', 'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        output, phases = result.output.split('\n', 1)
+        assert json.loads(output)['output'] == 'json-compact'
+        phases = json.loads(phases)
+        assert phases[0]['phase'] == 'total'
+        assert phases[0]['depth'] == 0
+        assert 'format_output' in [phase['phase'] for phase in phases]
+        assert all(phase['duration_ms'] <= phases[0]['duration_ms'] for phase in phases)
+
+    def test_cli_trace_export(self, mocker, tmp_path):
+        """ Test CLI exports a trace of the command
+
+        Given
+        - CLI is installed
+
+        When
+        - User provides --trace-export with a file
+
+        Then
+        - A trace with a root span named after the command is appended to the file
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+        path = str(tmp_path / 'traces.jsonl')
+
+        result = self.runner.invoke(basecli, ['--trace-export', path, 'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        with open(path) as file:
+            spans = json.load(file)['resourceSpans'][0]['scopeSpans'][0]['spans']
+        assert spans[0]['name'] == 'f5 config list-defaults'
+        assert 'format_output' in [span['name'] for span in spans]
+
+    def test_cli_metrics_file(self, mocker, tmp_path):
+        """ Test CLI writes the metrics of the command
+
+        Given
+        - CLI is installed
+
+        When
+        - User provides --metrics-file
+
+        Then
+        - The metrics are written to the file in the Prometheus text format
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+        path = tmp_path / 'f5.prom'
+
+        result = self.runner.invoke(basecli, ['--metrics-file', str(path),
+                                              'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        assert '# TYPE f5cli_last_write_timestamp_seconds gauge' in path.read_text()
+
+    def test_cli_timings_table(self, mocker):
+        """ Test CLI reports the phase timings as a table by default
+
+        Given
+        - CLI is installed
+
+        When
+        - User provides --timings without a format
+
+        Then
+        - The phase timings table follows the command output
+        """
+
+        mocker.patch(
+            'f5cli.config.core.ConfigurationClient.list',
+            return_value={'output': 'json-compact', 'firstRunComplete': True}
+        )
+
+        result = self.runner.invoke(basecli, ['--timings', 'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        assert 'duration_ms' in result.output
+        assert '  format_output' in result.output
+
+    def test_cli_http_stats(self, mocker):
+        """ Test CLI reports the HTTP requests made by the command
+
+        Given
+        - CLI is installed
+        - The command makes an HTTP request
+
+        When
+        - User provides --http-stats=json
+
+        Then
+        - The command output is followed by the requests per endpoint and the totals
+        """
+
+        def _list():
+            requests.get('https://192.0.2.1/mgmt/tm/sys/version')
+            return {'output': 'json-compact', 'firstRunComplete': True}
+
+        mock_list = mocker.patch('f5cli.config.core.ConfigurationClient.list', side_effect=_list)
+        response = requests.models.Response()
+        response.status_code = 200
+        response._content = b'{}'  # pylint: disable=protected-access
+        mocker.patch('requests.adapters.HTTPAdapter.send', return_value=response)
+
+        result = self.runner.invoke(basecli, ['--http-stats=json', 'config', 'list-defaults'])
+
+        assert result.exit_code == 0, result.output
+        stats = json.loads(result.output.split('\n', 1)[1])
+        assert [(row['method'], row['path'], row['count']) for row in stats] == [
+            ('GET', '/mgmt/tm/sys/version', mock_list.call_count),
+            ('*', '*', mock_list.call_count)
+        ]
+
     def disabled_test_cli_does_not_send_telemetry_on_disable_telemetry_command(self, mocker):
         """ Test CLI does not send telemetry on command to disable telemetry
 
@@ -240,10 +587,10 @@ class TestBaseCli(object):
 
 class TestContext(object):
     """ Test Class: Context"""
-    @classmethod
-    def setup_class(cls):
+    def setup_method(self):
         """ Setup func """
-        cls.context = f5cli.cli.Context()
+        # output format is resolved once per context, use a new context per test
+        self.context = f5cli.cli.Context()
 
     @classmethod
     def teardown_class(cls):
@@ -267,7 +614,7 @@ class TestContext(object):
         return mocker.patch("f5cli.cli.click.echo")
 
     @staticmethod
-    def format_output_side_effect(data):
+    def format_output_side_effect(data, **kwargs):  # pylint: disable=unused-argument
         """ Format output side effect """
         return data
 
@@ -357,6 +704,56 @@ class TestContext(object):
 
         mock_click_echo.assert_called_once_with('Test message', file=sys.stderr)
 
+    def test_log_message_ndjson_streams_records(self, mocker):
+        """ Log a list using NDJSON output format
+        Given
+        - Environment variable of output format NDJSON exists
+
+        When
+        - User attempts to log a list of records
+
+        Then
+        - Each record is logged on its own line
+        """
+
+        mocker.patch.dict(
+            "os.environ",
+            {
+                ENV_VARS['OUTPUT_FORMAT']: FORMATS['NDJSON']
+            }
+        )
+        mock_click_echo = mocker.patch("f5cli.cli.click.echo")
+
+        self.context.log([{'id': 1}, {'id': 2}])
+
+        assert mock_click_echo.call_args_list == [
+            call('{"id":1}', file=sys.stderr),
+            call('{"id":2}', file=sys.stderr)
+        ]
+
+    def test_log_resolves_output_format_once(self, mocker):
+        """ Log many messages
+        Given
+        - No output format has been resolved for the context
+
+        When
+        - User attempts to log several messages
+
+        Then
+        - Output format is resolved only once
+        - Each message is logged using the resolved format
+        """
+
+        mock_get_output_format = mocker.patch(
+            "f5cli.cli.get_output_format", return_value=FORMATS['JSON_COMPACT'])
+        mock_click_echo = mocker.patch("f5cli.cli.click.echo")
+
+        for _ in range(3):
+            self.context.log("Test message")
+
+        assert mock_get_output_format.call_count == 1
+        mock_click_echo.assert_called_with('{"message":"Test message"}', file=sys.stderr)
+
     def test_vlog_message(self, click_echo_fixture):
         """ Vlog a message
         Given
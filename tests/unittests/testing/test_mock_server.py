@@ -0,0 +1,158 @@
+"""Test: testing.mock_server """
+
+import time
+
+import requests
+from f5sdk.bigip import ManagementClient
+from f5sdk.bigip.extension import AS3Client, DOClient
+from f5sdk.exceptions import HTTPError, InvalidAuthError
+
+from f5cli.testing import MockServer
+
+from ...global_test_imports import pytest
+
+AS3_DECLARATION = {
+    'class': 'AS3',
+    'declaration': {'class': 'ADC', 'tenant_1': {'class': 'Tenant'}}
+}
+
+
+@pytest.fixture
+def server_fixture():
+    """Test fixture """
+    with MockServer() as server:
+        yield server
+
+
+def _get_mgmt_client(server, **kwargs):
+    return ManagementClient(server.host, port=server.port, user='admin',
+                            password=kwargs.pop('password', 'admin'))
+
+
+# pylint: disable=redefined-outer-name
+def test_bigip_declarations(server_fixture):
+    """ Manage declarations of installed components
+    Given
+    - The server is running, with every component installed
+
+    When
+    - The device version is shown, an AS3 declaration is created, synchronously, and a DO
+      declaration asynchronously
+
+    Then
+    - The declarations are applied and shown
+    """
+
+    client = _get_mgmt_client(server_fixture)
+    as3_client = AS3Client(client)
+
+    assert client.get_info() == {'version': '14.1.2.3'}
+
+    assert as3_client.package.is_installed()['installed_version'] == '3.18.0'
+    assert as3_client.service.show() is None
+    assert as3_client.service.create(config=AS3_DECLARATION)['results'][0]['tenant'] == 'tenant_1'
+    assert as3_client.service.show() == AS3_DECLARATION['declaration']
+    assert DOClient(client).service.create(config={'class': 'DO'})['declaration'] == {
+        'class': 'DO'}
+    assert ('GET', '/mgmt/shared/declarative-onboarding/task/{id}') in [
+        (method, path.rsplit('/', 1)[0] + '/{id}') for method, path, _ in
+        server_fixture.request_log]
+
+
+# pylint: disable=redefined-outer-name
+def test_bigip_package_install(server_fixture, tmp_path):
+    """ Install and uninstall a package
+    Given
+    - The server is running
+
+    When
+    - The AS3 package is uninstalled, then another version is uploaded and installed
+
+    Then
+    - The installed version changes, and the service is only available while installed
+    """
+
+    package = tmp_path / 'f5-appsvcs-3.19.0-1.noarch.rpm'
+    package.write_bytes(b'\0' * (1024 * 1024 + 1))
+    as3_client = AS3Client(_get_mgmt_client(server_fixture))
+
+    as3_client.package.uninstall()
+    assert not as3_client.package.is_installed()['installed']
+    with pytest.raises(HTTPError):
+        as3_client.service.show_info()
+    as3_client.package.install(package_url='file://%s' % package)
+    assert as3_client.package.is_installed()['installed_version'] == '3.19.0'
+    assert as3_client.service.show_info()['version'] == '3.19.0'
+
+
+# pylint: disable=redefined-outer-name
+def test_bigip_authentication(server_fixture):
+    """ Reject invalid credentials and requests without a token
+    Given
+    - The server is running
+
+    When
+    - A client logs in with an invalid password, and a request is made without a token
+
+    Then
+    - Both are rejected
+    """
+
+    with pytest.raises(InvalidAuthError):
+        _get_mgmt_client(server_fixture, password='invalid')
+    response = requests.get('https://%s:%s/mgmt/shared/appsvcs/declare' % (
+        server_fixture.host, server_fixture.port), verify=False)
+    assert response.status_code == 401
+
+
+# pylint: disable=redefined-outer-name
+def test_cloud_services(server_fixture):
+    """ Log in to Cloud Services and list subscriptions, one page at a time
+    Given
+    - The server is running, with two subscriptions
+
+    When
+    - A user logs in and lists the subscriptions of the primary account
+
+    Then
+    - Each page contains the requested subscriptions
+    """
+
+    url = 'https://%s:%s' % (server_fixture.host, server_fixture.port)
+    token = requests.post(url + '/v1/svc-auth/login', verify=False, json={
+        'username': 'admin', 'password': 'admin'}).json()['access_token']
+    headers = {'Authorization': 'Bearer %s' % token}
+    user = requests.get(url + '/v1/svc-account/user', headers=headers, verify=False).json()
+
+    pages = [requests.get(url + '/v1/svc-subscription/subscriptions', headers=headers,
+                          verify=False, params={
+                              'account_id': user['primary_account_id'],
+                              'limit': 1,
+                              'offset': offset
+                          }).json()['subscriptions'] for offset in range(3)]
+
+    assert [len(page) for page in pages] == [1, 1, 0]
+    assert pages[0][0]['account_id'] == user['primary_account_id']
+
+
+def test_latency_and_failures():
+    """ Delay responses and fail requests
+    Given
+    - The server has latency and fails every request
+
+    When
+    - A request is made
+
+    Then
+    - The response is delayed and has the configured status code
+    """
+
+    with MockServer(latency=0.05, jitter=0.01, error_rate=1, error_status=500) as server:
+        start = time.monotonic()
+        response = requests.post('https://%s:%s/mgmt/shared/authn/login' % (
+            server.host, server.port), verify=False)
+        elapsed = time.monotonic() - start
+
+    assert response.status_code == 500
+    assert elapsed >= 0.04
+    assert server.request_log == [('POST', '/mgmt/shared/authn/login', 500)]
@@ -4,6 +4,7 @@ import os
 import sys
 import json
 import click
+import jmespath
 
 from f5cli.constants import FORMATS, ENV_VARS
 from f5cli.utils import core as core_utils
@@ -94,6 +95,50 @@ def test_format_output_as_json(mocker):
     assert core_utils.format_output(data) == expected_result
 
 
+def test_format_output_as_json_compact():
+    """ Format output using compact JSON format
+    Given
+    - data as list of dictionary
+
+    When
+    - data is requested as json-compact format
+
+    Then
+    - data is returned as JSON without whitespace, keys in original order
+    """
+
+    data = [
+        {
+            'foo': 'bar',
+            'baz': 'qux'
+        }
+    ]
+
+    assert core_utils.format_output(
+        data, output_format=FORMATS['JSON_COMPACT']) == '[{"foo":"bar","baz":"qux"}]'
+
+
+def test_get_output_format_from_loaded_config(mocker):
+    """ Get output format from already loaded configuration
+    Given
+    - Environment variable of output format does not exist
+    - Configuration has been loaded
+
+    When
+    - Output format is requested
+
+    Then
+    - Output format from the configuration is returned, without reading the file
+    """
+
+    mocker.patch.dict("os.environ", {}, clear=True)
+    mock_open = mocker.patch('f5cli.config.core.open')
+
+    assert core_utils.get_output_format({'output': 'table'}) == FORMATS['TABLE']
+    assert core_utils.get_output_format({}) == FORMATS['DEFAULT']
+    assert not mock_open.called
+
+
 def test_format_output_as_table(mocker):
     """ Format output using table format
     Given
@@ -111,7 +156,7 @@ def test_format_output_as_table(mocker):
     - data is requested as table format
 
     Then
-    - data is returned in table format
+    - data is returned in table format, sized to the widest row
     """
 
     mocker.patch.dict(
@@ -131,9 +176,9 @@ def test_format_output_as_table(mocker):
     ]
 
     expected_result = (
-        "my_key        \t\t\n"
-        "--------------\t\t\n"
-        "my_first_value\t\t\n"
+        "my_key         \t\t\n"
+        "---------------\t\t\n"
+        "my_first_value \t\t\n"
         "my_second_value\t\t"
     )
     assert core_utils.format_output(data) == expected_result
@@ -173,6 +218,215 @@ def test_format_output_as_table_dict(mocker):
     assert core_utils.format_output(data) == expected_result
 
 
+def test_format_output_as_table_all_keys(mocker):
+    """ Format output using table format, rows with differing keys
+    Given
+    - data as list of dictionary, keys differ between rows
+    - values include non-string scalars and nested objects
+
+    When
+    - data is requested as table format
+
+    Then
+    - all scalar valued keys are included as columns
+    - missing values are left empty
+    """
+
+    mocker.patch.dict(
+        "os.environ",
+        {
+            ENV_VARS['OUTPUT_FORMAT']: FORMATS['TABLE']
+        }
+    )
+
+    data = [
+        {'id': 'a', 'nested': {'foo': 'bar'}},
+        {'id': 'b', 'port': 443, 'enabled': True}
+    ]
+
+    expected_result = (
+        "enabled\t\tid\t\tport\t\t\n"
+        "-------\t\t--\t\t----\t\t\n"
+        "       \t\ta \t\t    \t\t\n"
+        "true   \t\tb \t\t443 \t\t"
+    )
+    assert core_utils.format_output(data) == expected_result
+
+
+def test_format_output_as_table_columns_truncated(mocker):
+    """ Format output using table format, with column projection and truncation
+    Given
+    - data as list of dictionary
+
+    When
+    - data is requested as table format with columns and a maximum column width
+
+    Then
+    - only the requested columns are included, in the requested order
+    - cells longer than the maximum width are truncated
+    """
+
+    mocker.patch.dict(
+        "os.environ",
+        {
+            ENV_VARS['OUTPUT_FORMAT']: FORMATS['TABLE']
+        }
+    )
+
+    data = [
+        {'id': '624d58f0-6875-469a-ba12-d0f1390f7464', 'name': 'f5vm', 'location': 'westus'}
+    ]
+
+    expected_result = (
+        "name\t\tid        \t\t\n"
+        "----\t\t----------\t\t\n"
+        "f5vm\t\t624d58f...\t\t"
+    )
+    assert core_utils.format_output(
+        data, columns=['name', 'id'], max_column_width=10) == expected_result
+
+
+def test_format_output_as_ndjson(mocker):
+    """ Format output using NDJSON format
+    Given
+    - data as list of dictionary
+
+    When
+    - data is requested as ndjson format
+
+    Then
+    - data is returned as one compact JSON record per line
+    """
+
+    mocker.patch.dict(
+        "os.environ",
+        {
+            ENV_VARS['OUTPUT_FORMAT']: FORMATS['NDJSON']
+        }
+    )
+
+    data = [
+        {
+            'foo': 'bar',
+            'baz': [1, 2]
+        },
+        {
+            'foo': 'baz'
+        }
+    ]
+
+    expected_result = (
+        '{"foo":"bar","baz":[1,2]}\n'
+        '{"foo":"baz"}'
+    )
+    assert core_utils.format_output(data) == expected_result
+
+
+def test_format_output_records_generator():
+    """ Format a generator as NDJSON records
+    Given
+    - data as a generator of dictionaries
+
+    When
+    - data is requested as NDJSON records
+
+    Then
+    - a record is produced per item, as each item is consumed
+    """
+
+    consumed = []
+
+    def items():
+        for idx in range(3):
+            consumed.append(idx)
+            yield {'id': idx}
+
+    records = core_utils.format_output_records(items())
+    assert next(records) == '{"id":0}'
+    assert consumed == [0]
+    assert list(records) == ['{"id":1}', '{"id":2}']
+
+
+def test_format_output_with_query_dict():
+    """ Format output with a query
+    Given
+    - data as dictionary
+
+    When
+    - data is requested with a query
+
+    Then
+    - only the projected data is returned
+    """
+
+    data = {
+        'subscriptions': [
+            {'subscription_id': 's-1', 'configuration': {'details': 'large'}},
+            {'subscription_id': 's-2', 'configuration': {'details': 'large'}}
+        ]
+    }
+
+    result = core_utils.format_output(
+        data,
+        output_format=FORMATS['JSON_COMPACT'],
+        query=jmespath.compile('subscriptions[*].subscription_id')
+    )
+    assert result == '["s-1","s-2"]'
+
+
+def test_format_output_table_with_query_scalar_or_none():
+    """ Format output as a table with a query resulting in a scalar, or nothing
+    Given
+    - data as dictionary
+
+    When
+    - data is requested as a table with a query matching a string
+    - data is requested as a table with a query matching nothing
+
+    Then
+    - the string is a single value
+    - an empty table is returned
+    """
+
+    data = {'name': 'bigip_1'}
+
+    result = core_utils.format_output(
+        data, output_format=FORMATS['TABLE'], query=jmespath.compile('name'))
+    assert result.split() == ['value', '-------', 'bigip_1']
+    assert core_utils.format_output(
+        data, output_format=FORMATS['TABLE'], query=jmespath.compile('missing')) == ''
+
+
+def test_format_output_records_with_query_per_item():
+    """ Format NDJSON records with a query
+    Given
+    - data as a generator of dictionaries, one without the queried field
+
+    When
+    - data is requested as NDJSON records with a query
+
+    Then
+    - the query is applied to each item
+    - items without a result are dropped
+    """
+
+    def items():
+        yield {'id': 1, 'name': 'foo', 'big': ['x'] * 10}
+        yield {'id': 2, 'big': ['x'] * 10}
+        yield {'id': 3, 'name': 'bar', 'big': ['x'] * 10}
+
+    records = core_utils.format_output_records(
+        items(), query=jmespath.compile('{id: id, name: name}'))
+    assert list(records) == [
+        '{"id":1,"name":"foo"}',
+        '{"id":2,"name":null}',
+        '{"id":3,"name":"bar"}'
+    ]
+
+    records = core_utils.format_output_records(items(), query=jmespath.compile('name'))
+    assert list(records) == ['"foo"', '"bar"']
+
+
 def test_invalid_format_output(mocker):
     """ Invalid format output environment variable value
     Given
@@ -0,0 +1,156 @@
+"""Test: utils.device_queue """
+
+import os
+import stat
+
+from f5sdk.exceptions import HTTPError
+
+from f5cli.utils import device_queue
+from f5cli.utils.device_queue import DeviceLock, file_lock, retry_on_busy
+
+from ...global_test_imports import pytest, Mock
+
+
+@pytest.fixture
+def lock_dir_fixture(mocker, tmp_path):
+    """Test fixture """
+    mocker.patch('f5cli.constants.F5_CLI_LOCK_DIR', str(tmp_path))
+    return tmp_path
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_device_lock_serializes_same_host(lock_dir_fixture):
+    """ Lock the same device twice
+    Given
+    - A lock is held for a device
+
+    When
+    - Another lock for the same device is requested
+
+    Then
+    - 'TimeoutError' error is raised once the queue timeout expires
+    """
+
+    with DeviceLock('192.0.2.10', timeout=0):
+        with pytest.raises(TimeoutError) as error:
+            DeviceLock('192.0.2.10', timeout=0).acquire()
+    assert 'waiting for another operation against 192.0.2.10' in str(error.value)
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_file_lock_serializes_same_name(lock_dir_fixture):
+    """ Lock the same name twice, then again once released
+    Given
+    - A file lock is held for a name
+
+    When
+    - Another lock for the same name is requested, then once the first is released
+
+    Then
+    - 'TimeoutError' error is raised while the lock is held, naming the lock
+    - The lock is acquired once released
+    """
+
+    with file_lock('inventory-/tmp/inventory.json', timeout=0):
+        with pytest.raises(TimeoutError) as error:
+            with file_lock('inventory-/tmp/inventory.json', timeout=0):
+                pass
+    with file_lock('inventory-/tmp/inventory.json', timeout=0):
+        pass
+    assert 'waiting for the lock on inventory-/tmp/inventory.json' in str(error.value)
+
+
+# pylint: disable=redefined-outer-name,unused-argument
+def test_device_lock_other_host_and_disabled(lock_dir_fixture):
+    """ Lock different devices, and a disabled (read) lock
+    Given
+    - A lock is held for a device
+
+    When
+    - A lock for a different device is requested
+    - A disabled lock for the same device is requested
+
+    Then
+    - Both locks are acquired without waiting
+    """
+
+    with DeviceLock('192.0.2.10', timeout=0):
+        with DeviceLock('192.0.2.11', timeout=0):
+            pass
+        with DeviceLock('192.0.2.10', timeout=0, enabled=False) as lock:
+            assert lock.deadline is not None
+
+
+def test_device_lock_private_files(mocker, tmp_path):
+    """ Lock a device in a new lock directory, and through a symlink
+    Given
+    - The lock directory does not exist
+
+    When
+    - A lock is requested
+    - A lock is requested once its lock file was replaced by a symlink
+
+    Then
+    - The directory and lock file are private to the user
+    - The symlink is not followed
+    """
+
+    lock_dir = tmp_path / 'locks'
+    lock_file = lock_dir / '192.0.2.10.lock'
+    mocker.patch('f5cli.constants.F5_CLI_LOCK_DIR', str(lock_dir))
+
+    with DeviceLock('192.0.2.10', timeout=0):
+        pass
+    assert stat.S_IMODE(os.stat(str(lock_dir)).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(str(lock_file)).st_mode) == 0o600
+
+    target = tmp_path / 'target'
+    target.write_text('')
+    lock_file.unlink()
+    lock_file.symlink_to(target)
+    with pytest.raises(OSError):
+        DeviceLock('192.0.2.10', timeout=0).acquire()
+
+
+def test_retry_on_busy(mocker):
+    """ Retry while the device is busy
+    Given
+    - The device responds with 503 twice, then succeeds
+
+    When
+    - The function is called using retry_on_busy
+
+    Then
+    - The successful response is returned after backing off twice
+    """
+
+    mock_sleep = mocker.patch('f5cli.utils.device_queue.time.sleep')
+    func = Mock(side_effect=[
+        HTTPError('Bad request for URL: x code: 503 reason: busy'),
+        HTTPError('Bad request for URL: x code: 503 reason: busy'),
+        {'foo': 'bar'}
+    ])
+
+    assert retry_on_busy(func, 'decl.json') == {'foo': 'bar'}
+    assert func.call_count == 3
+    assert mock_sleep.call_count == 2
+    assert mock_sleep.call_args_list[1][0][0] <= device_queue.BUSY_BACKOFF['BASE_IN_SECS'] * 2
+
+
+def test_retry_on_busy_other_error(mocker):
+    """ Do not retry other errors
+    Given
+    - The device responds with 400
+
+    When
+    - The function is called using retry_on_busy
+
+    Then
+    - The error is raised without retrying
+    """
+
+    func = Mock(side_effect=HTTPError('Bad request for URL: x code: 400 reason: bad'))
+
+    with pytest.raises(HTTPError):
+        retry_on_busy(func)
+    assert func.call_count == 1
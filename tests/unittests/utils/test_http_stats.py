@@ -0,0 +1,95 @@
+"""Test: utils.http_stats """
+
+import requests
+
+from f5cli.utils import http_stats
+
+from ...global_test_imports import pytest
+
+
+def _response(content=b'{}'):
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = content  # pylint: disable=protected-access
+    return response
+
+
+@pytest.fixture
+def adapter_send_fixture(mocker):
+    """ Respond to every request without a connection """
+
+    yield mocker.patch('requests.adapters.HTTPAdapter.send',
+                       side_effect=lambda request, **kwargs: _response(b'{"id": 1}'))
+    http_stats.disable()
+
+
+@pytest.mark.usefixtures("adapter_send_fixture")
+def test_requests_are_recorded_per_endpoint():
+    """ Record requests, grouped by method and path template
+    Given
+    - HTTP statistics are enabled
+
+    When
+    - Requests are made to the same endpoint with different IDs, and to another endpoint
+
+    Then
+    - The requests are counted per endpoint, most requested first, followed by the totals
+    """
+
+    http_stats.enable()
+    for task_id in ['0b1c1a2e-1b2c-4d5e-8f90-123456789abc', '1b1c1a2e-1b2c-4d5e-8f90-123456789abc']:
+        requests.get('https://192.0.2.1/mgmt/shared/appsvcs/task/%s' % task_id)
+    requests.post('https://192.0.2.1/mgmt/shared/appsvcs/declare', data='{"class": "AS3"}')
+    rows = http_stats.get_http_stats(http_stats.disable())
+
+    assert [(row['method'], row['path'], row['count']) for row in rows] == [
+        ('GET', '/mgmt/shared/appsvcs/task/{id}', 2),
+        ('POST', '/mgmt/shared/appsvcs/declare', 1),
+        ('*', '*', 3)
+    ]
+    assert rows[1]['sent_bytes'] == 16
+    assert rows[2]['received_bytes'] == 27
+    assert rows[0]['p50_ms'] <= rows[0]['p95_ms'] <= rows[0]['max_ms']
+
+
+@pytest.mark.usefixtures("adapter_send_fixture")
+def test_requests_are_not_recorded_when_disabled():
+    """ Record nothing while statistics are disabled
+    Given
+    - HTTP statistics were enabled, then disabled
+
+    When
+    - A request is made
+
+    Then
+    - The original send is restored and nothing is recorded
+    """
+
+    send = requests.Session.send
+    http_stats.enable()
+    http_stats.disable()
+    requests.get('https://192.0.2.1/mgmt/tm/sys/version')
+
+    assert requests.Session.send is send
+    assert http_stats.get_http_stats(http_stats.disable()) == []
+
+
+def test_get_path_template():
+    """ Replace variable path segments
+    Given
+    - Paths with numeric, UUID, Cloud Services IDs and package file names
+
+    When
+    - The path template is requested
+
+    Then
+    - Only the variable segments are replaced
+    """
+
+    assert http_stats.get_path_template(
+        '/v1/svc-subscription/subscriptions/s-aaFJp4ZzQM'
+    ) == '/v1/svc-subscription/subscriptions/{id}'
+    assert http_stats.get_path_template(
+        '/mgmt/shared/file-transfer/uploads/f5-appsvcs-3.18.0-4.noarch.rpm'
+    ) == '/mgmt/shared/file-transfer/uploads/{id}'
+    assert http_stats.get_path_template('/v1/svc-auth/login') == '/v1/svc-auth/login'
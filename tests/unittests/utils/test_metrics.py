@@ -0,0 +1,128 @@
+"""Test: utils.metrics """
+
+import time
+
+import requests
+
+from f5cli.utils import metrics
+from f5cli.utils.metrics import MetricsRecorder, format_samples, read_samples
+
+OPERATION_LABELS = (('component', 'as3'), ('action', 'create'))
+
+
+def _create(path, failed=False):
+    with MetricsRecorder(path, interval=0) as recorder:
+        try:
+            with metrics.operation('as3', 'create'):
+                if failed:
+                    raise Exception('Declaration is invalid')
+        except Exception:  # pylint: disable=broad-except
+            pass
+    recorder.flush()
+
+
+def test_operations_are_merged_across_runs(tmp_path):
+    """ Merge the operations of each run into the textfile
+    Given
+    - A textfile written by a previous run
+
+    When
+    - Another run records a successful and a failed operation
+
+    Then
+    - The counters and histograms include the operations of both runs
+    """
+
+    path = str(tmp_path / 'f5.prom')
+    _create(path)
+    _create(path)
+    _create(path, failed=True)
+    samples = read_samples(path)
+
+    assert samples[('f5cli_operations_total', OPERATION_LABELS + (('status', 'success'),))] == 2
+    assert samples[('f5cli_operations_total', OPERATION_LABELS + (('status', 'failure'),))] == 1
+    assert samples[('f5cli_operation_duration_seconds_count', OPERATION_LABELS)] == 3
+    assert samples[('f5cli_operation_duration_seconds_bucket',
+                    OPERATION_LABELS + (('le', '0.1'),))] == 3
+    assert samples[('f5cli_operation_duration_seconds_bucket',
+                    OPERATION_LABELS + (('le', '+Inf'),))] == 3
+    assert samples[('f5cli_last_write_timestamp_seconds', ())] <= time.time()
+    with open(path) as file:
+        text = file.read()
+    assert '# TYPE f5cli_operation_duration_seconds histogram\n' in text
+    assert not [name for name in tmp_path.iterdir() if name.suffix == '.tmp']
+
+
+def test_http_requests_are_counted(mocker, tmp_path):
+    """ Count HTTP requests and bytes transferred
+    Given
+    - Metrics are being recorded
+
+    When
+    - A request is made
+
+    Then
+    - The request and the bytes sent and received are counted
+    """
+
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = b'{"id": 1}'  # pylint: disable=protected-access
+    mocker.patch('requests.adapters.HTTPAdapter.send', return_value=response)
+    path = str(tmp_path / 'f5.prom')
+
+    with MetricsRecorder(path, interval=0) as recorder:
+        requests.post('https://192.0.2.1/mgmt/shared/appsvcs/declare', data='{"class": "AS3"}')
+    recorder.flush()
+    samples = read_samples(path)
+
+    assert samples[('f5cli_http_requests_total', (('method', 'POST'),))] == 1
+    assert samples[('f5cli_http_sent_bytes_total', ())] == 16
+    assert samples[('f5cli_http_received_bytes_total', ())] == 9
+
+
+def test_metrics_are_written_periodically(tmp_path):
+    """ Write the metrics periodically in a long running invocation
+    Given
+    - Metrics are being recorded with a short interval
+
+    When
+    - An operation completes and the interval elapses
+
+    Then
+    - The operation is written before the invocation ends
+    """
+
+    path = str(tmp_path / 'f5.prom')
+
+    with MetricsRecorder(path, interval=0.01):
+        with metrics.operation('as3', 'show'):
+            pass
+        for _ in range(100):
+            if read_samples(path):
+                break
+            time.sleep(0.01)
+        samples = read_samples(path)
+
+    assert samples[('f5cli_operations_total', (('component', 'as3'), ('action', 'show'),
+                                               ('status', 'success')))] == 1
+
+
+def test_label_values_are_escaped(tmp_path):
+    """ Escape label values
+    Given
+    - A sample with quotes and backslashes in a label value
+
+    When
+    - The sample is written and read back
+
+    Then
+    - The label value is unchanged
+    """
+
+    path = tmp_path / 'f5.prom'
+    key = ('f5cli_operations_total', (('component', 'a"b\\n'), ('action', 'show'),
+                                      ('status', 'success')))
+    path.write_text(format_samples({key: 1.0}))
+
+    assert read_samples(str(path)) == {key: 1.0}
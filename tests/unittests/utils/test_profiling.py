@@ -0,0 +1,34 @@
+"""Test: utils.profiling """
+
+from f5cli.utils import profiling
+from f5cli.utils.profiling import MemoryProfiler, memory_checkpoint
+
+MIB = 1024 * 1024
+
+
+def test_memory_checkpoints_are_throttled(mocker):
+    """ Checkpoint the traced memory of many log calls
+    Given
+    - Memory is traced, and grows a little with each log call
+
+    When
+    - A checkpoint is requested per log call, and the profiler exits
+
+    Then
+    - A snapshot is only taken once memory grew significantly, and at exit
+    """
+
+    # per checkpoint, then at exit: the checkpoint and the peak
+    traced = [(size * MIB, size * MIB) for size in [10, 10.5, 11, 12, 13, 14.5, 14.5]]
+    mocker.patch.object(profiling.tracemalloc, 'get_traced_memory', side_effect=traced)
+    mock_snapshot = mocker.patch.object(profiling.tracemalloc, 'take_snapshot')
+    mocker.patch.object(profiling.tracemalloc, 'start')
+    mocker.patch.object(profiling.tracemalloc, 'stop')
+
+    with MemoryProfiler() as profiler:
+        for _ in range(5):
+            memory_checkpoint()
+
+    # at 10 MiB (the first), 13 MiB (grew by a quarter) and 14.5 MiB (at exit)
+    assert mock_snapshot.call_count == 3
+    assert profiler.peak == 14.5 * MIB
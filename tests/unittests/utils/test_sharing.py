@@ -0,0 +1,64 @@
+"""Test: utils.sharing """
+
+from f5cli.utils import sharing
+from f5cli.utils.core import write_file
+
+from ...global_test_imports import Mock
+
+
+def test_clients_are_shared_once_enabled():
+    """ Create a client once per key while sharing is enabled
+    Given
+    - Sharing is enabled
+
+    When
+    - A client is requested twice for one account and once for another
+
+    Then
+    - A client is created per account, and again for every request once disabled
+    """
+
+    factory = Mock(side_effect=lambda: object())
+
+    sharing.enable()
+    try:
+        first = sharing.get_client(('bigip', '192.0.2.1'), factory)
+        second = sharing.get_client(('bigip', '192.0.2.1'), factory)
+        sharing.get_client(('bigip', '192.0.2.2'), factory)
+    finally:
+        sharing.disable()
+    sharing.get_client(('bigip', '192.0.2.1'), factory)
+
+    assert first is second
+    assert factory.call_count == 3
+    assert not sharing.is_enabled()
+
+
+def test_files_are_loaded_again_once_written(tmp_path):
+    """ Parse a file again only once it is written
+    Given
+    - Sharing is enabled
+
+    When
+    - A file is loaded twice, modified, and loaded again
+
+    Then
+    - The file is parsed before and after the write only, callers receive copies
+    """
+
+    path = str(tmp_path / 'config.yaml')
+    write_file(path, {'output': 'json'})
+    loader = Mock(side_effect=lambda: {'output': 'json'})
+
+    sharing.enable()
+    try:
+        contents = sharing.load_file(path, loader)
+        contents['output'] = 'table'
+        assert sharing.load_file(path, loader) == {'output': 'json'}
+        assert loader.call_count == 1
+        write_file(path, {'output': 'table'})
+        sharing.load_file(path, loader)
+    finally:
+        sharing.disable()
+
+    assert loader.call_count == 2
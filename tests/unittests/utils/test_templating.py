@@ -0,0 +1,138 @@
+"""Test: utils.templating """
+
+from f5cli.utils import templating
+from f5cli.utils.templating import compile_template, merge_declarations, render_rows
+
+from ...global_test_imports import pytest
+
+TEMPLATE = {
+    'class': 'ADC',
+    '${tenant}': {
+        'class': 'Tenant',
+        '${app}': {
+            'class': 'Application',
+            'virtualAddresses': ['${address}'],
+            'virtualPort': '${port:int}',
+            'remark': 'app ${app} in ${tenant}'
+        }
+    }
+}
+
+
+def _row(tenant, app, port='443'):
+    return {'tenant': tenant, 'app': app, 'address': '192.0.2.1', 'port': port}
+
+
+def test_compile_template():
+    """ Render a template, including keys and typed placeholders
+    Given
+    - A template with placeholders in keys, values and list items
+
+    When
+    - The template is compiled once and rendered for a row
+
+    Then
+    - Every placeholder is replaced, typed placeholders are converted
+    """
+
+    render = compile_template(TEMPLATE)
+
+    assert render(_row('t1', 'a1')) == {
+        'class': 'ADC',
+        't1': {
+            'class': 'Tenant',
+            'a1': {
+                'class': 'Application',
+                'virtualAddresses': ['192.0.2.1'],
+                'virtualPort': 443,
+                'remark': 'app a1 in t1'
+            }
+        }
+    }
+
+
+def test_render_rows_errors():
+    """ Render rows with a missing and an invalid variable
+    Given
+    - A row without a variable, and a row with a non integer port
+
+    When
+    - The rows are rendered
+
+    Then
+    - The error identifies the row
+    """
+
+    with pytest.raises(Exception) as error:
+        list(render_rows(TEMPLATE, [{'tenant': 't1'}]))
+    assert "Row 1: variable 'app' is not defined" in str(error.value)
+
+    with pytest.raises(Exception) as error:
+        list(render_rows(TEMPLATE, [_row('t1', 'a1'), _row('t1', 'a2', port='https')]))
+    assert 'Row 2:' in str(error.value)
+
+
+def test_render_rows_short_csv_row(tmp_path):
+    """ Render rows read from a CSV file with a short row
+    Given
+    - A CSV file, the second row missing the last two columns
+
+    When
+    - The rows are rendered
+
+    Then
+    - The error identifies the row and the missing columns
+    """
+
+    vars_file = tmp_path / 'apps.csv'
+    vars_file.write_text('tenant,app,address,port\nt1,a1,192.0.2.1,443\nt1,a2\n')
+
+    with pytest.raises(Exception) as error:
+        list(render_rows(TEMPLATE, templating.read_variables(str(vars_file))))
+    assert 'Row 2: no value for address, port' in str(error.value)
+
+
+def test_render_rows_process_pool(mocker):
+    """ Render a large input
+    Given
+    - More rows than the process pool threshold
+
+    When
+    - The rows are rendered using worker processes
+
+    Then
+    - A declaration is rendered per row, in row order
+    """
+
+    mocker.patch.object(templating, 'PROCESS_POOL_THRESHOLD', 4)
+    mocker.patch.object(templating, 'RENDER_CHUNK_SIZE', 3)
+    rows = (_row('t%d' % (i % 2), 'a%d' % i) for i in range(10))
+
+    rendered = list(render_rows(TEMPLATE, rows, parallel=2))
+
+    assert [list(item['t%d' % (i % 2)])[1] for i, item in enumerate(rendered)] \
+        == ['a%d' % i for i in range(10)]
+
+
+def test_merge_declarations():
+    """ Merge rendered declarations
+    Given
+    - Declarations sharing a tenant, and declarations with conflicting values
+
+    When
+    - The declarations are merged
+
+    Then
+    - Applications of the shared tenant are merged
+    - Conflicting values raise an error
+    """
+
+    render = compile_template(TEMPLATE)
+    merged = merge_declarations(render(row) for row in [
+        _row('t1', 'a1'), _row('t1', 'a2'), _row('t2', 'a1')])
+    assert sorted(merged['t1']) == ['a1', 'a2', 'class']
+    assert sorted(merged['t2']) == ['a1', 'class']
+
+    with pytest.raises(Exception) as error:
+        merge_declarations([render(_row('t1', 'a1')), render(_row('t1', 'a1', port='80'))])
+    assert 'Conflicting values for /t1/a1/virtualPort' in str(error.value)
@@ -0,0 +1,76 @@
+"""Test: utils.timings """
+
+from f5cli.utils import timings
+
+
+def test_spans_are_nested():
+    """ Record nested spans
+    Given
+    - Timings are enabled
+
+    When
+    - A timed function is called inside a span
+
+    Then
+    - Both spans are recorded in start order, the function nested under the span
+    """
+
+    @timings.timed('auth.login')
+    def login():
+        return 'token'
+
+    timings.enable()
+    with timings.span('total'):
+        assert login() == 'token'
+    rows = timings.get_timings(timings.disable(), indent=False)
+
+    assert [(row['phase'], row['depth']) for row in rows] == [('total', 0), ('auth.login', 1)]
+    assert rows[0]['start_ms'] == 0
+    assert rows[0]['duration_ms'] >= rows[1]['duration_ms']
+
+
+def test_table_phases_are_indented():
+    """ Indent nested phase names for table output
+    Given
+    - Nested spans are recorded
+
+    When
+    - The timings are requested with indentation
+
+    Then
+    - Nested phase names are indented by their depth
+    """
+
+    timings.enable()
+    with timings.span('total'):
+        with timings.span('auth.login'):
+            pass
+    rows = timings.get_timings(timings.disable())
+
+    assert [row['phase'] for row in rows] == ['total', '  auth.login']
+    assert 'depth' not in rows[0]
+
+
+def test_disabled_spans_are_not_recorded():
+    """ Record nothing while timings are disabled
+    Given
+    - Timings are disabled
+
+    When
+    - Spans are entered and timed functions are called
+
+    Then
+    - A shared no-op span is used and nothing is recorded
+    """
+
+    @timings.timed('auth.login')
+    def login():
+        return 'token'
+
+    timings.disable()
+    with timings.span('total') as span:
+        assert login() == 'token'
+
+    assert span is timings.span('other')
+    assert timings.disable() == []
+    assert timings.get_timings([]) == []
@@ -0,0 +1,159 @@
+"""Test: utils.tracing """
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from f5cli.utils import timings
+from f5cli.utils.tracing import Tracer
+
+from ...global_test_imports import pytest
+
+TRACEPARENT = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+
+
+def _response(status_code=200):
+    response = requests.models.Response()
+    response.status_code = status_code
+    response._content = b'{}'  # pylint: disable=protected-access
+    return response
+
+
+@pytest.fixture
+def adapter_send_fixture(mocker):
+    """ Respond to every request without a connection, tasks are not found """
+
+    yield mocker.patch(
+        'requests.adapters.HTTPAdapter.send',
+        side_effect=lambda request, **kwargs: _response(404 if '/task/' in request.url else 200)
+    )
+
+
+def _get_spans(tracer):
+    return {span['name']: span for span in
+            tracer.get_trace()['resourceSpans'][0]['scopeSpans'][0]['spans']}
+
+
+@pytest.mark.usefixtures("adapter_send_fixture")
+def test_trace_spans_are_nested():
+    """ Record a trace of nested phases and HTTP requests
+    Given
+    - A trace is being recorded
+
+    When
+    - Requests are made in a phase, including from a thread pool
+
+    Then
+    - The phase is nested under the root span, the requests under the phase
+    - Failed requests have an error status
+    """
+
+    with Tracer('f5 bigip extension as3 show') as tracer:
+        with timings.span('operation.show'):
+            requests.get('https://192.0.2.1/mgmt/shared/appsvcs/declare')
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                list(executor.map(timings.propagate(requests.get),
+                                  ['https://192.0.2.1/mgmt/shared/appsvcs/task/1']))
+    spans = _get_spans(tracer)
+
+    root = spans['f5 bigip extension as3 show']
+    assert 'parentSpanId' not in root
+    assert spans['operation.show']['parentSpanId'] == root['spanId']
+    declare = spans['GET /mgmt/shared/appsvcs/declare']
+    assert declare['parentSpanId'] == spans['operation.show']['spanId']
+    assert declare['kind'] == timings.SPAN_KINDS['CLIENT']
+    assert declare['status'] == {'code': 0}
+    poll = spans['GET /mgmt/shared/appsvcs/task/{id}']
+    assert poll['parentSpanId'] == spans['operation.show']['spanId']
+    assert poll['status'] == {'code': 2, 'message': 'HTTP 404'}
+    assert len({span['traceId'] for span in spans.values()}) == 1
+    assert int(root['startTimeUnixNano']) <= int(declare['startTimeUnixNano'])
+
+
+def test_trace_parent():
+    """ Nest the trace under a parent span
+    Given
+    - A W3C traceparent, such as from a fleet run
+
+    When
+    - A trace is recorded
+
+    Then
+    - The trace ID is the parent trace ID and the root span is nested under the parent span
+    """
+
+    with Tracer('f5 login', traceparent=TRACEPARENT) as tracer:
+        pass
+    root = _get_spans(tracer)['f5 login']
+
+    assert root['traceId'] == '0af7651916cd43dd8448eb211c80319c'
+    assert root['parentSpanId'] == 'b7ad6b7169203331'
+
+
+def test_trace_errors():
+    """ Record the error of a failed command
+    Given
+    - A trace is being recorded
+
+    When
+    - The command raises an exception
+
+    Then
+    - The root span has an error status
+    """
+
+    with pytest.raises(Exception):
+        with Tracer('f5 login') as tracer:
+            raise Exception('Unable to login')
+
+    assert _get_spans(tracer)['f5 login']['status'] == {
+        'code': 2, 'message': 'Exception: Unable to login'}
+
+
+def test_export_to_file(tmp_path):
+    """ Append traces to a file
+    Given
+    - Two traces were recorded
+
+    When
+    - Both traces are exported to the same file
+
+    Then
+    - The file contains an OTLP/JSON export request per line
+    """
+
+    path = str(tmp_path / 'traces.jsonl')
+    for name in ['f5 login', 'f5 bigip extension as3 show']:
+        with Tracer(name) as tracer:
+            pass
+        tracer.export(path)
+
+    with open(path) as file:
+        lines = file.read().splitlines()
+    assert [json.loads(line)['resourceSpans'][0]['scopeSpans'][0]['spans'][0]['name']
+            for line in lines] == ['f5 login', 'f5 bigip extension as3 show']
+
+
+def test_export_to_collector(mocker):
+    """ Post a trace to a collector
+    Given
+    - A trace was recorded
+
+    When
+    - The trace is exported to a collector URL
+
+    Then
+    - The trace is posted as OTLP/JSON
+    """
+
+    mock_post = mocker.patch('f5cli.utils.tracing.requests.post')
+
+    with Tracer('f5 login') as tracer:
+        pass
+    tracer.export('http://localhost:4318/v1/traces')
+
+    args, kwargs = mock_post.call_args
+    assert args[0] == 'http://localhost:4318/v1/traces'
+    assert kwargs['headers'] == {'Content-Type': 'application/json'}
+    assert json.loads(kwargs['data']) == tracer.get_trace()